@@ -1,6 +1,7 @@
 from django.contrib import admin
-from .models import Games
+from .models import Games, PooledBoard
 
 # Register your models here.
 
 admin.site.register(Games)
+admin.site.register(PooledBoard)
@@ -0,0 +1,151 @@
+"""
+Pool of pre-solved boards so create_game does not solve inside the request.
+
+Boards are stored as PooledBoard rows per size. create_game pops one with
+pop_board(); whenever a size falls below settings.BOARD_POOL_LOW_WATERMARK
+a background thread refills it to settings.BOARD_POOL_HIGH_WATERMARK. The
+`refillboardpool` management command runs the same refill from a dedicated
+worker process.
+
+Each board records the dictionary version it was solved with. Boards from
+another word list (e.g. after the dictionary file changed) do not count
+towards the pool and are deleted instead of handed out.
+"""
+
+import threading
+from datetime import datetime
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .dictionary import dictionary_version
+from .models import PooledBoard
+from .randomGen import random_grid
+from .solutions import solution_for
+from .solve_cache import solve
+
+_refilling = set()  # sizes with a background refill thread running
+_refilling_lock = threading.Lock()
+
+
+def low_watermark() -> int:
+    return getattr(settings, 'BOARD_POOL_LOW_WATERMARK', 5)
+
+
+def high_watermark() -> int:
+    return getattr(settings, 'BOARD_POOL_HIGH_WATERMARK', 20)
+
+
+def pool_sizes():
+    return getattr(settings, 'BOARD_POOL_SIZES', range(3, 11))
+
+
+def pooled_boards(size: int):
+    """PooledBoard rows of size solved with the current word list."""
+    return PooledBoard.objects.filter(size=size, dictionary_version=dictionary_version())
+
+
+def random_game_name(size: int) -> str:
+    """Name for a new random game, e.g. Rand4x4_20250101120000."""
+    return f'Rand{size}x{size}_{datetime.now().strftime("%Y%m%d%H%M%S")}'
+
+
+def solve_random_board(size: int):
+    """Generate and solve a random board; returns (grid, foundwords)."""
+    grid = random_grid(size)
+    return grid, solve(grid)
+
+
+def pop_board(size: int):
+    """
+    Take one pre-solved board of the given size out of the pool.
+
+    Returns:
+    tuple | None: (grid, foundwords) as Python lists, or None if the pool
+    for this size is empty.
+    """
+    # Boards solved with an older word list would store stale words
+    PooledBoard.objects.filter(size=size).exclude(dictionary_version=dictionary_version()).delete()
+    while True:
+        board = pooled_boards(size).order_by('id').first()
+        if board is None:
+            return None
+        # Claim the row; if another request deleted it first, try the next one
+        with transaction.atomic():
+            claimed, _ = PooledBoard.objects.filter(pk=board.pk).delete()
+        if claimed:
+            return board.grid, board.foundwords
+
+
+def next_board(size: int):
+    """
+    Return (grid, Solution) for a new game of the given size.
+
+    Takes a pre-solved board from the pool and only generates one inline if
+    the pool is empty, then tops the pool back up in the background if it is
+    running low. The board's words come from the shared solution table (see
+    solutions.py), so a board solved before is not solved again.
+    """
+    board = pop_board(size)
+    if board is None:
+        grid = random_grid(size)
+        solution = solution_for(grid)
+    else:
+        grid, foundwords = board
+        solution = solution_for(grid, foundwords)
+    request_refill(size)
+    return grid, solution
+
+
+def refill(size: int, target: int = None) -> int:
+    """
+    Solve and store boards until the pool for size holds target boards.
+
+    Returns:
+    int: Number of boards added.
+    """
+    if target is None:
+        target = high_watermark()
+    added = 0
+    while pooled_boards(size).count() < target:
+        grid, foundwords = solve_random_board(size)
+        PooledBoard.objects.create(
+            size=size,
+            grid=grid,
+            foundwords=foundwords,
+            dictionary_version=dictionary_version(),
+        )
+        added += 1
+    return added
+
+
+def refill_all(target: int = None) -> dict:
+    """Refill every configured size; returns {size: boards added}."""
+    return {size: refill(size, target) for size in pool_sizes()}
+
+
+def request_refill(size: int):
+    """
+    Start a background refill for size if it is below the low watermark.
+
+    At most one refill thread runs per size in this process.
+    """
+    if size not in pool_sizes():
+        return
+    if pooled_boards(size).count() >= low_watermark():
+        return
+
+    with _refilling_lock:
+        if size in _refilling:
+            return
+        _refilling.add(size)
+
+    def run():
+        try:
+            refill(size)
+        finally:
+            with _refilling_lock:
+                _refilling.discard(size)
+            close_old_connections()
+
+    threading.Thread(target=run, name=f"board-pool-refill-{size}", daemon=True).start()
@@ -1,25 +1,435 @@
 """Name: Lauren Oliver, SID: 003100456"""
 
+import hashlib
+import mmap
+import os
 import re
+import struct
+import sys
+from array import array
+from functools import lru_cache
+
+
+def normalize_words(dictionary):
+    """
+    Uppercase a raw word list and keep only words the solver can use.
+
+    Parameters:
+    dictionary (list[str]): Raw list of words.
+
+    Returns:
+    list[str]: Uppercase, alphabetic words of length 2 or more.
+    """
+    return [
+        word.upper()
+        for word in dictionary
+        if isinstance(word, str) and word.isalpha() and len(word) >= 2
+    ]
+
+
+class WordIndex:
+    """
+    Immutable, pre-built lookup structure for the solver.
+
+    Building the word set and the set of every prefix is the expensive part
+    of a solve, so the index is built once and shared between Boggle
+    instances (see api.dictionary for the process-wide cache).
+    """
+
+    __slots__ = ("words", "prefixes")
+
+    def __init__(self, words, prefixes):
+        """
+        Parameters:
+        words (frozenset[str]): Valid uppercase words.
+        prefixes (frozenset[str]): Every prefix of every word in words.
+        """
+        self.words = words
+        self.prefixes = prefixes
+
+    @classmethod
+    def from_words(cls, words):
+        """
+        Build an index from a normalized word list.
+
+        Parameters:
+        words (list[str]): Uppercase words, as returned by normalize_words.
+
+        Returns:
+        WordIndex: The compiled index.
+        """
+        word_set = frozenset(words)
+        prefix_set = set()
+        for word in word_set:
+            for i in range(1, len(word) + 1):
+                prefix_set.add(word[:i])
+        return cls(word_set, frozenset(prefix_set))
+
+    def __len__(self):
+        return len(self.words)
+
+
+class Trie:
+    """
+    Compact trie over the dictionary, stored as parallel per-node lists.
+
+    Nodes are integer ids (the root is 0). The solver walks the trie one
+    node per letter alongside the DFS, so it never builds prefix strings,
+    and uses the per-node word counts to prune subtrees whose words have
+    all been found already.
+    """
+
+    __slots__ = ("children", "words", "parents", "counts")
+
+    ROOT = 0
+
+    # Words shorter than this are never reported, so they are not stored
+    MIN_WORD_LENGTH = 3
+
+    def __init__(self):
+        self.children = [{}]  # node -> {letter: child node}
+        self.words = [None]   # node -> word ending here, or None
+        self.parents = [-1]   # node -> parent node
+        self.counts = [0]     # node -> number of words in the subtree
+
+    @classmethod
+    def from_words(cls, words):
+        """
+        Build a trie from a normalized word list.
+
+        Parameters:
+        words (iterable[str]): Uppercase words, as returned by normalize_words.
+
+        Returns:
+        Trie: The compiled trie.
+        """
+        trie = cls()
+        children, node_words = trie.children, trie.words
+        parents, counts = trie.parents, trie.counts
+        for word in set(words):
+            if len(word) < cls.MIN_WORD_LENGTH:
+                continue
+            node = cls.ROOT
+            counts[node] += 1
+            for letter in word:
+                child = children[node].get(letter)
+                if child is None:
+                    child = len(children)
+                    children[node][letter] = child
+                    children.append({})
+                    node_words.append(None)
+                    parents.append(node)
+                    counts.append(0)
+                node = child
+                counts[node] += 1
+            node_words[node] = word
+        return trie
+
+    def walk(self, node, letters):
+        """
+        Follow one edge per letter from node.
+
+        Multi-letter tiles ("QU", "ST", "IE") walk several edges.
+
+        Returns:
+        int: The node reached, or -1 if the path leaves the trie.
+        """
+        children = self.children
+        for letter in letters:
+            node = children[node].get(letter, -1)
+            if node < 0:
+                return -1
+        return node
+
+    def iter_words(self):
+        """Yield every word stored in the trie."""
+        return (word for word in self.words if word is not None)
+
+    def __len__(self):
+        return self.counts[self.ROOT]
+
+
+class MappedTrie:
+    """
+    Read-only trie backed by a memory-mapped file written by MappedTrie.write.
+
+    Nodes are numbered breadth first so the children of a node are
+    contiguous and ordered by letter. Each node stores a 26-bit mask of the
+    letters it has children for plus the id of its first child, so a step is
+    one popcount: child = first_child + bit_count(mask below the letter).
+
+    The solver reads the mapped arrays directly; no per-node Python objects
+    are created, and the pages are shared by every process mapping the file.
+
+    File layout (native byte order, every section 4-byte aligned):
+        header       magic, version, byte order, node count, word count
+        masks        uint32[nodes]  child letter bits, TERMINAL_BIT if a word ends here
+        first_child  uint32[nodes]
+        parents      int32[nodes]   -1 for the root
+        counts       uint32[nodes]  words in the subtree
+        labels       uint8[nodes]   letter on the edge into the node
+    """
+
+    MAGIC = b"BGLTRIE\0"
+    VERSION = 1
+    HEADER = struct.Struct("<8sIIII")
+    TERMINAL_BIT = 1 << 26
+
+    ROOT = 0
+    MIN_WORD_LENGTH = Trie.MIN_WORD_LENGTH
+
+    def __init__(self, file_path):
+        """
+        Map a compiled trie file.
+
+        Parameters:
+        file_path (str): Path of a file written by MappedTrie.write.
+
+        Raises:
+        ValueError: If the file is not a compatible compiled trie.
+        """
+        self.file_path = str(file_path)
+        with open(self.file_path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            nodes, word_count = self._read_header()
+        except ValueError:
+            self._mmap.close()
+            raise
+
+        view = memoryview(self._mmap)
+        offset = self.HEADER.size
+        sections = []
+        for code in ("I", "I", "i", "I"):
+            end = offset + 4 * nodes
+            sections.append(view[offset:end].cast(code))
+            offset = end
+        self.masks, self.first_child, self.parents, self.counts = sections
+        self.labels = view[offset:offset + nodes]
+        self.node_count = nodes
+        self.word_count = word_count
+        self.words = _MappedWords(self)
+
+    def _read_header(self):
+        """Check the mapped file's header; returns (node count, word count)."""
+        try:
+            magic, version, big_endian, nodes, word_count = self.HEADER.unpack_from(self._mmap)
+        except struct.error as e:
+            raise ValueError(f"{self.file_path} is too short to be a compiled trie") from e
+        if magic != self.MAGIC or version != self.VERSION:
+            raise ValueError(f"{self.file_path} is not a version {self.VERSION} compiled trie")
+        if big_endian != (sys.byteorder == "big"):
+            raise ValueError(f"{self.file_path} was built on a machine with a different byte order")
+        if len(self._mmap) < self.HEADER.size + 17 * nodes:
+            raise ValueError(f"{self.file_path} is truncated")
+        return nodes, word_count
+
+    @classmethod
+    def write(cls, trie, file_path):
+        """
+        Serialize an in-memory Trie to file_path.
+
+        The file is written next to its destination and moved into place,
+        so processes that already mapped the old file keep a valid view.
+
+        Parameters:
+        trie (Trie): Trie to serialize (letters must be A-Z).
+        file_path (str): Destination path.
+        """
+        # Breadth-first renumbering: children of each node become contiguous
+        order = [trie.ROOT]
+        new_id = {trie.ROOT: 0}
+        labels = bytearray(b"\0")  # root has no incoming edge
+        for old in order:
+            for letter in sorted(trie.children[old]):
+                if not "A" <= letter <= "Z":
+                    raise ValueError(f"Cannot compile non A-Z letter {letter!r}")
+                child = trie.children[old][letter]
+                new_id[child] = len(order)
+                order.append(child)
+                labels.append(ord(letter))
+
+        masks = array("I")
+        first_child = array("I")
+        parents = array("i")
+        counts = array("I")
+        for old in order:
+            kids = trie.children[old]
+            mask = 0
+            for letter in kids:
+                mask |= 1 << (ord(letter) - 65)
+            if trie.words[old] is not None:
+                mask |= cls.TERMINAL_BIT
+            masks.append(mask)
+            first_child.append(new_id[kids[min(kids)]] if kids else 0)
+            parent = trie.parents[old]
+            parents.append(new_id[parent] if parent >= 0 else -1)
+            counts.append(trie.counts[old])
+
+        tmp_path = f"{file_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, sys.byteorder == "big",
+                                    len(order), len(trie)))
+            for section in (masks, first_child, parents, counts):
+                section.tofile(f)
+            f.write(labels)
+        os.replace(tmp_path, file_path)
+
+    def walk(self, node, letters):
+        """
+        Follow one edge per letter from node.
+
+        Multi-letter tiles ("QU", "ST", "IE") walk several edges.
+
+        Returns:
+        int: The node reached, or -1 if the path leaves the trie.
+        """
+        masks, first_child = self.masks, self.first_child
+        for letter in letters:
+            code = ord(letter) - 65
+            if code < 0 or code >= 26:
+                return -1
+            bit = 1 << code
+            mask = masks[node]
+            if not mask & bit:
+                return -1
+            node = first_child[node] + (mask & (bit - 1)).bit_count()
+        return node
+
+    def word_at(self, node):
+        """Return the word ending at node, or None."""
+        if not self.masks[node] & self.TERMINAL_BIT:
+            return None
+        letters = []
+        parents, labels = self.parents, self.labels
+        while node > 0:
+            letters.append(labels[node])
+            node = parents[node]
+        return bytes(reversed(letters)).decode("ascii")
+
+    def iter_words(self):
+        """Yield every word stored in the trie."""
+        terminal = self.TERMINAL_BIT
+        for node, mask in enumerate(self.masks):
+            if mask & terminal:
+                yield self.word_at(node)
+
+    def close(self):
+        """Release the mapping."""
+        for section in (self.masks, self.first_child, self.parents, self.counts, self.labels):
+            section.release()
+        self._mmap.close()
+
+    def __len__(self):
+        return self.word_count
+
+
+class _MappedWords:
+    """Sequence view giving MappedTrie the same words[node] lookup as Trie."""
+
+    __slots__ = ("_word_at",)
+
+    def __init__(self, trie):
+        self._word_at = trie.word_at
+
+    def __getitem__(self, node):
+        return self._word_at(node)
+
+
+# Dictionary types the trie engine can search directly
+TRIE_TYPES = (Trie, MappedTrie)
+
+
+@lru_cache(maxsize=None)
+def neighbour_table(size):
+    """
+    Precompute the neighbours of every cell of a size x size board.
+
+    Cells are flat indices (row * size + col). Only in-bounds neighbours are
+    listed, so the search never recurses off the edge of the board. Tables
+    are cached per size.
+
+    Parameters:
+    size (int): Width/height of the board.
+
+    Returns:
+    tuple[tuple[int, ...], ...]: Neighbour indices for each cell.
+    """
+    table = []
+    for row in range(size):
+        for col in range(size):
+            table.append(tuple(
+                r * size + c
+                for r in range(max(row - 1, 0), min(row + 2, size))
+                for c in range(max(col - 1, 0), min(col + 2, size))
+                if r != row or c != col
+            ))
+    return tuple(table)
+
+
+def orientations(grid):
+    """
+    Yield the 8 rotations and reflections of a square grid, as tuples of rows.
+
+    A board's solution set is the same in every orientation: rotating or
+    reflecting keeps every adjacency, diagonals included.
+    """
+    rows = [tuple(str(tile).upper() for tile in row) for row in grid]
+    for _ in range(4):
+        rows = list(zip(*rows[::-1]))  # rotate a quarter turn clockwise
+        yield tuple(rows)
+        yield tuple(zip(*rows))  # reflect across the main diagonal
+
+
+def grid_hash(grid):
+    """
+    SHA-256 of the canonical (smallest) orientation of grid.
+
+    Equal for a board and all its rotations and reflections, so it can key
+    stored solutions.
+    """
+    if grid and all(len(row) == len(grid) for row in grid):
+        canonical = min(orientations(grid))
+    else:
+        canonical = tuple(tuple(str(tile).upper() for tile in row) for row in grid)
+    # Tiles can be more than one letter (QU, ST, IE), so separate them
+    text = '|'.join(','.join(row) for row in canonical)
+    return hashlib.sha256(text.encode()).hexdigest()
 
 
 class Boggle:
 
     SPECIAL_TILES = {"QU": 2, "ST": 2, "IE": 2}
 
-    def __init__(self, grid, dictionary):
+    # Search engines selectable with the engine argument
+    ENGINES = ("prefix", "trie", "iterative")
+
+    def __init__(self, grid, dictionary, engine=None):
         """
         Constructor for Boggle class.
 
         Parameters:
         grid (list[list[str]]): 2D array representing the Boggle board.
-        dictionary (list[str]): List of valid words.
+        dictionary (list[str] | WordIndex | Trie | MappedTrie): List of valid
+            words, or a pre-built dictionary shared between solves.
+        engine (str): "prefix" (prefix-set search), "trie" (recursive trie
+            walk with subtree pruning) or "iterative" (the trie walk with an
+            explicit stack instead of recursion). Defaults to "trie" for a
+            Trie dictionary and "prefix" otherwise. MappedTrie counts as a
+            Trie.
 
         Initializes:
         self.solutions (set): Stores unique words found during search.
         """
+        if engine is None:
+            engine = "trie" if isinstance(dictionary, TRIE_TYPES) else "prefix"
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}, expected one of {self.ENGINES}")
+
         self.grid = grid
         self.dictionary = dictionary
+        self.engine = engine
         self.solutions = set()  # store unique words found
 
         if not self._grid_is_valid(self.grid):
@@ -47,10 +457,15 @@ class Boggle:
         self.dictionary = dictionary
         self.solutions = set()  # reset solutions when dictionary changes
 
-    def getSolution(self):
+    def getSolution(self, start_cells=None):
         """
         Main solver method to find all valid words in the grid.
 
+        Parameters:
+        start_cells (iterable[int] | None): Only search paths starting at
+            these flat cell indices (row * size + col). Defaults to every
+            cell; used to split one board across processes (api.parallel).
+
         Returns:
         list[str]: Sorted list of unique words found on the board.
         """
@@ -69,22 +484,61 @@ class Boggle:
             return []
 
         # Normalize everything to uppercase
-        self.grid, self.dictionary = (
-          self._normalize_input(self.grid, self.dictionary)
-        )
+        if isinstance(self.dictionary, (WordIndex,) + TRIE_TYPES):
+            # Pre-built dictionary: only the grid needs normalizing
+            self.grid = [[cell.upper() for cell in row] for row in self.grid]
+        else:
+            self.grid, self.dictionary = (
+              self._normalize_input(self.grid, self.dictionary)
+            )
 
         # Validate grid (all alphabetic tiles)
         if not self._grid_is_valid(self.grid):
             return []
 
+        if start_cells is None:
+            start_cells = range(size * size)
+
+        if self.engine == "trie":
+            self._solve_trie(size, start_cells)
+        elif self.engine == "iterative":
+            self._solve_trie_iterative(size, start_cells)
+        else:
+            self._solve_prefix(size, start_cells)
+
+        # return sorted(self.solutions)
+        return sorted(word.upper() for word in self.solutions)
+
+    def _word_index(self):
+        """Return the dictionary as a WordIndex, building one if needed."""
+        if isinstance(self.dictionary, WordIndex):
+            return self.dictionary
+        if isinstance(self.dictionary, TRIE_TYPES):
+            return WordIndex.from_words(self.dictionary.iter_words())
+        return WordIndex.from_words(self.dictionary)
+
+    def _trie(self):
+        """Return the dictionary as a Trie, building one if needed."""
+        if isinstance(self.dictionary, TRIE_TYPES):
+            return self.dictionary
+        if isinstance(self.dictionary, WordIndex):
+            return Trie.from_words(self.dictionary.words)
+        return Trie.from_words(self.dictionary)
+
+    def _solve_prefix(self, size, start_cells):
+        """
+        Prefix-set search: DFS from every start cell, pruning on a set of all
+        dictionary prefixes.
+
+        Parameters:
+        size (int): Width/height of the (validated, normalized) grid.
+        start_cells (iterable[int]): Flat indices of the cells to start from.
+        """
         # Build prefix set + dictionary set for fast lookup
-        word_set = set(self.dictionary)
-        
-        # Build prefix set - all prefixes of all words in dictionary for O(1) lookup
-        prefix_set = set()
-        for word in word_set:
-            for i in range(1, len(word) + 1):
-                prefix_set.add(word[:i])
+        # (all prefixes of all words in dictionary for O(1) lookup)
+        index = self._word_index()
+        word_set = index.words
+        prefix_set = index.prefixes
         
         # Debug: Print some stats about the dictionary
         # print(f"Dictionary size: {len(word_set)}")
@@ -95,12 +549,73 @@ class Boggle:
         visited = [[False] * size for _ in range(size)]
 
         # Explore from each grid position
-        for r in range(size):
-            for c in range(size):
-                self._search("", r, c, visited, word_set, prefix_set, length=0)
+        for cell in start_cells:
+            r, c = divmod(cell, size)
+            self._search("", r, c, visited, word_set, prefix_set, length=0)
 
-        # return sorted(self.solutions)
-        return sorted(word.upper() for word in self.solutions)
+    def _solve_trie(self, size, start_cells):
+        """
+        Trie search: DFS from every start cell while walking the trie node
+        by node.
+
+        Parameters:
+        size (int): Width/height of the (validated, normalized) grid.
+        start_cells (iterable[int]): Flat indices of the cells to start from.
+        """
+        trie = self._trie()
+        tiles = [cell for row in self.grid for cell in row]
+        neighbours = neighbour_table(size)
+        # node -> words below it not yet found; absent means none found yet
+        remaining = {}
+
+        for cell in start_cells:
+            self._trie_search(trie.ROOT, cell, 0, tiles, neighbours, trie, remaining)
+
+    def _solve_trie_iterative(self, size, start_cells):
+        """
+        Trie search using an explicit stack of (cell, trie node, visited mask)
+        frames instead of recursion, so there is no per-step call overhead
+        and no recursion depth limit on long paths.
+
+        Parameters:
+        size (int): Width/height of the (validated, normalized) grid.
+        start_cells (iterable[int]): Flat indices of the cells to start from.
+        """
+        trie = self._trie()
+        tiles = [cell for row in self.grid for cell in row]
+        neighbours = neighbour_table(size)
+        walk, words = trie.walk, trie.words
+        counts, parents = trie.counts, trie.parents
+        solutions = self.solutions
+        # node -> words below it not yet found; absent means none found yet
+        remaining = {}
+
+        # Each frame is a cell to enter from the given node along a path
+        stack = [(cell, trie.ROOT, 0) for cell in reversed(list(start_cells))]
+        pop, push = stack.pop, stack.append
+        while stack:
+            cell, node, visited = pop()
+
+            # Special tiles walk one edge per letter
+            node = walk(node, tiles[cell])
+
+            # Prune if no word continues this path, or all of them are found
+            if node < 0 or remaining.get(node) == 0:
+                continue
+
+            word = words[node]
+            if word is not None and word not in solutions:
+                solutions.add(word)
+                # One fewer unfound word below every node on the path
+                ancestor = node
+                while ancestor >= 0:
+                    remaining[ancestor] = remaining.get(ancestor, counts[ancestor]) - 1
+                    ancestor = parents[ancestor]
+
+            visited |= 1 << cell
+            for nxt in neighbours[cell]:
+                if not visited >> nxt & 1:
+                    push((nxt, node, visited))
 
     def _normalize_input(self, grid, dictionary):
         """
@@ -117,7 +632,7 @@ class Boggle:
         upper_grid = [[cell.upper() for cell in row] for row in grid]
         # Filter dictionary to only include valid alphabetic words (no numbers, special chars, etc.)
         # Keep all words regardless of length - we want to find words of all lengths
-        upper_dict = [word.upper() for word in dictionary if isinstance(word, str) and word.isalpha() and len(word) >= 2]
+        upper_dict = normalize_words(dictionary)
         return upper_grid, upper_dict
 
     def _grid_is_valid(self, grid):
@@ -215,6 +730,44 @@ class Boggle:
         # Backtrack: unmark the cell so it can be used in other paths
         visited[row][col] = False  # backtrack
 
+    def _trie_search(self, node, cell, visited, tiles, neighbours, trie, remaining):
+        """
+        Perform DFS from a given cell, following the matching trie edges.
+
+        Parameters:
+        node (int): Trie node reached by the path so far.
+        cell (int): Flat index (row * size + col) of the current cell.
+        visited (int): Bitmask of the cells already used in current path.
+        tiles (list[str]): Grid tiles, flattened row by row.
+        neighbours (tuple[tuple[int, ...], ...]): Table from neighbour_table.
+        trie (Trie | MappedTrie): Compiled dictionary.
+        remaining (dict[int, int]): Unfound word counts for nodes below which
+            a word has already been found.
+        """
+        # Special tiles walk one edge per letter
+        node = trie.walk(node, tiles[cell])
+
+        # Prune if no word continues this path, or all of them are found
+        if node < 0 or remaining.get(node) == 0:
+            return
+
+        # Only words of 3+ letters are in the trie, so no length check here
+        word = trie.words[node]
+        if word is not None and word not in self.solutions:
+            self.solutions.add(word)
+            # One fewer unfound word below every node on the path
+            counts, parents = trie.counts, trie.parents
+            ancestor = node
+            while ancestor >= 0:
+                remaining[ancestor] = remaining.get(ancestor, counts[ancestor]) - 1
+                ancestor = parents[ancestor]
+
+        # Mark this cell as visited for the rest of the path
+        visited |= 1 << cell
+        for nxt in neighbours[cell]:
+            if not visited >> nxt & 1:
+                self._trie_search(node, nxt, visited, tiles, neighbours, trie, remaining)
+
 
 def main():
     grid = [
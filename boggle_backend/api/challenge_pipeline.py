@@ -0,0 +1,163 @@
+"""
+The challenge catalogue and the pipeline that regenerates it.
+
+Each stage streams records to the next:
+
+    define  -> read_id_records() / CHALLENGES: id, metadata and grid
+    solve   -> solve_many() against one shared dictionary, in parallel
+    score   -> wordCount, maxScore and lengthCounts from the solutions
+    write   -> one JSON object per line (see `manage.py generatechallenges`)
+    upload  -> challenge_upload.upload_challenges(), which skips challenges
+               whose content has not changed
+
+Every record carries the dictionaryVersion it was solved with and the
+gridHash of its board (boggle_solver.grid_hash, the same for all 8
+rotations and reflections). When the previous output is given, records
+whose version and hash still match reuse their solutions; the remaining
+grids go through solve_many, which also checks solve_cache, so only new
+or changed boards are solved again.
+"""
+
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, Tuple
+
+from .boggle_solver import grid_hash
+from .challenge_schema import parse_grid
+from .dictionary import dictionary_version
+from .leaderboard import word_score
+from .parallel import solve_many
+from .readJSONFile import read_id_records
+
+# Built-in challenge definitions, used when no definitions file is given
+CHALLENGES = {
+    "challenge_timed_30s": {
+        "name": "30-Second Speed Challenge",
+        "description": "Find as many words as possible in just 30 seconds! Test your speed and word-finding skills.",
+        "type": "time_limited",
+        "timeLimit": 30,
+        "wordGoal": None,
+        "grid": [["R","E","T","A"], ["L","A","N","T"], ["O","M","E","D"], ["P","A","R","K"]]
+    },
+    "challenge_timed_60s": {
+        "name": "60-Second Challenge",
+        "description": "You have 60 seconds to find as many words as you can! More time means more opportunities.",
+        "type": "time_limited",
+        "timeLimit": 60,
+        "wordGoal": None,
+        "grid": [["C","A","R","T"], ["H","O","M","E"], ["T","T","A","R"], ["P","L","A","Y"]]
+    },
+    "challenge_wordgoal_15": {
+        "name": "15-Word Goal Challenge",
+        "description": "Can you find at least 15 valid words? Take your time and explore the board carefully.",
+        "type": "word_goal",
+        "timeLimit": None,
+        "wordGoal": 15,
+        "grid": [["B","E","A","T"], ["L","O","V","E"], ["T","O","N","G"], ["M","U","T","E"]]
+    },
+    "challenge_wordgoal_25": {
+        "name": "25-Word Goal Challenge",
+        "description": "A challenging goal: find at least 25 words! This requires careful exploration of the board.",
+        "type": "word_goal",
+        "timeLimit": None,
+        "wordGoal": 25,
+        "grid": [["T","H","A","N"], ["K","W","O","R"], ["D","A","Y","T"], ["M","O","O","N"]]
+    },
+    "challenge_combined_20words_90s": {
+        "name": "20 Words in 90 Seconds",
+        "description": "The ultimate challenge! Find at least 20 words within 90 seconds. Speed and accuracy required!",
+        "type": "combined",
+        "timeLimit": 90,
+        "wordGoal": 20,
+        "grid": [["F","L","A","M"], ["E","D","A","T"], ["T","O","R","T"], ["P","A","L","E"]]
+    }
+}
+
+
+def score_metadata(solutions) -> Dict:
+    """Word count, best possible score and words per length of a solution list."""
+    return {
+        "wordCount": len(solutions),
+        "maxScore": sum(word_score(word) for word in solutions),
+        "lengthCounts": {str(length): count for length, count in sorted(Counter(map(len, solutions)).items())},
+    }
+
+
+def generate(definitions: Iterable[Tuple[str, Dict]], previous: Dict[str, Dict] = None,
+             version: str = None, workers: int = None, engine: str = "iterative",
+             stats: Counter = None) -> Iterator[Dict]:
+    """
+    Solve and score challenge definitions, yielding one record per challenge.
+
+    Parameters:
+    definitions: (challenge id, definition) pairs; a definition holds the
+        challenge metadata and its grid in any layout parse_grid() accepts.
+    previous (dict): Records of an earlier run by challenge id. A record
+        whose dictionaryVersion and gridHash match is reused instead of
+        solving the grid again.
+    version (str): dictionary_version() of the word list (computed if None).
+    workers (int): Solver processes (see parallel.solve_many).
+    engine (str): Trie engine to run ("trie" or "iterative").
+    stats (Counter): If given, counts 'solved', 'reused' and 'invalid'.
+
+    Yields:
+    dict: Records in definition order, with id, the definition fields, grid,
+    solutions, score metadata, dictionaryVersion, gridHash and createdAt.
+    Definitions whose grid
+    cannot be parsed are counted as invalid and left out.
+    """
+    previous = previous or {}
+    version = version or dictionary_version()
+    stats = stats if stats is not None else Counter()
+    now = datetime.now().isoformat() + "Z"
+
+    planned = []
+    for challenge_id, definition in definitions:
+        grid = parse_grid(definition.get('grid'))
+        if not grid:
+            stats['invalid'] += 1
+            continue
+        key = grid_hash(grid)
+        earlier = previous.get(challenge_id) or {}
+        reuse = (
+            (earlier.get('dictionaryVersion'), earlier.get('gridHash')) == (version, key)
+            and 'solutions' in earlier
+        )
+        planned.append((challenge_id, definition, grid, key, earlier, reuse))
+
+    # Boards are solved in definition order, so results line up with planned
+    solved = solve_many(
+        ((challenge_id, grid) for challenge_id, _, grid, _, _, reuse in planned if not reuse),
+        workers=workers, engine=engine,
+    )
+    for challenge_id, definition, grid, key, earlier, reuse in planned:
+        if reuse:
+            solutions = earlier['solutions']
+            stats['reused'] += 1
+        else:
+            _, solutions = next(solved)
+            stats['solved'] += 1
+        record = {"id": challenge_id}
+        record.update(definition)
+        record.pop('solveKey', None)  # reuse key of older runs
+        record.update({
+            "grid": grid,
+            "solutions": solutions,
+            **score_metadata(solutions),
+            "dictionaryVersion": version,
+            "gridHash": key,
+            "createdAt": earlier.get('createdAt') or definition.get('createdAt') or now,
+        })
+        yield record
+
+
+def read_records(path) -> Dict[str, Dict]:
+    """Records of an earlier run by challenge id ({} if the file is missing)."""
+    try:
+        with open(path) as f:
+            return {
+                challenge_id: dict(record, id=challenge_id)
+                for challenge_id, record in read_id_records(f)
+            }
+    except FileNotFoundError:
+        return {}
@@ -0,0 +1,205 @@
+"""
+Canonical, versioned layout of challenge documents in Firestore.
+
+Challenges used to be uploaded in several shapes (grids as JSON strings,
+row strings or 2D arrays; solutions as JSON strings or comma-joined
+strings; camelCase and snake_case fields), so every read had to re-parse
+them. Documents are now normalized once, when they are written, to:
+
+    schemaVersion   int, SCHEMA_VERSION
+    challenge_id    str
+    name            str
+    description     str
+    type            str: "time_limited", "word_goal" or "combined"
+    size            int, the board is size x size
+    tiles           list[str], size * size uppercase tiles in row order
+                    (Firestore cannot store nested arrays)
+    solutions       list[str], sorted unique uppercase words
+    timeLimit       int | None
+    wordGoal        int | None
+    isActive        bool
+    wordCount       int, optional: number of solutions
+    maxScore        int, optional: score for finding every solution
+    createdAt       str | timestamp
+    updatedAt       str | timestamp
+
+plus highScore, which is maintained by the leaderboard writes. Documents
+at the current schemaVersion are returned to the API as stored; older ones
+are converted on read until `manage.py migratechallenges` rewrites them.
+"""
+
+import json
+import re
+from typing import Dict, List
+
+from .fallbacks import record_fallback
+
+SCHEMA_VERSION = 1
+
+# Fields of older documents that the canonical layout replaces
+LEGACY_FIELDS = (
+    'id', 'grid', 'array', 'board', 'Grid',
+    'time_limit', 'word_goal', 'created_at', 'is_active',
+)
+
+
+def is_current(challenge_data: Dict) -> bool:
+    """True if the document is already in the canonical layout."""
+    return challenge_data.get('schemaVersion') == SCHEMA_VERSION
+
+
+def is_active_value(challenge_data: Dict) -> bool:
+    """Interpret a challenge's active flag the way older documents stored it.
+
+    isActive (or the older is_active) may be a boolean or the string
+    'true'/'True'; documents with neither field count as active.
+    """
+    if 'isActive' in challenge_data:
+        value = challenge_data['isActive']
+    elif 'is_active' in challenge_data:
+        value = challenge_data['is_active']
+    else:
+        return True
+    return value is True or value in ('true', 'True')
+
+
+def parse_grid(grid) -> List[List[str]]:
+    """
+    Parse any stored grid format into a square 2D list of uppercase tiles.
+
+    Accepts a 2D list, a list of row strings, a flat list of letters or a
+    JSON (or loosely formatted) string of any of those. Returns [] if no
+    square grid can be recovered.
+    """
+    if isinstance(grid, str):
+        record_fallback('grid.string')
+        try:
+            grid = json.loads(grid)
+        except json.JSONDecodeError:
+            # Not JSON; keep just the letters and assume a square grid
+            record_fallback('grid.letters_from_string')
+            letters = re.findall(r'[A-Za-z]', grid)
+            size = int(len(letters) ** 0.5)
+            if not letters or size * size != len(letters):
+                record_fallback('grid.unparseable')
+                return []
+            grid = [letters[i:i + size] for i in range(0, len(letters), size)]
+    if not isinstance(grid, list) or not grid:
+        record_fallback('grid.unparseable')
+        return []
+
+    if isinstance(grid[0], list):
+        # 2D array: keep only the letters of each tile
+        rows = [[re.sub(r'[^A-Za-z]', '', str(cell)).upper() for cell in row] for row in grid]
+        rows = [row for row in ([cell for cell in row if cell] for row in rows) if row]
+        if not _is_square(rows):
+            record_fallback('grid.unparseable')
+            return []
+        return rows
+
+    # One string per row...
+    rows = [list(re.sub(r'[^A-Za-z]', '', str(row)).upper()) for row in grid]
+    rows = [row for row in rows if row]
+    if _is_square(rows):
+        return rows
+    # ...or a flat list of letters
+    record_fallback('grid.reshaped')
+    flat = [tile for row in rows for tile in row]
+    size = int(len(flat) ** 0.5)
+    if not flat or size * size != len(flat):
+        record_fallback('grid.unparseable')
+        return []
+    return [flat[i:i + size] for i in range(0, len(flat), size)]
+
+
+def _is_square(rows: List[List[str]]) -> bool:
+    return bool(rows) and all(len(row) == len(rows) for row in rows)
+
+
+def parse_solutions(solutions) -> List[str]:
+    """
+    Parse any stored solutions format into sorted unique uppercase words.
+
+    Accepts a list of words, a JSON string, or a list holding a single JSON
+    or comma-separated string.
+    """
+    if isinstance(solutions, str):
+        record_fallback('solutions.string')
+        try:
+            solutions = json.loads(solutions)
+        except json.JSONDecodeError:
+            record_fallback('solutions.unparseable')
+            return []
+    if isinstance(solutions, list) and len(solutions) == 1 and isinstance(solutions[0], str):
+        value = solutions[0].strip()
+        try:
+            parsed = json.loads(value)
+        except (json.JSONDecodeError, TypeError):
+            parsed = None
+        if isinstance(parsed, list):
+            record_fallback('solutions.nested_json')
+            solutions = parsed
+        elif ',' in value:
+            record_fallback('solutions.comma_separated')
+            solutions = value.split(',')
+    if not isinstance(solutions, list):
+        record_fallback('solutions.unparseable')
+        return []
+    return sorted({str(word).strip().upper() for word in solutions if word and str(word).strip()})
+
+
+def canonical_challenge(challenge_data: Dict, challenge_id: str = None) -> Dict:
+    """
+    Return the canonical document for challenge data in any older layout.
+
+    highScore is not included; it belongs to the leaderboard writes.
+    """
+    grid = parse_grid(
+        challenge_data.get('grid') or challenge_data.get('array')
+        or challenge_data.get('board') or challenge_data.get('Grid') or []
+    )
+    document = {
+        'schemaVersion': SCHEMA_VERSION,
+        'challenge_id': challenge_id or challenge_data.get('challenge_id') or challenge_data.get('id'),
+        'name': challenge_data.get('name'),
+        'description': challenge_data.get('description'),
+        'type': challenge_data.get('type'),
+        'size': len(grid),
+        'tiles': [tile for row in grid for tile in row],
+        'solutions': parse_solutions(challenge_data.get('solutions', [])),
+        'timeLimit': challenge_data.get('timeLimit') or challenge_data.get('time_limit'),
+        'wordGoal': challenge_data.get('wordGoal') or challenge_data.get('word_goal'),
+        'isActive': is_active_value(challenge_data),
+    }
+    # Score metadata written by `manage.py generatechallenges`
+    for field in ('wordCount', 'maxScore'):
+        if challenge_data.get(field) is not None:
+            document[field] = challenge_data[field]
+    for field, legacy in (('createdAt', 'created_at'), ('updatedAt', None)):
+        value = challenge_data.get(field) or (legacy and challenge_data.get(legacy))
+        if value:
+            document[field] = value
+    return document
+
+
+def challenge_for_api(challenge_data: Dict, include_solutions: bool = True,
+                      include_grid: bool = True) -> Dict:
+    """Build the API response for a canonical challenge document."""
+    size = challenge_data['size']
+    formatted = {
+        "id": challenge_data.get('id'),
+        "challenge_id": challenge_data.get('id') or challenge_data.get('challenge_id'),
+        "name": challenge_data.get('name'),
+        "description": challenge_data.get('description'),
+        "challenge_type": challenge_data.get('type'),
+        "time_limit": challenge_data.get('timeLimit'),
+        "word_goal": challenge_data.get('wordGoal'),
+        "size": size,
+        "high_score": challenge_data.get('high_score'),
+    }
+    if include_grid:
+        tiles = challenge_data['tiles']
+        formatted["grid"] = [tiles[i * size:(i + 1) * size] for i in range(size)]
+    if include_solutions:
+        formatted["solutions"] = challenge_data.get('solutions', [])
+    return formatted
@@ -0,0 +1,104 @@
+"""
+Bulk, idempotent upload of challenges to Firestore.
+
+Every document is written in the canonical layout (see challenge_schema)
+together with a contentHash of its content. Before writing, the hashes
+already stored are read with one projected query, and challenges whose
+hash matches are skipped, so re-publishing an unchanged catalogue costs
+no writes. New challenges get an explicit null highScore, so listings
+can tell "nobody has played" from "not backfilled yet" without querying
+the leaderboard. Changed challenges are written with
+firestore_service.write_batched: batches of up to 500 (the Firestore
+limit), committed concurrently, each retried with exponential backoff.
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from typing import Dict
+
+from .challenge_schema import LEGACY_FIELDS, canonical_challenge
+from .firestore_service import (
+    HIGH_SCORE_FIELD, BatchWriteError, get_firestore_client, invalidate_challenge_cache, sdk,
+    write_batched
+)
+
+CONTENT_HASH_FIELD = 'contentHash'
+
+# Fields left out of the hash: timestamps change on every generation run
+# and highScore is maintained by leaderboard writes
+UNHASHED_FIELDS = ('createdAt', 'updatedAt', CONTENT_HASH_FIELD, HIGH_SCORE_FIELD)
+
+
+def content_hash(document: Dict) -> str:
+    """SHA-256 of a canonical challenge document's content."""
+    content = {field: value for field, value in document.items() if field not in UNHASHED_FIELDS}
+    encoded = json.dumps(content, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def upload_challenges(challenges: Dict[str, Dict], db=None, workers: int = 4,
+                      retries: int = 3, dry_run: bool = False) -> Dict[str, list]:
+    """
+    Write challenges to the Challenges collection, skipping unchanged ones.
+
+    Parameters:
+    challenges (dict): challenge id -> challenge data in any layout
+        canonical_challenge() accepts.
+    db: Firestore client (defaults to firestore_service.get_firestore_client()).
+    workers (int): Batches committed at once.
+    retries (int): Extra attempts for a batch whose commit fails.
+    dry_run (bool): Work out what would be written without writing.
+
+    Returns:
+    dict: Challenge ids by outcome: 'written', 'unchanged', 'invalid' (grid
+    could not be parsed) and 'failed' (commit failed after all retries).
+    """
+    if db is None:
+        db = get_firestore_client()
+    challenges_ref = db.collection('Challenges')
+    result = {'written': [], 'unchanged': [], 'invalid': [], 'failed': []}
+
+    stored = {
+        doc.id: (doc.to_dict() or {}).get(CONTENT_HASH_FIELD)
+        for doc in challenges_ref.select([CONTENT_HASH_FIELD]).stream()
+    }
+
+    writes = []
+    now = datetime.now().isoformat() + "Z"
+    for challenge_id, challenge_data in challenges.items():
+        document = canonical_challenge(challenge_data, challenge_id)
+        if not document['tiles']:
+            result['invalid'].append(challenge_id)
+            continue
+        document[CONTENT_HASH_FIELD] = content_hash(document)
+        if stored.get(challenge_id) == document[CONTENT_HASH_FIELD]:
+            result['unchanged'].append(challenge_id)
+            continue
+        document['updatedAt'] = now
+        if challenge_id not in stored:
+            document[HIGH_SCORE_FIELD] = None
+        # Merge so highScore survives; remove fields of older layouts
+        for field in LEGACY_FIELDS:
+            document.setdefault(field, sdk().DELETE_FIELD)
+        writes.append((challenge_id, document))
+
+    if dry_run:
+        result['written'] = [challenge_id for challenge_id, _ in writes]
+        return result
+
+    def write(batch, item):
+        challenge_id, document = item
+        batch.set(challenges_ref.document(challenge_id), document, merge=True)
+
+    failed = set()
+    try:
+        write_batched(db, writes, write, workers=max(1, workers), retries=retries)
+    except BatchWriteError as e:
+        failed = {challenge_id for challenge_id, _ in e.failed}
+    for challenge_id, _ in writes:
+        result['failed' if challenge_id in failed else 'written'].append(challenge_id)
+
+    if result['written']:
+        invalidate_challenge_cache()
+    return result
@@ -0,0 +1,190 @@
+"""
+Process-wide dictionary service.
+
+The ENABLE word list is parsed and compiled (into a Trie or WordIndex) once
+per worker process and shared by every request. Compiled dictionaries are
+rebuilt when the word list file's modification time changes.
+
+If `manage.py builddictionary` has written an up-to-date compiled trie to
+settings.DICTIONARY_TRIE_PATH, get_trie maps that file instead, which is
+near-instant and shares its pages between worker processes. A compiled
+file that cannot be mapped (corrupt, or from another format version) is
+logged and rebuilt from the word list.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+
+from .boggle_solver import MappedTrie, Trie, WordIndex, normalize_words
+from .fallbacks import record_fallback
+from .readJSONFile import read_json_to_list
+
+logger = logging.getLogger(__name__)
+
+WORDLIST_PATH = "data/full-wordlist.json"
+
+_lock = threading.Lock()
+_cache = {}  # (absolute path, compiled class) -> (mtime, compiled dictionary)
+_versions = {}  # absolute path -> (mtime, content hash)
+
+
+class DictionaryNotFound(Exception):
+    """Raised when the word list file cannot be located."""
+
+
+def find_wordlist() -> str:
+    """Return the absolute path of the word list in the static files."""
+    file_path = finders.find(WORDLIST_PATH)
+    if not file_path:
+        raise DictionaryNotFound("Dictionary file not found")
+    return file_path
+
+
+def _get_compiled(kind, file_path):
+    """Return the cached kind.from_words() build of the word list at file_path."""
+    if file_path is None:
+        file_path = find_wordlist()
+
+    try:
+        mtime = os.stat(file_path).st_mtime
+    except OSError as e:
+        raise DictionaryNotFound(f"Dictionary file not found at {file_path}") from e
+
+    key = (file_path, kind)
+    cached = _cache.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with _lock:
+        # Another thread may have rebuilt it while we waited
+        cached = _cache.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        words = normalize_words(read_json_to_list(file_path))
+        compiled = kind.from_words(words)
+        _cache[key] = (mtime, compiled)
+        return compiled
+
+
+def get_word_index(file_path: str = None) -> WordIndex:
+    """
+    Return the shared WordIndex for the word list at file_path.
+
+    Defaults to the bundled ENABLE list. The file is only re-read when its
+    mtime differs from the cached copy.
+    """
+    return _get_compiled(WordIndex, file_path)
+
+
+def get_trie(file_path: str = None):
+    """
+    Return the shared Trie for the word list at file_path.
+
+    Defaults to the bundled ENABLE list, in which case a compiled trie file
+    at least as new as the word list is mapped instead (see get_mapped_trie).
+    The file is only re-read when its mtime differs from the cached copy.
+    """
+    if file_path is None:
+        compiled_path = compiled_trie_path()
+        try:
+            if os.stat(compiled_path).st_mtime >= os.stat(find_wordlist()).st_mtime:
+                return get_mapped_trie(compiled_path)
+        except OSError:
+            pass
+        except ValueError as e:
+            # Corrupt or written by another format version: solve from the
+            # word list and replace the file so later calls can map it again
+            logger.warning("Ignoring compiled dictionary: %s", e)
+            record_fallback('dictionary.compiled_trie_invalid', compiled_path)
+            trie = _get_compiled(Trie, None)
+            rebuild_compiled_trie(trie, compiled_path)
+            return trie
+    return _get_compiled(Trie, file_path)
+
+
+def rebuild_compiled_trie(trie: Trie, file_path: str = None) -> bool:
+    """Write trie to the compiled trie file; returns False (and logs) on failure."""
+    if file_path is None:
+        file_path = compiled_trie_path()
+    try:
+        MappedTrie.write(trie, file_path)
+    except OSError:
+        logger.exception("Could not rebuild the compiled dictionary at %s", file_path)
+        return False
+    logger.info("Rebuilt the compiled dictionary at %s", file_path)
+    return True
+
+
+def dictionary_version(file_path: str = None) -> str:
+    """
+    Short content hash of the word list at file_path (defaults to ENABLE).
+
+    Identifies which words a stored solution was found with. The file is
+    only hashed again when its mtime changes.
+    """
+    if file_path is None:
+        file_path = find_wordlist()
+    try:
+        mtime = os.stat(file_path).st_mtime
+    except OSError as e:
+        raise DictionaryNotFound(f"Dictionary file not found at {file_path}") from e
+
+    cached = _versions.get(file_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    version = digest.hexdigest()[:16]
+    _versions[file_path] = (mtime, version)
+    return version
+
+
+def compiled_trie_path() -> str:
+    """Return the configured location of the compiled trie file."""
+    return str(getattr(settings, 'DICTIONARY_TRIE_PATH', ''))
+
+
+def get_mapped_trie(file_path: str = None) -> MappedTrie:
+    """
+    Return the shared MappedTrie for a compiled trie file.
+
+    The file is re-mapped when its mtime changes (builddictionary replaces
+    it atomically, so existing mappings stay valid).
+    """
+    if file_path is None:
+        file_path = compiled_trie_path()
+
+    try:
+        mtime = os.stat(file_path).st_mtime
+    except OSError as e:
+        raise DictionaryNotFound(f"Compiled dictionary not found at {file_path}") from e
+
+    key = (file_path, MappedTrie)
+    cached = _cache.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with _lock:
+        cached = _cache.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        trie = MappedTrie(file_path)
+        _cache[key] = (mtime, trie)
+        return trie
+
+
+def clear_cache():
+    """Drop every cached dictionary (mainly useful for tests and reloads)."""
+    with _lock:
+        _cache.clear()
+        _versions.clear()
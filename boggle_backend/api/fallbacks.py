@@ -0,0 +1,46 @@
+"""
+Counters for the code paths that repair malformed data or fall back to
+slower queries (legacy challenge layouts, unparseable grids, missing
+Firestore indexes, ...).
+
+record_fallback() is only called on those paths, so the normal path pays
+nothing. The first time a path fires in a process it is logged as a
+warning; after that it is only counted (and logged at DEBUG). The counts
+are served to admins at /api/diagnostics/fallbacks.
+"""
+
+import logging
+import threading
+from collections import Counter
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+_counts = Counter()
+_lock = threading.Lock()
+
+
+def record_fallback(name: str, subject=None):
+    """Count one use of the fallback path called name (e.g. 'grid.reshaped').
+
+    subject (e.g. a challenge id) only goes into the log message.
+    """
+    with _lock:
+        _counts[name] += 1
+        first = _counts[name] == 1
+    where = '' if subject is None else f' for {subject}'
+    if first:
+        logger.warning("Fallback %s used%s; further uses are only counted", name, where)
+    else:
+        logger.debug("Fallback %s used%s", name, where)
+
+
+def fallback_counts() -> Dict[str, int]:
+    """Uses of each fallback path in this process since it started."""
+    with _lock:
+        return dict(_counts)
+
+
+def reset_fallback_counts():
+    with _lock:
+        _counts.clear()
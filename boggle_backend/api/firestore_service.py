@@ -3,11 +3,26 @@ Firestore service for interacting with Firebase Firestore database.
 Handles challenges and leaderboard data.
 """
 
+import asyncio
+import functools
+import logging
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Optional
 from django.conf import settings
 
+from . import memory_firestore
+from .challenge_schema import (
+    LEGACY_FIELDS, canonical_challenge, challenge_for_api, is_current
+)
+from .fallbacks import record_fallback
+from .ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
 # Try to import Firebase Admin SDK
 try:
     import firebase_admin
@@ -17,22 +32,88 @@ except ImportError:
     FIREBASE_AVAILABLE = False
     firebase_admin = None
 
-# Global Firestore client
+# Global Firestore client (a memory_firestore.Client with the memory backend)
 _db = None
 
+# Most writes Firestore accepts in one batch
+MAX_BATCH_WRITES = 500
+
+# Challenge document field holding the denormalized top leaderboard entry
+# ({score, username, wordsFound, timeTaken}, or None if nobody has played).
+# It is kept up to date by add_leaderboard_entries (when the leaderboard
+# buffer in api/leaderboard.py is flushed) and backfilled by
+# `python manage.py backfillhighscores`.
+HIGH_SCORE_FIELD = 'highScore'
+
+# Fields downloaded for the challenge list. Solutions can run to thousands
+# of words per board, so only the detail endpoint fetches them and the
+# board's tiles. The legacy fields (whose grids give an unmigrated board's
+# size) are only read until `manage.py migratechallenges` has rewritten
+# every document.
+CHALLENGE_LIST_FIELDS = [
+    'schemaVersion', 'challenge_id', 'name', 'description', 'type',
+    'size', 'timeLimit', 'wordGoal', 'createdAt',
+    'time_limit', 'word_goal', 'created_at', 'grid', 'array', 'board', 'Grid',
+]
+
+# Read-through caches: challenge definitions (grid, solutions, metadata)
+# almost never change, high scores do, so they expire separately. Uploads
+# call invalidate_challenge_cache(); see settings.CHALLENGE_CACHE_* for
+# TTLs and the optional shared Django cache backend.
+_challenge_cache = TTLCache(
+    'challenges',
+    ttl=getattr(settings, 'CHALLENGE_CACHE_TTL', 600),
+    stale_ttl=getattr(settings, 'CHALLENGE_CACHE_STALE_TTL', 60),
+    maxsize=getattr(settings, 'CHALLENGE_CACHE_MAXSIZE', 512),
+    backend=getattr(settings, 'CHALLENGE_CACHE_BACKEND', None),
+)
+_high_score_cache = TTLCache(
+    'high_scores',
+    ttl=getattr(settings, 'HIGH_SCORE_CACHE_TTL', 15),
+    stale_ttl=getattr(settings, 'CHALLENGE_CACHE_STALE_TTL', 60),
+    maxsize=getattr(settings, 'CHALLENGE_CACHE_MAXSIZE', 512),
+    backend=getattr(settings, 'CHALLENGE_CACHE_BACKEND', None),
+)
+# Top of each challenge's leaderboard, keyed by challenge id; dropped
+# whenever entries are written for that challenge
+_leaderboard_cache = TTLCache(
+    'leaderboards',
+    ttl=getattr(settings, 'LEADERBOARD_CACHE_TTL', 15),
+    maxsize=getattr(settings, 'CHALLENGE_CACHE_MAXSIZE', 512),
+    backend=getattr(settings, 'CHALLENGE_CACHE_BACKEND', None),
+)
+
+
+def _backend() -> str:
+    """settings.FIRESTORE_BACKEND: 'firebase' (default) or 'memory'."""
+    return getattr(settings, 'FIRESTORE_BACKEND', 'firebase')
+
+
+def sdk():
+    """The client library of the configured backend.
+
+    Both modules provide Query, FieldPath, DELETE_FIELD and transactional,
+    so the code below works against either.
+    """
+    return memory_firestore if _backend() == 'memory' else firestore
+
 
 def get_firestore_client():
     """Initialize and return Firestore client."""
     global _db
     
+    if _db is not None:
+        return _db
+    
+    if _backend() == 'memory':
+        _db = memory_firestore.Client()
+        return _db
+    
     if not FIREBASE_AVAILABLE:
         raise Exception(
             "firebase-admin is not installed. Please install it with: pip3 install firebase-admin"
         )
     
-    if _db is not None:
-        return _db
-    
     # Check if Firebase is already initialized
     if not firebase_admin._apps:
         # Try to get service account key path from settings
@@ -64,57 +145,109 @@ def get_firestore_client():
     return _db
 
 
-def get_all_challenges() -> List[Dict]:
-    """Get all active challenges from Firestore."""
+def reset_client():
+    """Drop the client and every cached read, e.g. after switching backends."""
+    global _db
+    _db = None
+    for cache in (_challenge_cache, _high_score_cache, _leaderboard_cache):
+        cache.invalidate()
+
+
+class BatchWriteError(Exception):
+    """Raised by write_batched when batches still failed after their retries."""
+
+    def __init__(self, failed: List, error: Exception):
+        super().__init__(f"{len(failed)} writes failed: {error}")
+        self.failed = failed
+
+
+def write_batched(db, items, write, workers: int = 1, retries: int = 0):
+    """Apply write(batch, item) to every item, committing every MAX_BATCH_WRITES writes.
+
+    Batches are committed workers at a time, and a failed commit is retried
+    up to retries more times with exponential backoff. Every batch is tried
+    before BatchWriteError reports the items of those that failed.
+    """
+    items = list(items)
+    batches = [items[i:i + MAX_BATCH_WRITES] for i in range(0, len(items), MAX_BATCH_WRITES)]
+
+    def commit(batch_items):
+        for attempt in range(retries + 1):
+            try:
+                batch = db.batch()
+                for item in batch_items:
+                    write(batch, item)
+                batch.commit()
+                return None
+            except Exception as e:
+                if attempt == retries:
+                    logger.error("Batch of %d writes failed after %d attempts: %s",
+                                 len(batch_items), attempt + 1, e)
+                    return e
+                delay = 0.5 * 2 ** attempt
+                logger.warning("Batch commit failed (%s); retrying in %.1fs", e, delay)
+                time.sleep(delay)
+
+    if workers > 1 and len(batches) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            errors = list(executor.map(commit, batches))
+    else:
+        errors = [commit(batch_items) for batch_items in batches]
+
+    failed, error = [], None
+    for batch_items, batch_error in zip(batches, errors):
+        if batch_error is not None:
+            failed.extend(batch_items)
+            error = batch_error
+    if failed:
+        raise BatchWriteError(failed, error) from error
+
+
+def get_all_challenges(include_high_scores: bool = True) -> List[Dict]:
+    """Get all active challenges (cached, see _challenge_cache).
+
+    High scores come from each document's denormalized highScore field,
+    read with one projected query and cached for HIGH_SCORE_CACHE_TTL.
+    Documents that have not been backfilled yet fall back to a leaderboard
+    query, unless include_high_scores is False, in which case their
+    high_score is left as None (see aget_all_challenges).
+    """
+    challenges = _challenge_cache.get('active', _load_all_challenges)
+    high_scores = _cached_high_scores()
+
+    result = []
+    for challenge in challenges:
+        challenge = dict(challenge)
+        if challenge['id'] in high_scores:
+            challenge['high_score'] = high_scores[challenge['id']]
+        elif include_high_scores:
+            challenge['high_score'] = _cached_high_score(challenge['id'])
+        else:
+            challenge['high_score'] = None
+        result.append(challenge)
+    return result
+
+
+def _load_all_challenges() -> List[Dict]:
+    """Read the list fields of every active challenge (no solutions or high scores)."""
     db = get_firestore_client()
     challenges_ref = db.collection('Challenges')
     
-    # Get all challenges first (to see what we have)
-    all_docs = list(challenges_ref.stream())
-    print(f"Total challenges in Firestore: {len(all_docs)}")
-    
-    # Debug: print first document structure if any exist
-    if all_docs:
-        first_doc = all_docs[0]
-        first_data = first_doc.to_dict()
-        print(f"Sample document ID: {first_doc.id}")
-        print(f"Sample document fields: {list(first_data.keys())}")
-        print(f"Sample isActive value: {first_data.get('isActive')} (type: {type(first_data.get('isActive'))})")
-    
-    # Filter for active challenges - check multiple possible field names and values
-    active_docs = []
-    for doc in all_docs:
-        data = doc.to_dict()
-        # Check multiple possible field names and values
-        is_active = (
-            data.get('isActive') == True or 
-            data.get('isActive') == 'true' or
-            data.get('isActive') == 'True' or
-            data.get('is_active') == True or
-            data.get('is_active') == 'true' or
-            data.get('is_active') == 'True' or
-            # If field doesn't exist, assume active (for backwards compatibility)
-            ('isActive' not in data and 'is_active' not in data)
-        )
-        if is_active:
-            active_docs.append(doc)
-    
-    print(f"Found {len(active_docs)} active challenges after filtering")
+    # isActive is a real boolean on every document (written by the uploader
+    # in the canonical layout, `manage.py migratechallenges` for older ones), so Firestore
+    # does the filtering and only the list fields are downloaded
+    query = challenges_ref.where('isActive', '==', True).select(CHALLENGE_LIST_FIELDS)
+    active_docs = list(query.stream())
+    logger.debug("Found %d active challenges", len(active_docs))
     
     challenges = []
     for doc in active_docs:
         try:
             challenge_data = doc.to_dict()
             challenge_data['id'] = doc.id
-            # Add high score if leaderboard exists (wrap in try-except to handle errors)
-            try:
-                challenge_data['high_score'] = get_challenge_high_score(doc.id)
-            except Exception as e:
-                print(f"Warning: Could not get high score for {doc.id}: {str(e)}")
-                challenge_data['high_score'] = None
             challenges.append(challenge_data)
         except Exception as e:
-            print(f"Error processing challenge document {doc.id}: {str(e)}")
+            logger.warning("Error processing challenge document %s: %s", doc.id, e)
             continue
     
     # Sort by createdAt if available (descending, newest first)
@@ -138,13 +271,23 @@ def get_all_challenges() -> List[Dict]:
     try:
         challenges.sort(key=get_created_at, reverse=True)
     except Exception as e:
-        print(f"Warning: Could not sort challenges: {str(e)}")
+        logger.warning("Could not sort challenges: %s", e)
     
     return challenges
 
 
 def get_challenge_by_id(challenge_id: str) -> Optional[Dict]:
-    """Get a specific challenge by ID."""
+    """Get a specific challenge by ID (cached, see _challenge_cache)."""
+    challenge = _challenge_cache.get(f'challenge:{challenge_id}', lambda: _load_challenge(challenge_id))
+    if challenge is None:
+        return None
+    challenge = dict(challenge)
+    challenge['high_score'] = _cached_high_score(challenge_id)
+    return challenge
+
+
+def _load_challenge(challenge_id: str) -> Optional[Dict]:
+    """Read one challenge from Firestore (without its high score)."""
     db = get_firestore_client()
     doc_ref = db.collection('Challenges').document(challenge_id)
     doc = doc_ref.get()
@@ -152,69 +295,328 @@ def get_challenge_by_id(challenge_id: str) -> Optional[Dict]:
     if doc.exists:
         challenge_data = doc.to_dict()
         challenge_data['id'] = doc.id
+        logger.debug("Retrieved challenge %s with fields %s", challenge_id, challenge_data.keys())
         
-        # Debug: Print challenge data for troubleshooting
-        print(f"DEBUG: Retrieved challenge {challenge_id}")
-        print(f"DEBUG: Challenge fields: {list(challenge_data.keys())}")
-        grid_raw = challenge_data.get('grid') or challenge_data.get('array')
-        print(f"DEBUG: Grid field type: {type(challenge_data.get('grid'))}, Grid value: {str(challenge_data.get('grid'))[:200] if challenge_data.get('grid') else 'None'}")
-        if 'array' in challenge_data:
-            print(f"DEBUG: Array field type: {type(challenge_data.get('array'))}, Array value: {str(challenge_data.get('array'))[:200] if challenge_data.get('array') else 'None'}")
-        
-        # Add high score
-        challenge_data['high_score'] = get_challenge_high_score(challenge_id)
+        # High scores are cached separately (they change far more often)
+        challenge_data.pop(HIGH_SCORE_FIELD, None)
         return challenge_data
-    else:
-        print(f"DEBUG: Challenge {challenge_id} not found in Firestore")
+    logger.debug("Challenge %s not found in Firestore", challenge_id)
     return None
 
 
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _run_blocking(func, *args, **kwargs):
+    """Run a blocking Firestore call on the bounded Firestore thread pool.
+
+    The pool has settings.FIRESTORE_MAX_CONCURRENCY threads, which caps the
+    number of queries in flight from the async views.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'FIRESTORE_MAX_CONCURRENCY', 10),
+                thread_name_prefix='firestore',
+            )
+    loop = asyncio.get_running_loop()
+    return loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+
+async def aget_all_challenges() -> List[Dict]:
+    """Async get_all_challenges.
+
+    Challenges carrying the denormalized highScore field need no further
+    queries; for any not yet backfilled, the leaderboard lookups run
+    concurrently (at most FIRESTORE_MAX_CONCURRENCY in flight).
+    """
+    challenges = await _run_blocking(get_all_challenges, include_high_scores=False)
+    denormalized = await _run_blocking(_cached_high_scores)
+    missing = [challenge for challenge in challenges if challenge['id'] not in denormalized]
+    high_scores = await asyncio.gather(
+        *(_run_blocking(_cached_high_score, challenge['id']) for challenge in missing)
+    )
+    for challenge, high_score in zip(missing, high_scores):
+        challenge['high_score'] = high_score
+    return challenges
+
+
+async def aget_challenge_by_id(challenge_id: str) -> Optional[Dict]:
+    """Async get_challenge_by_id."""
+    return await _run_blocking(get_challenge_by_id, challenge_id)
+
+
+def _cached_high_scores() -> Dict[str, Optional[Dict]]:
+    """challenge id -> high_score for every challenge with a highScore field."""
+    return _high_score_cache.get('denormalized', _load_high_scores)
+
+
+def _load_high_scores() -> Dict[str, Optional[Dict]]:
+    """Read every active challenge's highScore with one projected query."""
+    db = get_firestore_client()
+    high_scores = {}
+    query = db.collection('Challenges').where('isActive', '==', True).select([HIGH_SCORE_FIELD])
+    for doc in query.stream():
+        data = doc.to_dict() or {}
+        if HIGH_SCORE_FIELD in data:
+            high_scores[doc.id] = _high_score_for_api(data[HIGH_SCORE_FIELD])
+    return high_scores
+
+
+def _cached_high_score(challenge_id: str) -> Optional[Dict]:
+    """High score for one challenge, cached for HIGH_SCORE_CACHE_TTL."""
+    return _high_score_cache.get(f'challenge:{challenge_id}', lambda: _load_high_score(challenge_id))
+
+
+def _load_high_score(challenge_id: str) -> Optional[Dict]:
+    """Read a challenge's highScore field, or query its leaderboard if it has none."""
+    db = get_firestore_client()
+    doc = db.collection('Challenges').document(challenge_id).get(field_paths=[HIGH_SCORE_FIELD])
+    data = (doc.to_dict() or {}) if doc.exists else {}
+    if HIGH_SCORE_FIELD in data:
+        return _high_score_for_api(data[HIGH_SCORE_FIELD])
+    # Not backfilled yet (see `manage.py backfillhighscores`)
+    record_fallback('high_score.leaderboard_query', challenge_id)
+    return get_challenge_high_score(challenge_id)
+
+
+def invalidate_challenge_cache(challenge_id: str = None, high_scores_only: bool = False):
+    """Drop cached challenge reads so the next request goes to Firestore.
+
+    With a challenge_id only that challenge (and the list containing it) is
+    dropped; without one everything is. Upload scripts call this after
+    writing challenges, and leaderboard writes call it with
+    high_scores_only=True, which also drops the cached leaderboard pages.
+
+    Without a shared CHALLENGE_CACHE_BACKEND only this process's caches
+    are cleared, so a warning is logged when challenges are invalidated:
+    other processes (e.g. the web workers, when an upload runs from a
+    command) keep serving them until they expire.
+    """
+    if not high_scores_only and not _challenge_cache.shared:
+        logger.warning(
+            "CHALLENGE_CACHE_BACKEND is not a shared cache, so cached challenges were only "
+            "invalidated in this process; other processes serve them for up to %ss more",
+            _challenge_cache.ttl + _challenge_cache.stale_ttl,
+        )
+    if challenge_id is None:
+        _high_score_cache.invalidate()
+        _leaderboard_cache.invalidate()
+        if not high_scores_only:
+            _challenge_cache.invalidate()
+        return
+    _high_score_cache.invalidate(f'challenge:{challenge_id}')
+    _high_score_cache.invalidate('denormalized')
+    _leaderboard_cache.invalidate(challenge_id)
+    if not high_scores_only:
+        _challenge_cache.invalidate(f'challenge:{challenge_id}')
+        _challenge_cache.invalidate('active')
+
+
 def get_challenge_high_score(challenge_id: str) -> Optional[Dict]:
     """Get the highest score for a challenge from leaderboard."""
     try:
-        db = get_firestore_client()
-        leaderboard_ref = db.collection('leaderboards').document(challenge_id).collection('entries')
-        
-        # Get top entry ordered by score descending, then by time_taken ascending
-        try:
-            query = leaderboard_ref.order_by('score', direction=firestore.Query.DESCENDING).order_by('timeTaken').limit(1)
-            docs = list(query.stream())
-        except Exception as e:
-            # If ordering fails (maybe index missing), try just by score
-            print(f"Warning: Could not order leaderboard by score and timeTaken: {str(e)}")
-            try:
-                query = leaderboard_ref.order_by('score', direction=firestore.Query.DESCENDING).limit(1)
-                docs = list(query.stream())
-            except Exception as e2:
-                # If that fails, just get all entries and sort in Python
-                print(f"Warning: Could not order leaderboard: {str(e2)}, getting all entries")
-                docs = list(leaderboard_ref.stream())
-                if docs:
-                    # Sort in Python
-                    docs.sort(key=lambda d: d.to_dict().get('score', 0), reverse=True)
-                    docs = docs[:1]
-        
-        if docs:
-            top_entry = docs[0].to_dict()
-            return {
-                'score': top_entry.get('score', 0),
-                'username': top_entry.get('username', ''),
-                'words_found': top_entry.get('wordsFound', 0)
-            }
-        return None
+        return _high_score_for_api(_get_top_entry(challenge_id))
     except Exception as e:
         # If leaderboard doesn't exist or any other error, return None
-        print(f"Error getting high score for {challenge_id}: {str(e)}")
+        logger.warning("Error getting high score for %s: %s", challenge_id, e)
+        return None
+
+
+def _get_top_entry(challenge_id: str, transaction=None) -> Optional[Dict]:
+    """Query the leaderboard for a challenge's best entry (within transaction, if given)."""
+    db = get_firestore_client()
+    leaderboard_ref = db.collection('leaderboards').document(challenge_id).collection('entries')
+    
+    # Get top entry ordered by score descending, then by time_taken ascending
+    try:
+        query = leaderboard_ref.order_by('score', direction=sdk().Query.DESCENDING).order_by('timeTaken').limit(1)
+        docs = list(query.stream(transaction=transaction))
+    except Exception as e:
+        # If ordering fails (maybe index missing), try just by score
+        logger.debug("Could not order leaderboard by score and timeTaken: %s", e)
+        record_fallback('leaderboard.order_by_score_only', challenge_id)
+        try:
+            query = leaderboard_ref.order_by('score', direction=sdk().Query.DESCENDING).limit(1)
+            docs = list(query.stream(transaction=transaction))
+        except Exception as e2:
+            # If that fails, just get all entries and sort in Python
+            logger.debug("Could not order leaderboard: %s; getting all entries", e2)
+            record_fallback('leaderboard.sort_in_python', challenge_id)
+            docs = list(leaderboard_ref.stream(transaction=transaction))
+            if docs:
+                # Sort in Python
+                docs.sort(key=lambda d: d.to_dict().get('score', 0), reverse=True)
+                docs = docs[:1]
+    
+    if docs:
+        return _high_score_summary(docs[0].to_dict())
+    return None
+
+
+def _high_score_summary(entry: Dict) -> Dict:
+    """The fields of a leaderboard entry stored in a challenge's highScore."""
+    return {
+        'score': entry.get('score', 0),
+        'username': entry.get('username', ''),
+        'wordsFound': entry.get('wordsFound', 0),
+        'timeTaken': entry.get('timeTaken'),
+    }
+
+
+def _high_score_for_api(high_score: Optional[Dict]) -> Optional[Dict]:
+    """Convert a stored highScore to the API's high_score format."""
+    if not high_score:
         return None
+    return {
+        'score': high_score.get('score', 0),
+        'username': high_score.get('username', ''),
+        'words_found': high_score.get('wordsFound', 0)
+    }
+
+
+def is_better_score(entry: Dict, current: Optional[Dict]) -> bool:
+    """True if entry beats current: higher score, then lower timeTaken."""
+    if not current:
+        return True
+    if entry.get('score', 0) != current.get('score', 0):
+        return entry.get('score', 0) > current.get('score', 0)
+    current_time = current.get('timeTaken')
+    return current_time is None or (
+        entry.get('timeTaken') is not None and entry['timeTaken'] < current_time
+    )
+
+
+def add_leaderboard_entries(challenge_id: str, entries: Dict[str, Dict]) -> int:
+    """Write many leaderboard entries for one challenge (see api/leaderboard.py).
+
+    entries maps entry id -> entry. An entry only replaces the stored
+    document with its id if it beats it (see is_better_score); leaderboard
+    derives the id from the user, so each user keeps their best entry. The
+    check reads outside the write, so two processes flushing the same user
+    at once may keep the later rather than the better entry.
+
+    The entries are written with batched writes (see write_batched), each
+    to its own document, then the challenge's highScore is compared with
+    only the best of them in a single transaction. A burst of submissions
+    therefore costs one write to the challenge document rather than one
+    each, keeping it well under Firestore's sustained per-document write
+    rate. Entry ids are chosen by the caller, so retrying a failed call
+    cannot duplicate entries.
+
+    Returns:
+    int: Number of entries written.
+    """
+    if not entries:
+        return 0
+    db = get_firestore_client()
+    entries_ref = db.collection('leaderboards').document(challenge_id).collection('entries')
+    entries = {
+        entry_id: entry for entry_id, entry in entries.items()
+        if is_better_score(entry, entries_ref.document(entry_id).get(field_paths=['score', 'timeTaken']).to_dict())
+    }
+    if not entries:
+        return 0
+    write_batched(db, entries.items(), lambda batch, item: batch.set(entries_ref.document(item[0]), item[1]))
+
+    best = None
+    for entry in entries.values():
+        if is_better_score(entry, best):
+            best = entry
+    challenge_ref = db.collection('Challenges').document(challenge_id)
+
+    @sdk().transactional
+    def update_high_score(transaction):
+        snapshot = challenge_ref.get(transaction=transaction)
+        if snapshot.exists:
+            current = (snapshot.to_dict() or {}).get(HIGH_SCORE_FIELD)
+            if is_better_score(best, current):
+                transaction.update(challenge_ref, {HIGH_SCORE_FIELD: _high_score_summary(best)})
+
+    update_high_score(db.transaction())
+    invalidate_challenge_cache(challenge_id, high_scores_only=True)
+    return len(entries)
+
+
+def backfill_high_score(challenge_id: str) -> Optional[Dict]:
+    """Recompute a challenge's highScore field from its leaderboard.
+
+    The leaderboard and the challenge are read in the same transaction as
+    the write, as leaderboard writes do, so a high score recorded
+    concurrently is not overwritten with an older one. The field is only
+    written if it differs.
+    """
+    db = get_firestore_client()
+    challenge_ref = db.collection('Challenges').document(challenge_id)
+
+    @sdk().transactional
+    def backfill(transaction):
+        top_entry = _get_top_entry(challenge_id, transaction=transaction)
+        snapshot = challenge_ref.get(transaction=transaction)
+        if snapshot.exists and (snapshot.to_dict() or {}).get(HIGH_SCORE_FIELD) != top_entry:
+            transaction.update(challenge_ref, {HIGH_SCORE_FIELD: top_entry})
+        return top_entry
 
+    top_entry = backfill(db.transaction())
+    invalidate_challenge_cache(challenge_id, high_scores_only=True)
+    return top_entry
 
-def get_challenge_leaderboard(challenge_id: str, limit: int = 100) -> List[Dict]:
-    """Get leaderboard entries for a challenge."""
+
+def migrate_challenges(dry_run: bool = False):
+    """Rewrite every challenge not yet in the canonical layout (see challenge_schema).
+
+    Legacy fields are deleted and the canonical ones written in place, so
+    highScore is left untouched. Documents whose grid cannot be parsed are
+    skipped.
+
+    Returns:
+    tuple[list[str], list[str]]: Ids of the migrated (or, with dry_run,
+    to-be-migrated) challenges and of the skipped ones.
+    """
+    db = get_firestore_client()
+    updates = []
+    skipped = []
+    for doc in db.collection('Challenges').stream():
+        data = doc.to_dict() or {}
+        if is_current(data):
+            continue
+        document = canonical_challenge(data, doc.id)
+        if not document['tiles']:
+            skipped.append(doc.id)
+            continue
+        for field in LEGACY_FIELDS:
+            if field in data:
+                document[field] = sdk().DELETE_FIELD
+        updates.append((doc.reference, document))
+
+    if not dry_run:
+        write_batched(db, updates, lambda batch, update: batch.update(*update))
+        if updates:
+            invalidate_challenge_cache()
+    return [doc_ref.id for doc_ref, _ in updates], skipped
+
+
+def get_challenge_leaderboard(challenge_id: str, limit: int = 100, start_after=None) -> List[Dict]:
+    """Get leaderboard entries for a challenge, best first.
+
+    Entries are ordered by score (descending), timeTaken, then document id,
+    so every entry has a unique position. start_after is the
+    (score, timeTaken, id) of the last entry already seen; the query
+    continues after it instead of re-reading the entries before it.
+    """
     db = get_firestore_client()
     leaderboard_ref = db.collection('leaderboards').document(challenge_id).collection('entries')
     
-    query = leaderboard_ref.order_by('score', direction=firestore.Query.DESCENDING).order_by('timeTaken').limit(limit)
-    docs = query.stream()
+    query = (
+        leaderboard_ref.order_by('score', direction=sdk().Query.DESCENDING)
+        .order_by('timeTaken')
+        .order_by(sdk().FieldPath.document_id())
+    )
+    if start_after is not None:
+        query = query.start_after(list(start_after))
+    docs = query.limit(limit).stream()
     
     entries = []
     for doc in docs:
@@ -225,165 +627,40 @@ def get_challenge_leaderboard(challenge_id: str, limit: int = 100) -> List[Dict]
     return entries
 
 
-def format_challenge_for_api(challenge_data: Dict) -> Dict:
-    """Format challenge data from Firestore to match API response format."""
-    import json
-    import re
-    
-    challenge_id = challenge_data.get('id') or challenge_data.get('challenge_id', 'unknown')
-    
-    # Handle both camelCase and snake_case field names
-    # Check multiple possible field names for grid (sometimes it might be stored under different names)
-    grid = challenge_data.get('grid') or challenge_data.get('array') or challenge_data.get('board') or challenge_data.get('Grid') or []
-    solutions = challenge_data.get('solutions', [])
-    
-    # If grid is still missing, log all available fields for debugging
-    if not grid or (isinstance(grid, list) and len(grid) == 0):
-        print(f"WARNING [{challenge_id}]: Grid field not found or empty. Available fields: {list(challenge_data.keys())}")
-        # Check if 'array' field exists and might be the grid
-        if 'array' in challenge_data:
-            print(f"WARNING [{challenge_id}]: Found 'array' field, type: {type(challenge_data.get('array'))}, value: {str(challenge_data.get('array'))[:200]}")
-            # Try using array as grid
-            grid = challenge_data.get('array', [])
-    
-    print(f"DEBUG [{challenge_id}]: Raw grid type: {type(grid)}, length: {len(grid) if isinstance(grid, (list, str)) else 'N/A'}")
-    if isinstance(grid, list) and len(grid) > 0:
-        print(f"DEBUG [{challenge_id}]: First grid element type: {type(grid[0])}, value: {grid[0] if len(str(grid[0])) < 50 else str(grid[0])[:50]}")
-    elif grid is None:
-        print(f"DEBUG [{challenge_id}]: Grid is None!")
-    elif grid == []:
-        print(f"DEBUG [{challenge_id}]: Grid is empty list!")
-    
-    # Handle grid - might be string, list, or already formatted
-    if isinstance(grid, str):
-        try:
-            grid = json.loads(grid)
-            print(f"Parsed grid from JSON string")
-        except json.JSONDecodeError:
-            # If it's a string representation of an array, try to extract letters
-            print(f"Warning: Grid is a string but not valid JSON, trying to extract letters")
-            # Extract all letters and assume square grid
-            letters = re.findall(r'[A-Za-z]', grid)
-            if letters:
-                grid_size = int(len(letters) ** 0.5)
-                if grid_size * grid_size == len(letters):
-                    grid = [[letters[i * grid_size + j].upper() for j in range(grid_size)] for i in range(grid_size)]
-                    print(f"Extracted {grid_size}x{grid_size} grid from string")
-                else:
-                    grid = []
-            else:
-                grid = []
-    elif not isinstance(grid, list):
-        print(f"Warning: Grid is not a list, got {type(grid)}, value: {str(grid)[:100]}")
-        grid = []
-    
-    # Convert grid to 2D array if needed
-    if grid and len(grid) > 0:
-        if not isinstance(grid[0], list):
-            # Grid is a 1D array - try to convert to 2D
-            # If first element is a string, assume each element is a row string
-            if isinstance(grid[0], str):
-                print(f"DEBUG [{challenge_id}]: Converting 1D array of strings to 2D array")
-                # Clean each row string - remove quotes, brackets, commas, and spaces, keep only letters
-                grid = [[char.upper() for char in re.sub(r'[^A-Za-z]', '', row)] for row in grid]
-                # Filter out empty rows
-                grid = [row for row in grid if row]
-                print(f"DEBUG [{challenge_id}]: After conversion, grid has {len(grid)} rows")
-            else:
-                # Try to determine grid size (assume square grid)
-                # Calculate size from total length
-                total_chars = sum(len(str(item)) for item in grid) if grid else 0
-                grid_size = int(total_chars ** 0.5)
-                if grid_size * grid_size == total_chars:
-                    # Flatten and reshape
-                    flat = []
-                    for item in grid:
-                        flat.extend(list(str(item)))
-                    grid = [flat[i:i+grid_size] for i in range(0, len(flat), grid_size)]
-                    print(f"DEBUG [{challenge_id}]: Reshaped 1D array to {grid_size}x{grid_size} grid")
-                else:
-                    print(f"WARNING [{challenge_id}]: Cannot convert grid to 2D array. First element type: {type(grid[0])}, first value: {grid[0][:50] if isinstance(grid[0], str) else grid[0]}")
-                    print(f"WARNING [{challenge_id}]: Total chars: {total_chars}, calculated size: {grid_size}")
-                    grid = []
-        else:
-            # Already a 2D array, but make sure inner arrays contain strings/characters
-            # Clean each cell - convert to string, uppercase, and filter out non-letter characters
-            grid = [[re.sub(r'[^A-Za-z]', '', str(cell).upper()) for cell in row] for row in grid]
-            # Filter out empty cells from rows (though this shouldn't happen)
-            grid = [[cell for cell in row if cell] for row in grid]
-            # Filter out empty rows
-            grid = [row for row in grid if row]
-            print(f"DEBUG [{challenge_id}]: Cleaned 2D array, final shape: {len(grid)}x{len(grid[0]) if grid else 0}")
-    else:
-        print(f"ERROR [{challenge_id}]: Grid is empty or None after parsing! Original: {challenge_data.get('grid', 'missing')}")
-    
-    # Handle solutions - might be string, list, or already formatted
-    print(f"DEBUG [{challenge_id}]: Raw solutions type: {type(solutions)}, length: {len(solutions) if isinstance(solutions, (list, str)) else 'N/A'}")
-    if isinstance(solutions, str):
-        try:
-            solutions = json.loads(solutions)
-            print(f"DEBUG [{challenge_id}]: Parsed solutions from JSON string, length: {len(solutions) if isinstance(solutions, list) else 'N/A'}")
-        except json.JSONDecodeError:
-            print(f"WARNING [{challenge_id}]: Solutions is a string but not valid JSON")
-            solutions = []
-    elif isinstance(solutions, list):
-        # Check if it's a list containing a JSON string (common Firestore storage format)
-        if len(solutions) == 1 and isinstance(solutions[0], str):
-            string_value = solutions[0]
-            print(f"DEBUG [{challenge_id}]: Solutions is a list with one string element, length: {len(string_value)}, value preview: {string_value[:100] if string_value else 'EMPTY'}")
-            
-            # Check if it's an empty string
-            if not string_value or not string_value.strip():
-                print(f"ERROR [{challenge_id}]: Solutions list contains an empty string! Firestore data is corrupted.")
-                solutions = []
-            else:
-                # Might be a JSON string inside a list - try to parse it
-                try:
-                    parsed = json.loads(string_value)
-                    if isinstance(parsed, list):
-                        print(f"DEBUG [{challenge_id}]: Solutions was a list containing a JSON string, parsed to {len(parsed)} items")
-                        solutions = parsed
-                    else:
-                        print(f"DEBUG [{challenge_id}]: Solutions list[0] is a string but not a JSON array, type: {type(parsed)}")
-                        solutions = []
-                except (json.JSONDecodeError, TypeError) as e:
-                    # Not JSON, might just be a regular string or the actual data
-                    print(f"DEBUG [{challenge_id}]: Solutions is a list with one string element (not JSON), parse error: {e}")
-                    print(f"DEBUG [{challenge_id}]: Trying to treat as comma-separated or split by spaces...")
-                    # Try splitting by common delimiters if it looks like a list
-                    if ',' in string_value:
-                        solutions = [w.strip() for w in string_value.split(',') if w.strip()]
-                        print(f"DEBUG [{challenge_id}]: Split by comma, got {len(solutions)} items")
-                    else:
-                        solutions = []
-        # If it's already a list of strings/items, continue with it
-    else:
-        print(f"WARNING [{challenge_id}]: Solutions is not a list or string, got {type(solutions)}, value: {str(solutions)[:200] if solutions else 'None'}")
-        solutions = []
-    
-    # Filter out empty strings, None values, and ensure all are strings
-    if isinstance(solutions, list):
-        original_count = len(solutions)
-        solutions = [str(word).strip().upper() for word in solutions if word and str(word).strip()]
-        if len(solutions) != original_count:
-            print(f"DEBUG [{challenge_id}]: Filtered solutions from {original_count} to {len(solutions)} (removed empty/None values)")
-    
-    print(f"DEBUG [{challenge_id}]: Final solutions count: {len(solutions) if isinstance(solutions, list) else 0}")
-    if isinstance(solutions, list) and len(solutions) > 0:
-        print(f"DEBUG [{challenge_id}]: Sample solutions (first 5): {solutions[:5]}")
-    elif isinstance(solutions, list) and len(solutions) == 0:
-        print(f"ERROR [{challenge_id}]: Solutions array is empty! This will cause validation issues.")
-    print(f"DEBUG [{challenge_id}]: Final formatted grid type: {type(grid)}, length: {len(grid) if grid else 0}, is 2D: {grid and len(grid) > 0 and isinstance(grid[0], list) if grid else False}")
-    
-    return {
-        "id": challenge_data.get('id'),
-        "challenge_id": challenge_data.get('id') or challenge_data.get('challenge_id'),
-        "name": challenge_data.get('name'),
-        "description": challenge_data.get('description'),
-        "challenge_type": challenge_data.get('type'),  # Firestore uses 'type'
-        "time_limit": challenge_data.get('timeLimit') or challenge_data.get('time_limit'),  # Handle both cases
-        "word_goal": challenge_data.get('wordGoal') or challenge_data.get('word_goal'),  # Handle both cases
-        "grid": grid,
-        "solutions": solutions,
-        "high_score": challenge_data.get('high_score')
-    }
+def get_leaderboard_page(challenge_id: str, limit: int, start_after=None):
+    """One page of a challenge's leaderboard.
+
+    The first LEADERBOARD_CACHED_ENTRIES entries are cached (see
+    _leaderboard_cache), so first pages of up to that size need no query.
+
+    Returns:
+    tuple[list[dict], bool]: The entries and whether more follow.
+    """
+    cached = getattr(settings, 'LEADERBOARD_CACHED_ENTRIES', 100)
+    if start_after is None and limit <= cached:
+        top = _leaderboard_cache.get(
+            challenge_id, lambda: get_challenge_leaderboard(challenge_id, cached + 1)
+        )
+        return top[:limit], len(top) > limit
+    entries = get_challenge_leaderboard(challenge_id, limit + 1, start_after)
+    return entries[:limit], len(entries) > limit
+
+
+async def aget_leaderboard_page(challenge_id: str, limit: int, start_after=None):
+    """Async get_leaderboard_page."""
+    return await _run_blocking(get_leaderboard_page, challenge_id, limit, start_after)
+
+
+def format_challenge_for_api(challenge_data: Dict, include_solutions: bool = True,
+                             include_grid: bool = True) -> Dict:
+    """Format challenge data from Firestore to match API response format.
+
+    Canonical documents are returned as stored; older ones are converted
+    first (see challenge_schema). List views pass include_solutions=False
+    and include_grid=False: their documents are read without solutions or
+    tiles (see CHALLENGE_LIST_FIELDS) and the keys are omitted.
+    """
+    if not is_current(challenge_data):
+        record_fallback('challenge.legacy_schema', challenge_data.get('id'))
+        challenge_data = dict(challenge_data, **canonical_challenge(challenge_data))
+    return challenge_for_api(challenge_data, include_solutions, include_grid)
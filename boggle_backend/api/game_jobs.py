@@ -0,0 +1,151 @@
+"""
+Asynchronous game creation.
+
+The async create endpoint records a GameJob and hands it to a bounded
+thread pool, returning immediately; clients poll the job until it links to
+the finished Games record. Jobs live in the database so any worker process
+can answer a poll.
+
+- Jobs are deduplicated by the client's Idempotency-Key: a repeated request
+  with the same key returns the existing job instead of solving again. A
+  key reused for a different size is rejected rather than answered with
+  the other board. Keys expire after settings.GAME_JOB_KEY_TTL seconds,
+  after which the key starts a new job.
+- At most settings.GAME_JOB_MAX_PENDING jobs may wait at once.
+- A job not finished within settings.GAME_JOB_TIMEOUT seconds is marked
+  failed, and a late result is discarded.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections
+from django.utils import timezone
+
+from .board_pool import next_board, random_game_name
+from .models import GameJob, Games
+
+_executor = None
+_executor_lock = threading.Lock()
+
+ACTIVE = (GameJob.PENDING, GameJob.RUNNING)
+
+
+class JobQueueFull(Exception):
+    """Raised when too many jobs are already waiting."""
+
+
+class IdempotencyKeyReused(Exception):
+    """Raised when an Idempotency-Key already belongs to a job with other parameters."""
+
+
+def job_timeout() -> timedelta:
+    return timedelta(seconds=getattr(settings, 'GAME_JOB_TIMEOUT', 60))
+
+
+def job_key_ttl() -> timedelta:
+    return timedelta(seconds=getattr(settings, 'GAME_JOB_KEY_TTL', 24 * 60 * 60))
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'GAME_JOB_WORKERS', 2),
+                thread_name_prefix='game-job',
+            )
+        return _executor
+
+
+def submit_job(size: int, key: str = None):
+    """
+    Create (or reuse) a job that builds a game of the given size.
+
+    Returns:
+    tuple[GameJob, bool]: The job and whether it was newly created.
+
+    Raises:
+    JobQueueFull: If settings.GAME_JOB_MAX_PENDING jobs are already active.
+    IdempotencyKeyReused: If key was used before for a different size.
+    """
+    if key:
+        # Release an expired key from its old job, which stays pollable by id
+        GameJob.objects.filter(key=key, created_at__lt=timezone.now() - job_key_ttl()).update(key=None)
+        existing = GameJob.objects.filter(key=key).first()
+        if existing is not None:
+            return _same_request(existing, size), False
+
+    cutoff = timezone.now() - job_timeout()
+    active = GameJob.objects.filter(status__in=ACTIVE, created_at__gte=cutoff).count()
+    if active >= getattr(settings, 'GAME_JOB_MAX_PENDING', 50):
+        raise JobQueueFull("Too many games are being created, try again shortly")
+
+    try:
+        job = GameJob.objects.create(size=size, key=key or None)
+    except IntegrityError:
+        # Another request with the same key won the race
+        return _same_request(GameJob.objects.get(key=key), size), False
+
+    _get_executor().submit(_run_job, job.pk)
+    return job, True
+
+
+def _same_request(job, size):
+    """Return job if it was created for the same parameters."""
+    if job.size != size:
+        raise IdempotencyKeyReused(
+            f"Idempotency-Key was already used for a {job.size}x{job.size} game"
+        )
+    return job
+
+
+def _run_job(job_id):
+    """Executor task: build the game for a job unless it has timed out."""
+    try:
+        job = GameJob.objects.get(pk=job_id)
+        if timezone.now() - job.created_at > job_timeout():
+            _fail(job_id, "Timed out")
+            return
+
+        claimed = GameJob.objects.filter(pk=job_id, status=GameJob.PENDING).update(
+            status=GameJob.RUNNING, updated_at=timezone.now()
+        )
+        if not claimed:
+            return
+
+        grid, solution = next_board(job.size)
+        game = Games.objects.create(
+            name=random_game_name(job.size),
+            size=job.size,
+            grid=grid,
+            solution=solution,
+        )
+
+        # A poll may have timed the job out while it was running
+        finished = GameJob.objects.filter(pk=job_id, status=GameJob.RUNNING).update(
+            status=GameJob.DONE, game=game, updated_at=timezone.now()
+        )
+        if not finished:
+            game.delete()
+    except Exception as e:
+        _fail(job_id, str(e))
+    finally:
+        close_old_connections()
+
+
+def _fail(job_id, error):
+    GameJob.objects.filter(pk=job_id, status__in=ACTIVE).update(
+        status=GameJob.FAILED, error=error, updated_at=timezone.now()
+    )
+
+
+def get_job(job_id):
+    """Return the job (with its game), failing it first if it has timed out."""
+    job = GameJob.objects.select_related('game').filter(pk=job_id).first()
+    if job is not None and job.status in ACTIVE and timezone.now() - job.created_at > job_timeout():
+        _fail(job.pk, "Timed out")
+        job.refresh_from_db()
+    return job
@@ -0,0 +1,243 @@
+"""
+Score submissions for challenge leaderboards.
+
+build_entry() checks a submission against the challenge's stored solutions
+and scores it server-side, so clients cannot post arbitrary scores.
+submit_entry() buffers the entry in memory under an id derived from the
+user, so each user has one entry per leaderboard, holding their best
+score (a later, worse submission is dropped). A background thread flushes
+the buffer every settings.LEADERBOARD_FLUSH_INTERVAL seconds, or as soon
+as settings.LEADERBOARD_FLUSH_SIZE entries are waiting, with one
+firestore_service.add_leaderboard_entries() call per challenge (batched
+entry writes plus one highScore transaction).
+
+Entries still buffered when the process dies are lost; the buffer is
+flushed at interpreter exit, and LEADERBOARD_FLUSH_INTERVAL bounds how
+much a crash can drop.
+
+Leaderboards are read a page at a time. encode_cursor() turns the last
+entry of a page into an opaque token; decode_cursor() turns it back into
+the (score, timeTaken, id) that firestore_service.get_leaderboard_page
+continues after, plus the rank reached so far.
+"""
+
+import atexit
+import base64
+import binascii
+import hashlib
+import json
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict, List
+
+from django.conf import settings
+from django.utils import timezone
+
+from .firestore_service import add_leaderboard_entries, is_better_score
+
+logger = logging.getLogger(__name__)
+
+_buffer = []  # (challenge id, entry id, entry) waiting to be written
+_buffer_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_flush_requested = threading.Event()
+_flusher = None
+
+
+class InvalidSubmission(Exception):
+    """Raised when a score submission is malformed."""
+
+
+class InvalidCursor(Exception):
+    """Raised when a leaderboard cursor cannot be decoded."""
+
+
+def flush_interval() -> float:
+    return getattr(settings, 'LEADERBOARD_FLUSH_INTERVAL', 2)
+
+
+def flush_size() -> int:
+    return getattr(settings, 'LEADERBOARD_FLUSH_SIZE', 200)
+
+
+def word_score(word: str) -> int:
+    """Points for one word, as the frontend's Score component counts them."""
+    length = len(word)
+    if length <= 4:
+        return 1
+    if length == 5:
+        return 2
+    if length == 6:
+        return 3
+    if length == 7:
+        return 5
+    return 11
+
+
+def build_entry(challenge: Dict, submission: Dict):
+    """
+    Validate and score a submission for a formatted challenge.
+
+    Parameters:
+    challenge (dict): The challenge as returned by format_challenge_for_api.
+    submission (dict): Request data with user_id, username, words (list of
+        str) and time_taken (seconds).
+
+    Returns:
+    tuple[dict, list[str]]: The leaderboard entry (Firestore field names)
+    and the submitted words that are not solutions of the challenge, which
+    are left out of the score.
+
+    Raises:
+    InvalidSubmission: If a field is missing or has the wrong type.
+    """
+    user_id = submission.get('user_id')
+    username = submission.get('username')
+    words = submission.get('words')
+    time_taken = submission.get('time_taken')
+    if not isinstance(user_id, str) or not user_id.strip():
+        raise InvalidSubmission("user_id is required")
+    if not isinstance(username, str) or not username.strip():
+        raise InvalidSubmission("username is required")
+    if not isinstance(words, list) or not all(isinstance(word, str) for word in words):
+        raise InvalidSubmission("words must be a list of strings")
+    if isinstance(time_taken, bool) or not isinstance(time_taken, (int, float)) or time_taken < 0:
+        raise InvalidSubmission("time_taken must be a non-negative number of seconds")
+
+    solutions = set(challenge.get('solutions') or [])
+    submitted = {word.strip().upper() for word in words if word.strip()}
+    valid = sorted(submitted & solutions)
+    rejected = sorted(submitted - solutions)
+
+    entry = {
+        'userId': user_id.strip(),
+        'username': username.strip(),
+        'score': sum(word_score(word) for word in valid),
+        'wordsFound': len(valid),
+        'words': valid,
+        'timeTaken': time_taken,
+        'submittedAt': timezone.now(),
+    }
+    return entry, rejected
+
+
+def user_entry_id(user_id: str) -> str:
+    """Leaderboard document id of a user's entry (user ids may hold '/')."""
+    return hashlib.sha256(user_id.encode()).hexdigest()[:32]
+
+
+def submit_entry(challenge_id: str, entry: Dict) -> str:
+    """Buffer an entry for the next flush; returns the id it will be stored under."""
+    entry_id = user_entry_id(entry['userId'])
+    with _buffer_lock:
+        _buffer.append((challenge_id, entry_id, entry))
+        waiting = len(_buffer)
+    _ensure_flusher()
+    if waiting >= flush_size():
+        _flush_requested.set()
+    return entry_id
+
+
+def flush() -> int:
+    """
+    Write every buffered entry to Firestore now.
+
+    Entries for a challenge whose write fails go back into the buffer and
+    are retried on the next flush.
+
+    Returns:
+    int: Number of entries written.
+    """
+    with _flush_lock:
+        with _buffer_lock:
+            pending = _buffer[:]
+            del _buffer[:]
+
+        # Of a user's buffered entries for a challenge, only the best is sent
+        by_challenge = defaultdict(dict)
+        for challenge_id, entry_id, entry in pending:
+            entries = by_challenge[challenge_id]
+            if is_better_score(entry, entries.get(entry_id)):
+                entries[entry_id] = entry
+
+        written = 0
+        failed: List = []
+        for challenge_id, entries in by_challenge.items():
+            try:
+                written += add_leaderboard_entries(challenge_id, entries)
+            except Exception:
+                logger.exception("Could not write %d leaderboard entries for %s", len(entries), challenge_id)
+                failed.extend((challenge_id, entry_id, entry) for entry_id, entry in entries.items())
+
+        if failed:
+            with _buffer_lock:
+                _buffer[:0] = failed
+        return written
+
+
+def pending_count() -> int:
+    """Entries buffered and not yet written."""
+    with _buffer_lock:
+        return len(_buffer)
+
+
+def _ensure_flusher():
+    global _flusher
+    with _buffer_lock:
+        if _flusher is not None:
+            return
+        _flusher = threading.Thread(target=_run_flusher, name='leaderboard-flush', daemon=True)
+    _flusher.start()
+    atexit.register(flush)
+
+
+def _run_flusher():
+    while True:
+        _flush_requested.wait(flush_interval())
+        _flush_requested.clear()
+        try:
+            flush()
+        except Exception:
+            logger.exception("Leaderboard flush failed")
+
+
+def entry_for_api(entry: Dict, rank: int) -> Dict:
+    """Format a stored leaderboard entry for the API (without its word list)."""
+    return {
+        "id": entry.get('id'),
+        "rank": rank,
+        "user_id": entry.get('userId'),
+        "username": entry.get('username', ''),
+        "score": entry.get('score', 0),
+        "words_found": entry.get('wordsFound', 0),
+        "time_taken": entry.get('timeTaken'),
+        "submitted_at": entry.get('submittedAt'),
+    }
+
+
+def encode_cursor(entry: Dict, rank: int) -> str:
+    """Opaque cursor for the page after entry, which is at position rank."""
+    position = [entry.get('score', 0), entry.get('timeTaken'), entry['id'], rank]
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str):
+    """
+    Decode a cursor from encode_cursor.
+
+    Returns:
+    tuple[tuple, int]: The (score, timeTaken, id) to start after and the
+    rank of that entry.
+
+    Raises:
+    InvalidCursor: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        score, time_taken, entry_id, rank = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError, binascii.Error):
+        raise InvalidCursor("Invalid cursor")
+    if not isinstance(entry_id, str) or not isinstance(rank, int):
+        raise InvalidCursor("Invalid cursor")
+    return (score, time_taken, entry_id), rank
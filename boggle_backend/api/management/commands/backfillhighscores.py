@@ -0,0 +1,35 @@
+"""
+Backfill the denormalized highScore field on challenge documents.
+
+Usage:
+    python manage.py backfillhighscores [challenge_id ...]
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.firestore_service import backfill_high_score, get_firestore_client
+
+
+class Command(BaseCommand):
+    help = "Recompute each challenge's highScore field from its leaderboard."
+
+    def add_arguments(self, parser):
+        parser.add_argument('challenge_ids', nargs='*',
+                            help="Challenges to backfill (defaults to every challenge)")
+
+    def handle(self, *args, **options):
+        try:
+            db = get_firestore_client()
+        except Exception as e:
+            raise CommandError(str(e))
+
+        challenge_ids = options['challenge_ids'] or [
+            doc.id for doc in db.collection('Challenges').select([]).stream()
+        ]
+        for challenge_id in challenge_ids:
+            top_entry = backfill_high_score(challenge_id)
+            if top_entry:
+                self.stdout.write(f"{challenge_id}: {top_entry['score']} by {top_entry['username']}")
+            else:
+                self.stdout.write(f"{challenge_id}: no entries")
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {len(challenge_ids)} challenges"))
@@ -0,0 +1,189 @@
+"""
+Benchmark the challenge and leaderboard paths offline.
+
+Usage:
+    python manage.py benchmarkchallenges [--challenges 100] [--entries 1000]
+        [--size 4] [--requests 200] [--page-size 50] [--submissions 2000]
+        [--seed 0]
+
+Seeds the in-memory Firestore stand-in (api/memory_firestore.py) with
+solved random challenges and leaderboard entries, then times the service
+calls behind the challenge endpoints: listing, detail, leaderboard pages
+and score submissions. The configured Firestore is never touched.
+"""
+
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from api import firestore_service, leaderboard
+from api.challenge_schema import canonical_challenge
+from api.dictionary import DictionaryNotFound, get_trie
+from api.randomGen import random_grid
+from api.solve_cache import solve
+
+
+class Command(BaseCommand):
+    help = "Time challenge listing, detail, leaderboard paging and submissions on in-memory data."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--challenges', type=int, default=100)
+        parser.add_argument('--entries', type=int, default=1000,
+                            help="Leaderboard entries per challenge")
+        parser.add_argument('--size', type=int, default=4, help="Board size of the challenges")
+        parser.add_argument('--requests', type=int, default=200, help="Timed calls per operation")
+        parser.add_argument('--page-size', type=int, default=50)
+        parser.add_argument('--submissions', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        with override_settings(FIRESTORE_BACKEND='memory'):
+            firestore_service.reset_client()
+            try:
+                self.run(options)
+            finally:
+                firestore_service.reset_client()
+
+    def run(self, options):
+        rng = random.Random(options['seed'])
+        try:
+            # Load the dictionary before seeding, so a missing one fails fast
+            get_trie()
+        except DictionaryNotFound as e:
+            raise CommandError(str(e))
+
+        start = time.perf_counter()
+        challenge_ids, solutions = self.seed(rng, options)
+        self.stdout.write(
+            f"Seeded {len(challenge_ids)} challenges x {options['entries']} entries "
+            f"in {time.perf_counter() - start:.1f}s"
+        )
+
+        requests = options['requests']
+        page_size = options['page_size']
+
+        def list_cold():
+            firestore_service.invalidate_challenge_cache()
+            firestore_service.get_all_challenges()
+
+        def detail():
+            challenge = firestore_service.get_challenge_by_id(rng.choice(challenge_ids))
+            firestore_service.format_challenge_for_api(challenge)
+
+        def first_page():
+            firestore_service.get_leaderboard_page(rng.choice(challenge_ids), page_size)
+
+        def deep_page():
+            # Walk a leaderboard to a random depth, then time the next page
+            challenge_id = rng.choice(challenge_ids)
+            entries = firestore_service.get_challenge_leaderboard(
+                challenge_id, rng.randrange(1, max(2, options['entries']))
+            )
+            last = entries[-1]
+            start_after = (last['score'], last['timeTaken'], last['id'])
+            begin = time.perf_counter()
+            firestore_service.get_leaderboard_page(challenge_id, page_size, start_after)
+            return time.perf_counter() - begin
+
+        results = [
+            ("list challenges (cold)", self.time(list_cold, max(1, requests // 10))),
+            ("list challenges (cached)", self.time(firestore_service.get_all_challenges, requests)),
+            ("challenge detail", self.time(detail, requests)),
+            ("leaderboard first page", self.time(first_page, requests)),
+            ("leaderboard deep page", self.time(deep_page, requests, self_timed=True)),
+        ]
+
+        submissions = []
+        for _ in range(options['submissions']):
+            challenge_id = rng.choice(challenge_ids)
+            words = rng.sample(solutions[challenge_id], min(10, len(solutions[challenge_id])))
+            submissions.append((challenge_id, {
+                'user_id': f"bench-{rng.randrange(10 ** 6)}",
+                'username': "bench",
+                'words': words,
+                'time_taken': rng.randrange(10, 180),
+            }))
+        submitted = iter(submissions)
+
+        def submit():
+            challenge_id, submission = next(submitted)
+            challenge = firestore_service.format_challenge_for_api(
+                firestore_service.get_challenge_by_id(challenge_id)
+            )
+            entry, _ = leaderboard.build_entry(challenge, submission)
+            leaderboard.submit_entry(challenge_id, entry)
+
+        results.append(("submit score (buffered)", self.time(submit, len(submissions))))
+        # The background flusher may already have written some of them
+        start = time.perf_counter()
+        written = leaderboard.flush()
+        flush_ms = 1000 * (time.perf_counter() - start)
+
+        self.stdout.write(f"{'operation':<28} {'calls':>6} {'mean ms':>9} {'p95 ms':>9}")
+        for name, timings in results:
+            timings = sorted(timings)
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            self.stdout.write(
+                f"{name:<28} {len(timings):>6} {1000 * statistics.mean(timings):>9.3f} {1000 * p95:>9.3f}"
+            )
+        self.stdout.write(f"Final flush wrote {written} buffered submissions in {flush_ms:.1f} ms")
+
+    def seed(self, rng, options):
+        """Write the challenges and their leaderboards; returns ids and solutions."""
+        db = firestore_service.get_firestore_client()
+        state = random.getstate()
+        random.seed(options['seed'])
+        grids = [random_grid(options['size']) for _ in range(options['challenges'])]
+        random.setstate(state)
+
+        challenge_ids = []
+        solutions = {}
+        batch = db.batch()
+        for i, grid in enumerate(grids):
+            challenge_id = f"bench-{i:05d}"
+            words = solve(grid)
+            document = canonical_challenge({
+                'name': f"Benchmark {i}",
+                'description': "Generated by benchmarkchallenges",
+                'type': "time_limited",
+                'grid': grid,
+                'solutions': words,
+                'timeLimit': 180,
+                'createdAt': timezone.now(),
+            }, challenge_id)
+            batch.set(db.collection('Challenges').document(challenge_id), document)
+            if (i + 1) % 500 == 0:
+                batch.commit()
+                batch = db.batch()
+            challenge_ids.append(challenge_id)
+            solutions[challenge_id] = document['solutions'] or ["NONE"]
+        batch.commit()
+
+        for challenge_id in challenge_ids:
+            entries = {}
+            for n in range(options['entries']):
+                found = rng.randrange(0, 40)
+                entries[leaderboard.user_entry_id(f"user-{n}")] = {
+                    'userId': f"user-{n}",
+                    'username': f"player{n}",
+                    'score': found + rng.randrange(0, 2 * found + 1),
+                    'wordsFound': found,
+                    'words': [],
+                    'timeTaken': rng.randrange(10, 180),
+                    'submittedAt': timezone.now(),
+                }
+            firestore_service.add_leaderboard_entries(challenge_id, entries)
+        return challenge_ids, solutions
+
+    def time(self, func, calls, self_timed=False):
+        """Seconds taken by each of calls calls (func returns its own time if self_timed)."""
+        timings = []
+        for _ in range(calls):
+            start = time.perf_counter()
+            elapsed = func()
+            timings.append(elapsed if self_timed else time.perf_counter() - start)
+        return timings
@@ -0,0 +1,132 @@
+"""
+Benchmark the Boggle solver engines against each other.
+
+Usage:
+    python manage.py benchmarksolver [--fixed ../tests.py] [--sizes 4 8 10 13]
+        [--boards 10] [--engines prefix trie iterative] [--repeat 3]
+        [--seed 0] [--workers 1 2 4]
+
+The fixed boards of the tests.py suites (every literal `grid = [...]`,
+skipping the malformed-grid edge cases) are timed first, grouped by size,
+so runs stay comparable across machines and commits. --boards seeded
+random boards per --sizes size are timed as an extra (--boards 0 to skip).
+
+With --workers, each row is also solved with api.parallel.solve_parallel
+at every listed pool size, to show the multi-core speedup (boards below
+settings.PARALLEL_MIN_BOARD_SIZE are solved in-process).
+"""
+
+import ast
+import random
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.boggle_solver import Boggle
+from api.dictionary import DictionaryNotFound, get_trie, get_word_index
+from api.parallel import shutdown_pool, solve_parallel
+from api.randomGen import random_grid
+
+
+def fixed_grids(path):
+    """Square boards assigned to `grid` in the test file at path, by size."""
+    with open(path) as f:
+        tree = ast.parse(f.read(), filename=str(path))
+    grids = defaultdict(list)
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Assign):
+            continue
+        if not any(isinstance(target, ast.Name) and target.id == 'grid' for target in node.targets):
+            continue
+        try:
+            grid = ast.literal_eval(node.value)
+        except ValueError:
+            continue
+        if grid and all(isinstance(row, list) and len(row) == len(grid) for row in grid):
+            grids[len(grid)].append(grid)
+    return dict(sorted(grids.items()))
+
+
+class Command(BaseCommand):
+    help = "Time the solver engines on the tests.py boards and seeded random boards and check they agree."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fixed', default=str(settings.BASE_DIR.parent / 'tests.py'),
+                            help="Test file whose fixed grids are benchmarked")
+        parser.add_argument('--sizes', type=int, nargs='+', default=[4, 6, 8, 10, 12, 13])
+        parser.add_argument('--boards', type=int, default=10, help="Random boards per size")
+        parser.add_argument('--engines', nargs='+', default=list(Boggle.ENGINES),
+                            choices=Boggle.ENGINES)
+        parser.add_argument('--repeat', type=int, default=3,
+                            help="Runs per engine; the fastest is reported")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--workers', type=int, nargs='*', default=[],
+                            help="Also time solve_parallel with these pool sizes")
+
+    def handle(self, *args, **options):
+        try:
+            word_index = get_word_index()
+            trie = get_trie()
+        except DictionaryNotFound as e:
+            raise CommandError(str(e))
+
+        try:
+            fixed = fixed_grids(options['fixed'])
+        except (OSError, SyntaxError) as e:
+            raise CommandError(f"Cannot read fixed grids from {options['fixed']}: {e}")
+
+        rng_state = random.getstate()
+        random.seed(options['seed'])
+        boards = [(f"fixed {size}x{size}", size, grids) for size, grids in fixed.items()]
+        if options['boards'] > 0:
+            boards += [
+                (f"random {size}x{size}", size, [random_grid(size) for _ in range(options['boards'])])
+                for size in options['sizes']
+            ]
+        random.setstate(rng_state)
+
+        self.stdout.write(f"Dictionary: {type(trie).__name__}, {len(trie)} words")
+        columns = options['engines'] + [f"{n} workers" for n in options['workers']]
+        header = f"{'boards':>16} " + " ".join(f"{column:>12}" for column in columns)
+        self.stdout.write(header + "   (ms per board, best of %d)" % options['repeat'])
+
+        for label, size, grids in boards:
+            expected = None
+            timings = []
+            for engine in options['engines']:
+                dictionary = word_index if engine == "prefix" else trie
+                best = None
+                for _ in range(options['repeat']):
+                    start = time.perf_counter()
+                    results = [
+                        Boggle([row[:] for row in grid], dictionary, engine=engine).getSolution()
+                        for grid in grids
+                    ]
+                    elapsed = time.perf_counter() - start
+                    best = elapsed if best is None else min(best, elapsed)
+
+                if expected is None:
+                    expected = results
+                elif results != expected:
+                    raise CommandError(f"{engine} disagrees with {options['engines'][0]} on {size}x{size} boards")
+                timings.append(1000 * best / len(grids))
+
+            for workers in options['workers']:
+                # Warm the pool so process start-up is not timed
+                solve_parallel(grids[0], workers=workers)
+                best = None
+                for _ in range(options['repeat']):
+                    start = time.perf_counter()
+                    results = [solve_parallel(grid, workers=workers) for grid in grids]
+                    elapsed = time.perf_counter() - start
+                    best = elapsed if best is None else min(best, elapsed)
+                if results != expected:
+                    raise CommandError(f"solve_parallel with {workers} workers disagrees on {size}x{size} boards")
+                timings.append(1000 * best / len(grids))
+
+            label = f"{label} ({len(grids)})"
+            self.stdout.write(f"{label:>16} " + " ".join(f"{ms:>12.2f}" for ms in timings))
+
+        shutdown_pool()
@@ -0,0 +1,53 @@
+"""
+Compile the word list into a memory-mappable trie file.
+
+Usage:
+    python manage.py builddictionary [--source WORDLIST.json] [--output FILE]
+"""
+
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.boggle_solver import MappedTrie, Trie, normalize_words
+from api.dictionary import DictionaryNotFound, compiled_trie_path, find_wordlist
+from api.readJSONFile import read_json_to_list
+
+
+class Command(BaseCommand):
+    help = "Compile the word list into a flat-array trie file that workers load with mmap."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source',
+            help="Word list JSON file (defaults to the bundled data/full-wordlist.json)",
+        )
+        parser.add_argument(
+            '--output',
+            help="Destination file (defaults to settings.DICTIONARY_TRIE_PATH)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            source = options['source'] or find_wordlist()
+        except DictionaryNotFound as e:
+            raise CommandError(str(e))
+        output = options['output'] or compiled_trie_path()
+        if not output:
+            raise CommandError("No --output given and settings.DICTIONARY_TRIE_PATH is not set")
+
+        start = time.perf_counter()
+        words = normalize_words(read_json_to_list(source))
+        trie = Trie.from_words(words)
+
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        MappedTrie.write(trie, output)
+
+        mapped = MappedTrie(output)
+        self.stdout.write(self.style.SUCCESS(
+            f"Compiled {len(mapped)} words ({mapped.node_count} nodes, "
+            f"{os.path.getsize(output)} bytes) to {output} "
+            f"in {time.perf_counter() - start:.2f}s"
+        ))
+        mapped.close()
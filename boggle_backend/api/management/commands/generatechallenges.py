@@ -0,0 +1,115 @@
+"""
+Regenerate the challenge catalogue: solve, score, write and upload.
+
+Usage:
+    python manage.py generatechallenges [--definitions challenges.json]
+        [--output firestore_challenges.jsonl] [--workers 8]
+        [--engine iterative] [--force] [--upload] [--dry-run]
+
+Definitions default to api.challenge_pipeline.CHALLENGES; a definitions
+file is JSON Lines ({"id", "grid", metadata...} per line) or a JSON object
+mapping ids to definitions. The output is written as JSON Lines, one
+record per challenge with its solutions and score metadata. Grids that are
+unchanged since the existing output file was written reuse its solutions
+unless --force is given. With --upload the records are then written to
+Firestore, skipping challenges whose content did not change.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.challenge_pipeline import CHALLENGES, generate, read_records
+from api.challenge_upload import upload_challenges
+from api.dictionary import DictionaryNotFound
+from api.parallel import shutdown_pool
+from api.readJSONFile import read_id_records
+
+
+class Command(BaseCommand):
+    help = "Solve, score and write the challenge catalogue as JSON Lines, optionally uploading it."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--definitions',
+                            help="Challenge definitions file, or - for stdin "
+                                 "(defaults to the built-in catalogue)")
+        parser.add_argument('--output',
+                            default=str(settings.BASE_DIR / 'firestore_challenges.jsonl'),
+                            help="JSON Lines file to write; its records are reused for unchanged grids")
+        parser.add_argument('--workers', type=int, default=None,
+                            help="Solver processes (defaults to the CPUs available)")
+        parser.add_argument('--engine', default="iterative", choices=("trie", "iterative"))
+        parser.add_argument('--force', action='store_true',
+                            help="Solve every grid again instead of reusing earlier solutions")
+        parser.add_argument('--upload', action='store_true',
+                            help="Upload the records to Firestore afterwards")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="With --upload, report what would be written without writing")
+
+    def handle(self, *args, **options):
+        output = options['output']
+        previous = {} if options['force'] else read_records(output)
+
+        infile = None
+        if options['definitions'] == '-':
+            infile = sys.stdin
+        elif options['definitions']:
+            infile = open(options['definitions'])
+        definitions = read_id_records(infile) if infile else CHALLENGES.items()
+
+        start = time.perf_counter()
+        stats = Counter()
+        records = {}
+        # Write next to the output and rename at the end, so a failed run
+        # leaves the previous catalogue in place
+        directory = os.path.dirname(os.path.abspath(output))
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as outfile:
+                for record in generate(definitions, previous, workers=options['workers'],
+                                       engine=options['engine'], stats=stats):
+                    outfile.write(json.dumps(record) + "\n")
+                    records[record['id']] = record
+            os.replace(temp_path, output)
+        except (DictionaryNotFound, ValueError, KeyError, OSError) as e:
+            os.unlink(temp_path)
+            raise CommandError(f"Failed after {len(records)} challenges: {e}")
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        finally:
+            if infile is not None and infile is not sys.stdin:
+                infile.close()
+            shutdown_pool()
+
+        self.stdout.write(
+            f"Wrote {len(records)} challenges to {output} in {time.perf_counter() - start:.2f}s "
+            f"({stats['solved']} solved, {stats['reused']} reused)"
+        )
+        if stats['invalid']:
+            self.stderr.write(f"Skipped {stats['invalid']} challenges whose grid could not be parsed")
+
+        if options['upload']:
+            self.upload(records, options['dry_run'])
+
+    def upload(self, records, dry_run):
+        try:
+            result = upload_challenges(records, dry_run=dry_run)
+        except Exception as e:
+            raise CommandError(f"Upload failed: {e}")
+
+        for challenge_id in result['failed']:
+            self.stderr.write(f"{challenge_id}: upload failed after retries")
+        verb = "Would upload" if dry_run else "Uploaded"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {len(result['written'])} challenges "
+            f"({len(result['unchanged'])} unchanged, {len(result['failed'])} failed)"
+        ))
+        if result['failed']:
+            raise CommandError(f"{len(result['failed'])} challenges could not be uploaded")
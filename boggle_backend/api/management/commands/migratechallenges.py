@@ -0,0 +1,40 @@
+"""
+Rewrite stored challenge documents in the canonical layout.
+
+Usage:
+    python manage.py migratechallenges [--dry-run]
+
+Converts every challenge below the current schemaVersion (see
+api/challenge_schema.py): grids become size + tiles, solutions a sorted
+uppercase list, isActive a boolean, and the legacy snake_case fields are
+removed. Challenges whose grid cannot be parsed are reported and left as
+they are.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.challenge_schema import SCHEMA_VERSION
+from api.firestore_service import migrate_challenges
+
+
+class Command(BaseCommand):
+    help = "Rewrite challenge documents in the canonical (versioned) layout."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help="List the challenges that need rewriting without changing them")
+
+    def handle(self, *args, **options):
+        try:
+            migrated, skipped = migrate_challenges(dry_run=options['dry_run'])
+        except Exception as e:
+            raise CommandError(str(e))
+
+        for challenge_id in migrated:
+            self.stdout.write(challenge_id)
+        for challenge_id in skipped:
+            self.stderr.write(f"{challenge_id}: grid could not be parsed, skipped")
+        verb = "Would migrate" if options['dry_run'] else "Migrated"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {len(migrated)} challenges to schema version {SCHEMA_VERSION}"
+        ))
@@ -0,0 +1,52 @@
+"""
+Fill the pre-solved board pool used by create_game.
+
+Usage:
+    python manage.py refillboardpool [--sizes 3 4 5] [--target 20]
+        [--loop] [--interval 5]
+
+With --loop the command keeps running as a dedicated refill worker,
+topping every size back up whenever it drops below the low watermark.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.board_pool import high_watermark, low_watermark, pool_sizes, pooled_boards, refill
+
+
+class Command(BaseCommand):
+    help = "Solve and store boards until every pool size reaches the high watermark."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=None,
+                            help="Board sizes to fill (defaults to settings.BOARD_POOL_SIZES)")
+        parser.add_argument('--target', type=int, default=None,
+                            help="Boards per size (defaults to settings.BOARD_POOL_HIGH_WATERMARK)")
+        parser.add_argument('--loop', action='store_true',
+                            help="Keep running and refill sizes that drop below the low watermark")
+        parser.add_argument('--interval', type=float, default=5.0,
+                            help="Seconds between checks with --loop")
+
+    def handle(self, *args, **options):
+        sizes = options['sizes'] or list(pool_sizes())
+        target = options['target'] or high_watermark()
+
+        self._fill(sizes, target)
+        while options['loop']:
+            time.sleep(options['interval'])
+            low = [
+                size for size in sizes
+                if pooled_boards(size).count() < low_watermark()
+            ]
+            self._fill(low, target)
+
+    def _fill(self, sizes, target):
+        for size in sizes:
+            start = time.perf_counter()
+            added = refill(size, target)
+            if added:
+                self.stdout.write(
+                    f"{size}x{size}: added {added} boards in {time.perf_counter() - start:.2f}s"
+                )
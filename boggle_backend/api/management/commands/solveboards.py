@@ -0,0 +1,68 @@
+"""
+Solve a batch of boards and stream the results as JSON Lines.
+
+Input is either JSON Lines, one {"id": ..., "grid": [[...]]} object per
+line, or a JSON object mapping ids to {"grid": [[...]]} (the format of
+challenge_solutions.json / firestore_challenges.json).
+
+Each output line is {"id", "words", "word_count", "length_counts"}.
+
+Usage:
+    python manage.py solveboards boards.jsonl [--output solutions.jsonl]
+        [--workers 8] [--engine iterative]
+"""
+
+import json
+import sys
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.dictionary import DictionaryNotFound
+from api.parallel import shutdown_pool, solve_many
+from api.readJSONFile import read_id_records
+
+
+class Command(BaseCommand):
+    help = "Solve many boards with one dictionary load and stream results as JSON Lines."
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help="Boards file, or - for stdin")
+        parser.add_argument('--output', help="Output JSON Lines file (defaults to stdout)")
+        parser.add_argument('--workers', type=int, default=None,
+                            help="Worker processes (defaults to the CPUs available)")
+        parser.add_argument('--engine', default="iterative", choices=("trie", "iterative"))
+        parser.add_argument('--chunksize', type=int, default=16)
+
+    def handle(self, *args, **options):
+        infile = sys.stdin if options['input'] == '-' else open(options['input'])
+        outfile = open(options['output'], 'w') if options['output'] else self.stdout
+
+        start = time.perf_counter()
+        count = 0
+        try:
+            results = solve_many(
+                ((grid_id, record['grid']) for grid_id, record in read_id_records(infile)),
+                workers=options['workers'],
+                engine=options['engine'],
+                chunksize=options['chunksize'],
+            )
+            for grid_id, words in results:
+                outfile.write(json.dumps({
+                    "id": grid_id,
+                    "words": words,
+                    "word_count": len(words),
+                    "length_counts": dict(sorted(Counter(map(len, words)).items())),
+                }) + "\n")
+                count += 1
+        except (DictionaryNotFound, ValueError, KeyError) as e:
+            raise CommandError(f"Failed after {count} boards: {e}")
+        finally:
+            if infile is not sys.stdin:
+                infile.close()
+            if outfile is not self.stdout:
+                outfile.close()
+            shutdown_pool()
+
+        self.stderr.write(f"Solved {count} boards in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,324 @@
+"""
+In-memory stand-in for the Firestore client.
+
+Selected with settings.FIRESTORE_BACKEND = 'memory'. It implements the part
+of the google.cloud.firestore API that firestore_service uses, with the
+same semantics where they matter for correctness and load tests:
+
+- collections, documents and subcollections addressed by path;
+- where() filters, multi-field order_by() (documents missing an ordered
+  field are left out, ties are broken by document id), limit(),
+  start_after()/start_at() cursors, select() projections;
+- get(field_paths=...), set(merge=...), update() with DELETE_FIELD (and
+  NotFound for missing documents), delete();
+- batched writes (at most 500 per batch, applied atomically) and
+  transactions via the transactional decorator.
+
+Data lives in one process and is lost when it exits. Reads and writes
+deep-copy documents, as the real client deserializes them, so the cost of
+large documents (e.g. solution lists) still shows up in benchmarks.
+"""
+
+import copy
+import threading
+import uuid
+from collections import defaultdict
+from datetime import datetime
+
+MAX_BATCH_WRITES = 500
+
+DELETE_FIELD = type('DeleteField', (), {
+    '__repr__': lambda self: 'DELETE_FIELD',
+    '__deepcopy__': lambda self, memo: self,
+})()
+
+
+class NotFound(Exception):
+    """Raised when updating a document that does not exist."""
+
+
+class Query:
+    ASCENDING = 'ASCENDING'
+    DESCENDING = 'DESCENDING'
+
+    def __init__(self, client, path, filters=(), orders=(), limit=None,
+                 fields=None, cursor=None):
+        self._client = client
+        self._path = path
+        self._filters = filters
+        self._orders = orders
+        self._limit = limit
+        self._fields = fields
+        self._cursor = cursor  # (values, inclusive)
+
+    def _copy(self, **changes):
+        state = dict(filters=self._filters, orders=self._orders, limit=self._limit,
+                     fields=self._fields, cursor=self._cursor)
+        state.update(changes)
+        return Query(self._client, self._path, **state)
+
+    def where(self, field_path, op_string, value):
+        if op_string not in _OPERATORS:
+            raise ValueError(f"Unsupported operator {op_string!r}")
+        return self._copy(filters=self._filters + ((field_path, op_string, value),))
+
+    def order_by(self, field_path, direction=ASCENDING):
+        return self._copy(orders=self._orders + ((field_path, direction),))
+
+    def limit(self, count):
+        return self._copy(limit=count)
+
+    def select(self, field_paths):
+        return self._copy(fields=list(field_paths))
+
+    def start_after(self, document_fields_or_snapshot):
+        return self._copy(cursor=(document_fields_or_snapshot, False))
+
+    def start_at(self, document_fields_or_snapshot):
+        return self._copy(cursor=(document_fields_or_snapshot, True))
+
+    def stream(self, transaction=None):
+        with self._client._lock:
+            rows = list(self._client._collections.get(self._path, {}).items())
+            for field, op, value in self._filters:
+                rows = [row for row in rows if _has(row, field) and _OPERATORS[op](_value(row, field), value)]
+
+            orders = list(self._orders)
+            if not any(field == FieldPath.document_id() for field, _ in orders):
+                orders.append((FieldPath.document_id(), Query.ASCENDING))
+            rows = [row for row in rows if all(_has(row, field) for field, _ in orders)]
+            for field, direction in reversed(orders):
+                rows.sort(key=lambda row: _sort_key(_value(row, field)),
+                          reverse=direction == Query.DESCENDING)
+
+            if self._cursor is not None:
+                rows = self._apply_cursor(rows, orders)
+            if self._limit is not None:
+                rows = rows[:self._limit]
+            return iter([
+                DocumentSnapshot(DocumentReference(self._client, self._path + (doc_id,)), data, self._fields)
+                for doc_id, data in rows
+            ])
+
+    def get(self, transaction=None):
+        return list(self.stream(transaction))
+
+    def _apply_cursor(self, rows, orders):
+        values, inclusive = self._cursor
+        if isinstance(values, DocumentSnapshot):
+            snapshot = values
+            values = [
+                snapshot.id if field == FieldPath.document_id() else snapshot._data.get(field)
+                for field, _ in orders
+            ]
+        elif isinstance(values, dict):
+            values = [values.get(field) for field, _ in orders]
+        values = list(values)
+
+        def position(row):
+            # Compare the row with the cursor, field by field in sort order:
+            # negative if the row sorts before the cursor, 0 if level
+            for (field, direction), cursor_value in zip(orders, values):
+                a, b = _sort_key(_value(row, field)), _sort_key(cursor_value)
+                if a != b:
+                    before = a < b if direction == Query.ASCENDING else a > b
+                    return -1 if before else 1
+            return 0
+
+        return [row for row in rows if position(row) > 0 or (inclusive and position(row) == 0)]
+
+
+class CollectionReference(Query):
+    def __init__(self, client, path):
+        super().__init__(client, path)
+
+    @property
+    def id(self):
+        return self._path[-1]
+
+    def document(self, document_id=None):
+        return DocumentReference(self._client, self._path + (document_id or uuid.uuid4().hex[:20],))
+
+    def list_documents(self):
+        return [snapshot.reference for snapshot in self.select([]).stream()]
+
+
+class DocumentReference:
+    def __init__(self, client, path):
+        self._client = client
+        self._path = path
+
+    @property
+    def id(self):
+        return self._path[-1]
+
+    @property
+    def path(self):
+        return '/'.join(self._path)
+
+    def collection(self, collection_id):
+        return CollectionReference(self._client, self._path + (collection_id,))
+
+    def get(self, field_paths=None, transaction=None):
+        with self._client._lock:
+            return DocumentSnapshot(self, self._client._get(self._path), field_paths)
+
+    def set(self, document_data, merge=False):
+        with self._client._lock:
+            self._client._set(self._path, document_data, merge)
+
+    def update(self, field_updates):
+        with self._client._lock:
+            self._client._update(self._path, field_updates)
+
+    def delete(self):
+        with self._client._lock:
+            self._client._delete(self._path)
+
+
+class DocumentSnapshot:
+    def __init__(self, reference, data, field_paths=None):
+        self.reference = reference
+        self.exists = data is not None
+        if data is not None and field_paths is not None:
+            data = {field: value for field, value in data.items() if field in field_paths}
+        self._data = copy.deepcopy(data)
+
+    @property
+    def id(self):
+        return self.reference.id
+
+    def to_dict(self):
+        return copy.deepcopy(self._data)
+
+    def get(self, field_path):
+        return (self._data or {}).get(field_path)
+
+
+class WriteBatch:
+    def __init__(self, client):
+        self._client = client
+        self._writes = []
+
+    def _add(self, write):
+        if len(self._writes) >= MAX_BATCH_WRITES:
+            raise ValueError(f"A batch can hold at most {MAX_BATCH_WRITES} writes")
+        self._writes.append(write)
+
+    def set(self, reference, document_data, merge=False):
+        self._add(('set', reference._path, copy.deepcopy(document_data), merge))
+
+    def update(self, reference, field_updates):
+        self._add(('update', reference._path, copy.deepcopy(field_updates), None))
+
+    def delete(self, reference):
+        self._add(('delete', reference._path, None, None))
+
+    def commit(self):
+        with self._client._lock:
+            # Check first so a failing batch writes nothing
+            for kind, path, _, _ in self._writes:
+                if kind == 'update' and self._client._get(path) is None:
+                    raise NotFound(f"No document to update: {'/'.join(path)}")
+            for kind, path, data, merge in self._writes:
+                if kind == 'set':
+                    self._client._set(path, data, merge)
+                elif kind == 'update':
+                    self._client._update(path, data)
+                else:
+                    self._client._delete(path)
+        self._writes = []
+
+
+class Transaction(WriteBatch):
+    """Writes are applied when the transactional function returns."""
+
+
+def transactional(func):
+    """Decorator running func(transaction, ...) atomically, like firestore.transactional."""
+    def run(transaction, *args, **kwargs):
+        # Holding the client lock makes the reads and writes atomic
+        with transaction._client._lock:
+            result = func(transaction, *args, **kwargs)
+            transaction.commit()
+        return result
+    return run
+
+
+class FieldPath:
+    @staticmethod
+    def document_id():
+        return '__name__'
+
+
+class Client:
+    def __init__(self):
+        # collection path tuple -> {document id: data}
+        self._collections = defaultdict(dict)
+        self._lock = threading.RLock()
+
+    def collection(self, collection_id):
+        return CollectionReference(self, (collection_id,))
+
+    def batch(self):
+        return WriteBatch(self)
+
+    def transaction(self):
+        return Transaction(self)
+
+    def _get(self, path):
+        return self._collections.get(path[:-1], {}).get(path[-1])
+
+    def _set(self, path, data, merge):
+        data = copy.deepcopy(data)
+        documents = self._collections[path[:-1]]
+        if merge and path[-1] in documents:
+            documents[path[-1]].update(data)
+            data = documents[path[-1]]
+        else:
+            documents[path[-1]] = data
+        for field in [field for field, value in data.items() if value is DELETE_FIELD]:
+            del data[field]
+
+    def _update(self, path, field_updates):
+        if self._get(path) is None:
+            raise NotFound(f"No document to update: {'/'.join(path)}")
+        self._set(path, field_updates, merge=True)
+
+    def _delete(self, path):
+        self._collections.get(path[:-1], {}).pop(path[-1], None)
+
+
+def _has(row, field):
+    return field == FieldPath.document_id() or field in row[1]
+
+
+def _value(row, field):
+    return row[0] if field == FieldPath.document_id() else row[1][field]
+
+
+def _sort_key(value):
+    """Order values of mixed types the way Firestore does (by type first)."""
+    if value is None:
+        return (0, 0)
+    if isinstance(value, bool):
+        return (1, value)
+    if isinstance(value, (int, float)):
+        return (2, value)
+    if isinstance(value, datetime):
+        return (3, value.timestamp())
+    if isinstance(value, str):
+        return (4, value)
+    return (5, repr(value))
+
+
+_OPERATORS = {
+    '==': lambda a, b: _sort_key(a) == _sort_key(b),
+    '!=': lambda a, b: _sort_key(a) != _sort_key(b),
+    '<': lambda a, b: _sort_key(a)[0] == _sort_key(b)[0] and _sort_key(a) < _sort_key(b),
+    '<=': lambda a, b: _sort_key(a)[0] == _sort_key(b)[0] and _sort_key(a) <= _sort_key(b),
+    '>': lambda a, b: _sort_key(a)[0] == _sort_key(b)[0] and _sort_key(a) > _sort_key(b),
+    '>=': lambda a, b: _sort_key(a)[0] == _sort_key(b)[0] and _sort_key(a) >= _sort_key(b),
+    'in': lambda a, b: any(_sort_key(a) == _sort_key(item) for item in b),
+    'array_contains': lambda a, b: isinstance(a, list) and b in a,
+}
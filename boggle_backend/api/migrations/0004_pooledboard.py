@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-17 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_challenge_leaderboardentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PooledBoard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('size', models.IntegerField(db_index=True)),
+                ('grid', models.TextField()),
+                ('foundwords', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-17 21:48
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_gamejob'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='LeaderboardEntry',
+        ),
+        migrations.DeleteModel(
+            name='Challenge',
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 6.0 on 2026-10-17 22:05
+
+import json
+
+from django.db import migrations, models
+
+
+def word_summary(foundwords):
+    try:
+        words = json.loads(foundwords) if foundwords else []
+    except json.JSONDecodeError:
+        words = []
+    if not isinstance(words, list):
+        return 0, 0
+    return len(words), max((len(word) for word in words), default=0)
+
+
+def backfill_word_summary(apps, schema_editor):
+    Games = apps.get_model('api', 'Games')
+    batch = []
+    for game in Games.objects.only('id', 'foundwords').iterator(chunk_size=500):
+        game.word_count, game.max_word_length = word_summary(game.foundwords)
+        batch.append(game)
+        if len(batch) >= 500:
+            Games.objects.bulk_update(batch, ['word_count', 'max_word_length'])
+            batch = []
+    if batch:
+        Games.objects.bulk_update(batch, ['word_count', 'max_word_length'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_delete_challenge_leaderboardentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='games',
+            name='word_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='games',
+            name='max_word_length',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_word_summary, migrations.RunPython.noop),
+    ]
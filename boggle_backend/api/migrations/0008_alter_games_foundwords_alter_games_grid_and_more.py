@@ -0,0 +1,65 @@
+# Generated by Django 6.0 on 2026-10-17 22:20
+
+import json
+
+import api.models
+from django.db import migrations, models
+
+
+def decode(value):
+    """Python value of a JSON text column; [] if it is empty or invalid."""
+    try:
+        value = json.loads(value) if value else []
+        # Some rows were encoded twice (a JSON string holding the JSON)
+        if isinstance(value, str):
+            value = json.loads(value)
+    except json.JSONDecodeError:
+        return []
+    return value if isinstance(value, list) else []
+
+
+def compact_json_text(apps, schema_editor):
+    """Rewrite the text columns as compact valid JSON before they become JSON columns."""
+    for model_name in ('Games', 'PooledBoard'):
+        model = apps.get_model('api', model_name)
+        batch = []
+        for row in model.objects.only('id', 'grid', 'foundwords').iterator(chunk_size=500):
+            row.grid = json.dumps(decode(row.grid), separators=(',', ':'))
+            row.foundwords = json.dumps(decode(row.foundwords), separators=(',', ':'))
+            batch.append(row)
+            if len(batch) >= 500:
+                model.objects.bulk_update(batch, ['grid', 'foundwords'])
+                batch = []
+        if batch:
+            model.objects.bulk_update(batch, ['grid', 'foundwords'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_games_word_count_games_max_word_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(compact_json_text, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='games',
+            name='foundwords',
+            field=models.JSONField(encoder=api.models.CompactJSONEncoder),
+        ),
+        migrations.AlterField(
+            model_name='games',
+            name='grid',
+            field=models.JSONField(encoder=api.models.CompactJSONEncoder),
+        ),
+        migrations.AlterField(
+            model_name='pooledboard',
+            name='foundwords',
+            field=models.JSONField(encoder=api.models.CompactJSONEncoder),
+        ),
+        migrations.AlterField(
+            model_name='pooledboard',
+            name='grid',
+            field=models.JSONField(encoder=api.models.CompactJSONEncoder),
+        ),
+    ]
@@ -0,0 +1,95 @@
+# Generated by Django 6.0 on 2026-10-17 22:40
+
+import hashlib
+
+import api.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Frozen copies of boggle_solver.orientations and grid_hash as of this
+# migration, so later changes to the solver cannot change what it does
+def orientations(grid):
+    rows = [tuple(str(tile).upper() for tile in row) for row in grid]
+    for _ in range(4):
+        rows = list(zip(*rows[::-1]))
+        yield tuple(rows)
+        yield tuple(zip(*rows))
+
+
+def grid_hash(grid):
+    if grid and all(len(row) == len(grid) for row in grid):
+        canonical = min(orientations(grid))
+    else:
+        canonical = tuple(tuple(str(tile).upper() for tile in row) for row in grid)
+    text = '|'.join(','.join(row) for row in canonical)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def link_solutions(apps, schema_editor):
+    """Move each game's words into a shared Solution row and link to it."""
+    Games = apps.get_model('api', 'Games')
+    Solution = apps.get_model('api', 'Solution')
+    solution_ids = {}
+    batch = []
+    for game in Games.objects.filter(solution__isnull=True, foundwords__isnull=False).iterator(chunk_size=500):
+        key = grid_hash(game.grid or [])
+        if key not in solution_ids:
+            solution, _ = Solution.objects.get_or_create(
+                grid_hash=key, defaults={'size': game.size, 'words': game.foundwords}
+            )
+            solution_ids[key] = solution.pk
+        game.solution_id = solution_ids[key]
+        game.foundwords = None
+        batch.append(game)
+        if len(batch) >= 500:
+            Games.objects.bulk_update(batch, ['solution', 'foundwords'])
+            batch = []
+    if batch:
+        Games.objects.bulk_update(batch, ['solution', 'foundwords'])
+
+
+def unlink_solutions(apps, schema_editor):
+    """Copy the linked words back into each game."""
+    Games = apps.get_model('api', 'Games')
+    batch = []
+    for game in Games.objects.filter(solution__isnull=False).select_related('solution').iterator(chunk_size=500):
+        game.foundwords = game.solution.words
+        game.solution = None
+        batch.append(game)
+        if len(batch) >= 500:
+            Games.objects.bulk_update(batch, ['solution', 'foundwords'])
+            batch = []
+    if batch:
+        Games.objects.bulk_update(batch, ['solution', 'foundwords'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_alter_games_foundwords_alter_games_grid_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Solution',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('grid_hash', models.CharField(max_length=64, unique=True)),
+                ('size', models.IntegerField()),
+                ('words', models.JSONField(encoder=api.models.CompactJSONEncoder)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='games',
+            name='foundwords',
+            field=models.JSONField(blank=True, encoder=api.models.CompactJSONEncoder, null=True),
+        ),
+        migrations.AddField(
+            model_name='games',
+            name='solution',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='games', to='api.solution'),
+        ),
+        migrations.RunPython(link_solutions, unlink_solutions),
+    ]
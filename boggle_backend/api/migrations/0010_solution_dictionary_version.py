@@ -0,0 +1,30 @@
+# Generated by Django 6.0 on 2026-10-17 23:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_solution'),
+    ]
+
+    operations = [
+        # Existing rows were solved with an unrecorded word list; '' never
+        # matches a dictionary version, so they are kept but not reused
+        migrations.AddField(
+            model_name='solution',
+            name='dictionary_version',
+            field=models.CharField(default='', max_length=16),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='solution',
+            name='grid_hash',
+            field=models.CharField(max_length=64),
+        ),
+        migrations.AddConstraint(
+            model_name='solution',
+            constraint=models.UniqueConstraint(fields=('dictionary_version', 'grid_hash'), name='unique_solution_per_dictionary'),
+        ),
+    ]
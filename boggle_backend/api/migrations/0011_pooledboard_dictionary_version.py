@@ -0,0 +1,21 @@
+# Generated by Django 6.0 on 2026-10-17 23:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_solution_dictionary_version'),
+    ]
+
+    operations = [
+        # '' never matches a dictionary version, so boards pooled before
+        # versions were recorded are discarded by the next pop_board()
+        migrations.AddField(
+            model_name='pooledboard',
+            name='dictionary_version',
+            field=models.CharField(default='', max_length=16),
+            preserve_default=False,
+        ),
+    ]
@@ -1,11 +1,109 @@
+import json
+import uuid
+
 from django.db import models
 
+class CompactJSONEncoder(json.JSONEncoder):
+    """Encode JSON columns without spaces after separators."""
+
+    def __init__(self, *args, **kwargs):
+        kwargs['separators'] = (',', ':')
+        super().__init__(*args, **kwargs)
+
+
+# Solved board shared by every game on the same board or a rotation or
+# reflection of it, solved with the same word list (see solutions.py)
+class Solution(models.Model):
+    grid_hash = models.CharField(max_length=64) # boggle_solver.grid_hash()
+    # dictionary.dictionary_version() of the word list; '' for rows solved
+    # before versions were recorded, which are never reused
+    dictionary_version = models.CharField(max_length=16)
+    size = models.IntegerField()
+    words = models.JSONField(encoder=CompactJSONEncoder) # sorted list of words
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['dictionary_version', 'grid_hash'], name='unique_solution_per_dictionary'),
+        ]
+
+    def __str__(self):
+        return f'Solution {self.grid_hash[:12]} ({self.size}x{self.size}, {len(self.words)} words)'
+
+
 # creating a model class below
 class Games(models.Model):
     name = models.CharField(max_length=100)
     size = models.IntegerField()
-    grid = models.TextField() # Serialize the 2d array to a string:
-    foundwords = models.TextField() #Serialize the array of words to a single string:
+    grid = models.JSONField(encoder=CompactJSONEncoder) # 2D list of tiles
+    solution = models.ForeignKey(Solution, on_delete=models.PROTECT, null=True, blank=True, related_name='games')
+    # Own copy of the words, only for games without a linked solution
+    foundwords = models.JSONField(encoder=CompactJSONEncoder, null=True, blank=True)
+    # Summary of the words, kept in step by save() so listings can skip them
+    word_count = models.IntegerField(default=0)
+    max_word_length = models.IntegerField(default=0)
+
+    @property
+    def words(self):
+        """Sorted list of words found on the board."""
+        if self.solution_id is not None:
+            return self.solution.words
+        return self.foundwords or []
+
+    def save(self, *args, **kwargs):
+        self.word_count, self.max_word_length = word_summary(self.words)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'foundwords', 'solution'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'word_count', 'max_word_length'}
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f'Name: {self.name} Size: {self.size} Grid: {self.grid}'
+
+
+def word_summary(foundwords):
+    """(word count, longest word length) of a foundwords list."""
+    if not isinstance(foundwords, list):
+        return 0, 0
+    return len(foundwords), max((len(word) for word in foundwords), default=0)
+
+
+# Pre-solved boards waiting to be handed out by create_game (see board_pool.py)
+class PooledBoard(models.Model):
+    size = models.IntegerField(db_index=True)
+    grid = models.JSONField(encoder=CompactJSONEncoder) # same format as Games.grid
+    foundwords = models.JSONField(encoder=CompactJSONEncoder) # same format as Games.foundwords
+    # dictionary.dictionary_version() foundwords were solved with; boards
+    # from another word list are discarded instead of handed out
+    dictionary_version = models.CharField(max_length=16)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'Pooled {self.size}x{self.size} board #{self.pk}'
+
+
+# Background game creation requested through the async create endpoint (see game_jobs.py)
+class GameJob(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    size = models.IntegerField()
+    # Client-supplied Idempotency-Key; repeated requests with the same key share one job
+    key = models.CharField(max_length=100, unique=True, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    game = models.ForeignKey(Games, on_delete=models.SET_NULL, null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'Job {self.id} ({self.size}x{self.size}, {self.status})'
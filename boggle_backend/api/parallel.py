@@ -0,0 +1,232 @@
+"""
+Multi-process solving.
+
+Every pool worker memory-maps the same compiled trie file (see
+`manage.py builddictionary`), so the dictionary is loaded once per process
+and its pages are shared rather than copied.
+
+solve_parallel splits the start cells of one large board across the pool;
+each worker returns the words found from its start cells and the parent
+merges them, so the sorted union is identical to a serial getSolution().
+
+solve_many fans many boards out across the pool and yields each board's
+solution as it completes, in input order. Boards already in solve_cache
+are not solved again, and new solutions are added to it.
+
+The pool only pays off when there is enough work to hide the cost of
+shipping it to other processes: with a single worker, boards smaller than
+settings.PARALLEL_MIN_BOARD_SIZE, or fewer than settings.PARALLEL_MIN_BOARDS
+boards, both functions solve in this process instead.
+"""
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice, repeat, tee
+
+from django.conf import settings
+
+from . import solve_cache
+from .boggle_solver import Boggle, MappedTrie
+from .dictionary import DictionaryNotFound, compiled_trie_path, get_mapped_trie, get_trie
+
+# Chunks per worker: start cells differ a lot in cost (centre cells have
+# more neighbours), so smaller interleaved chunks balance the load better.
+CHUNKS_PER_WORKER = 4
+
+_pool = None
+_pool_key = None
+_pool_lock = threading.Lock()
+
+# Per worker process: the mapped dictionary, opened once by the initializer
+_worker_trie = None
+
+
+def default_workers() -> int:
+    """CPUs this process may run on (its affinity mask, not the host's CPU count)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def min_board_size() -> int:
+    return getattr(settings, 'PARALLEL_MIN_BOARD_SIZE', 8)
+
+
+def min_boards() -> int:
+    return getattr(settings, 'PARALLEL_MIN_BOARDS', 32)
+
+
+def _local_trie(trie_path):
+    """Dictionary for solving in this process."""
+    return get_trie() if trie_path is None else get_mapped_trie(trie_path)
+
+
+def _init_worker(trie_path):
+    global _worker_trie
+    _worker_trie = MappedTrie(trie_path)
+
+
+def _solve_cells(grid, start_cells, engine):
+    """Worker task: solve grid from the given start cells only."""
+    return Boggle(grid, _worker_trie, engine=engine).getSolution(start_cells=start_cells)
+
+
+def _solve_board(item, engine):
+    """Worker task: solve one (grid id, grid) pair."""
+    grid_id, grid = item
+    return grid_id, Boggle(grid, _worker_trie, engine=engine).getSolution()
+
+
+def _check_trie_file(trie_path):
+    """Make sure the workers will be able to map trie_path before starting them."""
+    try:
+        MappedTrie(trie_path).close()
+        return
+    except ValueError as e:
+        if trie_path != compiled_trie_path():
+            raise DictionaryNotFound(f"Cannot use compiled dictionary: {e}") from e
+    # get_trie logs the bad file and rebuilds it from the word list
+    get_trie()
+    try:
+        MappedTrie(trie_path).close()
+    except ValueError as e:
+        raise DictionaryNotFound(f"Cannot use compiled dictionary: {e}") from e
+
+
+def get_pool(trie_path: str = None, workers: int = None) -> ProcessPoolExecutor:
+    """
+    Return the shared process pool for trie_path, creating it if needed.
+
+    The pool is recreated if a different dictionary or worker count is asked
+    for.
+    """
+    global _pool, _pool_key
+    if trie_path is None:
+        trie_path = compiled_trie_path()
+    if not os.path.exists(trie_path):
+        raise DictionaryNotFound(
+            f"Compiled dictionary not found at {trie_path}; run `manage.py builddictionary`"
+        )
+    workers = workers or default_workers()
+
+    with _pool_lock:
+        if _pool is not None and _pool_key != (trie_path, workers):
+            _pool.shutdown()
+            _pool = None
+        if _pool is None:
+            _check_trie_file(trie_path)
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(trie_path,),
+            )
+            _pool_key = (trie_path, workers)
+        return _pool
+
+
+def shutdown_pool():
+    """Stop the shared process pool, if one is running."""
+    global _pool, _pool_key
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = None
+        _pool_key = None
+
+
+def solve_parallel(grid, workers: int = None, trie_path: str = None,
+                   engine: str = "iterative"):
+    """
+    Solve one board using a pool of worker processes.
+
+    Parameters:
+    grid (list[list[str]]): Square Boggle board.
+    workers (int): Pool size (defaults to default_workers()). With 1 worker,
+        or a board smaller than settings.PARALLEL_MIN_BOARD_SIZE, the board
+        is solved in this process.
+    trie_path (str): Compiled trie file (defaults to settings.DICTIONARY_TRIE_PATH).
+    engine (str): Trie engine each worker runs ("trie" or "iterative").
+
+    Returns:
+    list[str]: Sorted list of unique words, identical to the serial result.
+    """
+    workers = workers or default_workers()
+    size = len(grid)
+    cells = list(range(size * size))
+    if not cells:
+        return []
+    if workers == 1 or size < min_board_size():
+        return Boggle(grid, _local_trie(trie_path), engine=engine).getSolution()
+
+    pool = get_pool(trie_path, workers)
+
+    chunk_count = min(len(cells), workers * CHUNKS_PER_WORKER)
+    chunks = [cells[i::chunk_count] for i in range(chunk_count)]
+
+    solutions = set()
+    for partial in pool.map(_solve_cells, [grid] * chunk_count, chunks, [engine] * chunk_count):
+        solutions.update(partial)
+    return sorted(solutions)
+
+
+def solve_many(grids, workers: int = None, trie_path: str = None,
+               engine: str = "iterative", chunksize: int = 16):
+    """
+    Solve many boards with one dictionary load per worker process.
+
+    Parameters:
+    grids (iterable[tuple[str, list[list[str]]]] | dict): (grid id, grid)
+        pairs, or a mapping of grid id to grid.
+    workers (int): Pool size (defaults to default_workers()). With 1 worker,
+        or fewer than settings.PARALLEL_MIN_BOARDS boards, the boards are
+        solved in this process against the shared dictionary from
+        api.dictionary, so no compiled trie file is needed.
+    trie_path (str): Compiled trie file (defaults to settings.DICTIONARY_TRIE_PATH).
+    engine (str): Trie engine to run ("trie" or "iterative").
+    chunksize (int): Boards sent to a worker per task.
+
+    Boards are looked up in (and added to) solve_cache first, unless
+    trie_path names another dictionary.
+
+    Yields:
+    tuple[str, list[str]]: (grid id, sorted words) in input order.
+    """
+    if isinstance(grids, dict):
+        grids = grids.items()
+    grids = iter(grids)
+
+    workers = workers or default_workers()
+    # Look ahead far enough to tell whether the batch is worth the pool
+    head = list(islice(grids, min_boards())) if workers > 1 else []
+    serial = workers == 1 or len(head) < min_boards()
+
+    # Boards solved before (with SOLVE_CACHE_PATH, by any process) are not
+    # solved again; the cache is keyed by the default word list's version
+    use_cache = trie_path is None
+    items = (
+        (grid_id, grid, solve_cache.cached(grid) if use_cache else None)
+        for grid_id, grid in chain(head, grids)
+    )
+
+    if serial:
+        trie = _local_trie(trie_path)
+        for grid_id, grid, words in items:
+            if words is None:
+                words = Boggle(grid, trie, engine=engine).getSolution()
+                if use_cache:
+                    solve_cache.store(grid, words)
+            yield grid_id, words
+        return
+
+    items, pending = tee(items)
+    pool = get_pool(trie_path, workers)
+    misses = ((grid_id, grid) for grid_id, grid, words in pending if words is None)
+    solved = pool.map(_solve_board, misses, repeat(engine), chunksize=chunksize)
+    for grid_id, grid, words in items:
+        if words is None:
+            _, words = next(solved)
+            if use_cache:
+                solve_cache.store(grid, words)
+        yield grid_id, words
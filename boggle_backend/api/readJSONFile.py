@@ -2,6 +2,7 @@
 import re
 import sys
 import json
+import itertools
 
 def read_json_to_list(file_path):
     # Open and read the JSON file    
@@ -16,4 +17,31 @@ def read_json_to_list(file_path):
     for value in data.values():
         if isinstance(value, list):
             string_list.extend(value)
-    return string_list
\ No newline at end of file
+    return string_list
+
+
+def read_id_records(file):
+    """
+    Yield (id, record) pairs from an open JSON Lines or JSON file.
+
+    JSON Lines hold one object per line with an "id" (the line number if it
+    is missing), which is taken out of the record, and are read a line at a
+    time. A JSON file maps ids to records (the format of
+    firestore_challenges.json and challenge_solutions.json).
+    """
+    first_line = file.readline()
+    try:
+        record = json.loads(first_line)
+    except json.JSONDecodeError:
+        record = None
+
+    # A JSON Lines record has an id or a grid; anything else is a JSON object of records
+    if not isinstance(record, dict) or not {'id', 'grid'} & record.keys():
+        data = record if isinstance(record, dict) else json.loads(first_line + file.read())
+        yield from data.items()
+        return
+
+    for line_number, line in enumerate(itertools.chain([first_line], file), start=1):
+        if line.strip():
+            record = json.loads(line)
+            yield str(record.pop('id', line_number)), record
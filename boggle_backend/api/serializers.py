@@ -1,45 +1,23 @@
 from rest_framework import serializers
 from .models import Games
-import json
 
 # creating a model class below
 class GamesSerializer(serializers.ModelSerializer):
-    # Custom fields to handle JSON serialization/deserialization
-    grid = serializers.CharField()
-    foundwords = serializers.CharField()
+    # grid is a JSON column, so it is read and written as a list; the words
+    # come from the game's shared Solution (or its own foundwords copy)
+    foundwords = serializers.JSONField(source='words', read_only=True)
     
     class Meta:
         model = Games
-        fields = '__all__'
+        exclude = ('solution',)
+        read_only_fields = ('word_count', 'max_word_length')
     
-    def to_representation(self, instance):
-        """Convert JSON strings to Python objects when reading"""
-        representation = super().to_representation(instance)
-        try:
-            representation['grid'] = json.loads(representation['grid']) if representation.get('grid') else []
-        except (json.JSONDecodeError, TypeError):
-            representation['grid'] = []
-        
-        try:
-            representation['foundwords'] = json.loads(representation['foundwords']) if representation.get('foundwords') else []
-        except (json.JSONDecodeError, TypeError):
-            representation['foundwords'] = []
-        
-        return representation
-    
-    def to_internal_value(self, data):
-        """Ensure grid and foundwords are JSON strings when writing"""
-        # If grid/foundwords are already strings (JSON), keep them
-        # If they're lists/dicts, convert to JSON
-        if 'grid' in data and isinstance(data['grid'], (list, dict)):
-            data = data.copy()
-            data['grid'] = json.dumps(data['grid'])
-        
-        if 'foundwords' in data and isinstance(data['foundwords'], (list, dict)):
-            data = data.copy()
-            data['foundwords'] = json.dumps(data['foundwords'])
-        
-        return super().to_internal_value(data)
+    def __init__(self, *args, fields=None, **kwargs):
+        """fields (iterable of str): Only include these fields, if given"""
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
 
 # Note: Challenge and LeaderboardEntry serializers removed
 # Challenges are now handled via Firestore in firestore_service.py
\ No newline at end of file
@@ -0,0 +1,49 @@
+"""
+Deduplicated solution storage.
+
+A board's solution set does not change under any of its 8 symmetries
+(rotations and reflections keep every adjacency, diagonals included). Each
+solved board is therefore stored once per word list, in a Solution row
+keyed by the dictionary's version (dictionary.dictionary_version) and
+boggle_solver.grid_hash(): a hash of the smallest of the board's 8
+orientations. Games link to that row instead of copying the word list,
+and solution_for() looks it up before solving, so a repeated, rotated or
+mirrored board is never solved twice, and a changed word list never
+serves words from the old one.
+"""
+
+from django.db import IntegrityError, transaction
+
+from .boggle_solver import grid_hash
+from .dictionary import dictionary_version
+from .models import Solution
+from .solve_cache import solve
+
+
+def solution_for(grid, words=None, dictionary_id: str = None) -> Solution:
+    """
+    Return the stored Solution of grid or of any rotation/reflection of it.
+
+    Parameters:
+    grid (list[list[str]]): Square Boggle board.
+    words (list[str]): The board's solution, if already known. Only used
+        when nothing is stored yet; otherwise the board is solved here.
+    dictionary_id (str): Word list the words come from (defaults to the
+        bundled ENABLE list, as for dictionary.get_trie).
+
+    Returns:
+    Solution: The (possibly new) row.
+    """
+    key = {'dictionary_version': dictionary_version(dictionary_id), 'grid_hash': grid_hash(grid)}
+    solution = Solution.objects.filter(**key).first()
+    if solution is not None:
+        return solution
+
+    if words is None:
+        words = solve(grid, dictionary_id)
+    try:
+        with transaction.atomic():
+            return Solution.objects.create(size=len(grid), words=words, **key)
+    except IntegrityError:
+        # Stored by a concurrent request in the meantime
+        return Solution.objects.get(**key)
@@ -0,0 +1,181 @@
+"""
+Memoized solving: solve(grid, dictionary_id) with a bounded LRU in front of
+the solver and, optionally, a persistent SQLite cache behind it.
+
+Entries are keyed by the dictionary's version (a hash of the word list,
+see dictionary.dictionary_version) and the board's canonical hash (the
+same for all 8 rotations and reflections, see boggle_solver.grid_hash),
+so a changed word list never serves stale solutions and a rotated board
+is a hit. Batch solvers (parallel.solve_many) check the cache with cached()
+and record what their worker processes solve with store().
+
+The in-process LRU holds SOLVE_CACHE_SIZE boards. Set SOLVE_CACHE_PATH to
+a file to also keep solutions on disk, where every process and later runs
+of the scripts share them. cache_stats() reports hits, misses and
+evictions (served to admins at /api/diagnostics/solve-cache).
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional
+
+from django.conf import settings
+
+from .boggle_solver import Boggle, grid_hash
+from .dictionary import dictionary_version, get_trie
+
+logger = logging.getLogger(__name__)
+
+_entries = OrderedDict()  # (dictionary version, grid hash) -> tuple of words
+_lock = threading.Lock()
+_stats = Counter()
+
+_db = None
+_db_path = None
+_db_lock = threading.Lock()
+
+
+def cache_size() -> int:
+    return getattr(settings, 'SOLVE_CACHE_SIZE', 1024)
+
+
+def cache_path():
+    path = getattr(settings, 'SOLVE_CACHE_PATH', None)
+    return str(path) if path else None
+
+
+def solve(grid, dictionary_id: str = None) -> List[str]:
+    """
+    Sorted words on grid, from the cache when this board was solved before.
+
+    Parameters:
+    grid (list[list[str]]): Square Boggle board.
+    dictionary_id (str): Word list file to solve against (defaults to the
+        bundled ENABLE list, as for dictionary.get_trie).
+
+    Returns:
+    list[str]: A new list each call, so callers may modify it.
+    """
+    key = _key(grid, dictionary_id)
+    words = _lookup(key)
+    if words is None:
+        words = tuple(Boggle(grid, get_trie(dictionary_id)).getSolution())
+        _save(key, words)
+        _remember(key, words, 'misses')
+    return list(words)
+
+
+def cached(grid, dictionary_id: str = None) -> Optional[List[str]]:
+    """The words of grid if it was solved before (counted as a hit), else None."""
+    words = _lookup(_key(grid, dictionary_id))
+    return None if words is None else list(words)
+
+
+def store(grid, words, dictionary_id: str = None):
+    """Record words solved outside solve(), e.g. by a worker process (counted as a miss)."""
+    key = _key(grid, dictionary_id)
+    words = tuple(words)
+    _save(key, words)
+    _remember(key, words, 'misses')
+
+
+def _key(grid, dictionary_id):
+    return dictionary_version(dictionary_id), grid_hash(grid)
+
+
+def _lookup(key):
+    """Cached words for key from memory, then disk; None on a miss."""
+    with _lock:
+        words = _entries.get(key)
+        if words is not None:
+            _entries.move_to_end(key)
+            _stats['hits'] += 1
+            return words
+
+    words = _load(key)
+    if words is not None:
+        _remember(key, words, 'disk_hits')
+    return words
+
+
+def _remember(key, words, outcome):
+    with _lock:
+        _stats[outcome] += 1
+        _entries[key] = words
+        _entries.move_to_end(key)
+        while len(_entries) > cache_size():
+            _entries.popitem(last=False)
+            _stats['evictions'] += 1
+
+
+def _connection():
+    """Shared connection to the SQLite cache, or None if it is disabled."""
+    global _db, _db_path
+    path = cache_path()
+    if path != _db_path:
+        if _db is not None:
+            _db.close()
+        _db, _db_path = None, path
+        if path:
+            _db = sqlite3.connect(path, check_same_thread=False)
+            _db.execute(
+                "CREATE TABLE IF NOT EXISTS solutions "
+                "(version TEXT, grid_hash TEXT, words TEXT, PRIMARY KEY (version, grid_hash))"
+            )
+            _db.commit()
+    return _db
+
+
+def _load(key):
+    with _db_lock:
+        try:
+            db = _connection()
+            if db is None:
+                return None
+            row = db.execute(
+                "SELECT words FROM solutions WHERE version = ? AND grid_hash = ?", key
+            ).fetchone()
+        except sqlite3.Error:
+            logger.exception("Could not read the solve cache at %s", _db_path)
+            return None
+    return tuple(json.loads(row[0])) if row else None
+
+
+def _save(key, words):
+    with _db_lock:
+        try:
+            db = _connection()
+            if db is None:
+                return
+            db.execute(
+                "INSERT OR REPLACE INTO solutions VALUES (?, ?, ?)",
+                (*key, json.dumps(words, separators=(',', ':'))),
+            )
+            db.commit()
+        except sqlite3.Error:
+            logger.exception("Could not write the solve cache at %s", _db_path)
+
+
+def cache_stats() -> Dict[str, int]:
+    """Hits (in memory and on disk), misses, evictions and current size."""
+    with _lock:
+        stats = {name: _stats[name] for name in ('hits', 'disk_hits', 'misses', 'evictions')}
+        stats['size'] = len(_entries)
+        stats['max_size'] = cache_size()
+    return stats
+
+
+def clear_cache(persistent: bool = False):
+    """Empty the in-process cache and reset the counters (and the disk cache, if asked)."""
+    with _lock:
+        _entries.clear()
+        _stats.clear()
+    if persistent:
+        with _db_lock:
+            db = _connection()
+            if db is not None:
+                db.execute("DELETE FROM solutions")
+                db.commit()
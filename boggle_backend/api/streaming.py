@@ -0,0 +1,113 @@
+"""
+Incremental JSON responses.
+
+JsonResponse and DRF's Response encode the whole payload into one string
+before sending it, so a request's peak memory grows with the result (a
+page of 10x10 games carries thousands of words each). The helpers here
+encode one item at a time and send the output in CHUNK_SIZE pieces through
+a StreamingHttpResponse, so only the item being encoded and one chunk are
+held at once.
+
+Items may be produced lazily (e.g. from QuerySet.iterator()); the response
+is valid JSON as long as the producer does not fail halfway, which is why
+callers validate input and run their queries' error checks before
+streaming.
+
+Django serves a StreamingHttpResponse under ASGI only from an async
+iterator; a sync one is read to the end first, buffering the whole body.
+Async views pass is_async=True. Sync views whose producer queries the
+database use sync_json_stream_response(), which produces each chunk in the
+view's sync thread when the request came through ASGI.
+"""
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+CHUNK_SIZE = 16 * 1024
+
+_encoder = DjangoJSONEncoder()
+
+
+def iter_json(value):
+    """Yield the JSON encoding of value in pieces."""
+    return _encoder.iterencode(value)
+
+
+def iter_json_array(items):
+    """Yield the JSON encoding of an iterable of items, one item at a time."""
+    yield '['
+    for index, item in enumerate(items):
+        if index:
+            yield ','
+        yield from iter_json(item)
+    yield ']'
+
+
+def iter_json_object(members):
+    """
+    Yield the JSON encoding of an object from (key, value) pairs.
+
+    A value that is an iterator (not a list or dict) is streamed as an
+    array, so a member can be produced lazily.
+    """
+    yield '{'
+    for index, (key, value) in enumerate(members):
+        if index:
+            yield ','
+        yield from iter_json(key)
+        yield ':'
+        if hasattr(value, '__next__'):
+            yield from iter_json_array(value)
+        else:
+            yield from iter_json(value)
+    yield '}'
+
+
+def chunked(pieces, size=CHUNK_SIZE):
+    """Join small encoder pieces into chunks of about size characters."""
+    buffer, length = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        length += len(piece)
+        if length >= size:
+            yield ''.join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+async def achunked(pieces, size=CHUNK_SIZE):
+    """chunked() as an async iterator, for responses of async views."""
+    for chunk in chunked(pieces, size):
+        yield chunk
+
+
+async def achunked_in_thread(pieces, size=CHUNK_SIZE):
+    """chunked() as an async iterator whose pieces are produced in the sync thread."""
+    chunks = chunked(pieces, size)
+    next_chunk = sync_to_async(next)
+    while True:
+        chunk = await next_chunk(chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+def json_stream_response(pieces, status=200, is_async=False):
+    """StreamingHttpResponse sending the JSON pieces in chunks."""
+    return StreamingHttpResponse(
+        achunked(pieces) if is_async else chunked(pieces),
+        status=status,
+        content_type='application/json',
+    )
+
+
+def sync_json_stream_response(request, pieces, status=200):
+    """json_stream_response() for a sync view, streamed under both WSGI and ASGI."""
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        pieces = achunked_in_thread(pieces)
+    else:
+        pieces = chunked(pieces)
+    return StreamingHttpResponse(pieces, status=status, content_type='application/json')
@@ -1,3 +1,756 @@
-from django.test import TestCase
+import importlib
+import io
+import json
+import os
+import tempfile
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.core.cache import caches
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from . import board_pool, firestore_service, game_jobs, leaderboard, parallel, solutions, solve_cache
+from .boggle_solver import Boggle, MappedTrie, Trie, grid_hash
+from .challenge_pipeline import CHALLENGES, generate
+from .challenge_schema import LEGACY_FIELDS
+from .challenge_upload import upload_challenges
+from .dictionary import clear_cache, dictionary_version, get_trie, get_word_index
+from .models import GameJob, Games, PooledBoard, Solution
+from .readJSONFile import read_id_records
+from .ttl_cache import TTLCache
+
+
+class CompiledDictionaryTests(SimpleTestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.trie')
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+        clear_cache()
+        self.addCleanup(clear_cache)
+
+    def test_corrupt_file_falls_back_to_word_list_and_is_rebuilt(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'not a compiled trie')
+        with override_settings(DICTIONARY_TRIE_PATH=self.path):
+            with self.assertLogs('api', 'WARNING'):
+                trie = get_trie()
+            self.assertIsInstance(trie, Trie)
+            self.assertIn('CART', set(trie.iter_words()))
+
+            rebuilt = get_trie()
+            self.assertIsInstance(rebuilt, MappedTrie)
+            self.assertEqual(len(trie), len(rebuilt))
+
+
+class DictionaryReloadTests(SimpleTestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.json')
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+        clear_cache()
+        self.addCleanup(clear_cache)
+        self.mtime = 1_000_000_000
+
+    def write_words(self, *words):
+        with open(self.path, 'w') as f:
+            json.dump({'source': 'test', 'words': list(words)}, f)
+        # Later writes must look newer even within the filesystem's mtime resolution
+        self.mtime += 10
+        os.utime(self.path, (self.mtime, self.mtime))
+
+    def loaded(self, file_path=None):
+        return (
+            set(get_word_index(file_path).words),
+            set(get_trie(file_path).iter_words()),
+            dictionary_version(file_path),
+        )
+
+    def test_changed_word_list_is_reloaded(self):
+        self.write_words('cart', 'home')
+        words, trie_words, version = self.loaded(self.path)
+        self.assertEqual(words, {'CART', 'HOME'})
+        self.assertEqual(trie_words, words)
+
+        self.write_words('cart', 'home', 'play')
+        words, trie_words, new_version = self.loaded(self.path)
+        self.assertEqual(words, {'CART', 'HOME', 'PLAY'})
+        self.assertEqual(trie_words, words)
+        self.assertNotEqual(new_version, version)
+
+    def test_default_word_list_is_reloaded_past_the_compiled_trie(self):
+        self.write_words('cart')
+        with mock.patch('api.dictionary.find_wordlist', return_value=self.path), \
+                override_settings(DICTIONARY_TRIE_PATH=self.path + '.trie'):
+            self.assertEqual(self.loaded(), self.loaded(self.path))
+            self.write_words('home')
+            words, trie_words, version = self.loaded()
+        self.assertEqual((words, trie_words), ({'HOME'}, {'HOME'}))
+        self.assertEqual(version, dictionary_version(self.path))
+
+
+@override_settings(PARALLEL_MIN_BOARD_SIZE=8, PARALLEL_MIN_BOARDS=4)
+class ParallelThresholdTests(SimpleTestCase):
+    GRID = [["C", "A", "R", "T"], ["H", "O", "M", "E"], ["T", "T", "A", "R"], ["P", "L", "A", "Y"]]
+
+    def setUp(self):
+        solve_cache.clear_cache()
+        self.addCleanup(solve_cache.clear_cache)
+
+    def test_small_jobs_are_solved_in_process(self):
+        expected = Boggle(self.GRID, get_trie(), engine="iterative").getSolution()
+        with mock.patch.object(parallel, 'get_pool') as get_pool:
+            self.assertEqual(parallel.solve_parallel(self.GRID, workers=4), expected)
+            boards = [(index, self.GRID) for index in range(3)]
+            self.assertEqual(list(parallel.solve_many(boards, workers=4)),
+                             [(index, expected) for index in range(3)])
+        get_pool.assert_not_called()
+
+    def test_large_batches_use_the_pool(self):
+        boards = [(index, self.GRID) for index in range(4)]
+        sent = []
+
+        def solve_in_pool(function, items, engines, chunksize):
+            sent.extend(items)
+            return iter([(grid_id, ['CART']) for grid_id, _ in sent])
+
+        with mock.patch.object(parallel, 'get_pool') as get_pool:
+            get_pool.return_value.map.side_effect = solve_in_pool
+            solved = list(parallel.solve_many(boards, workers=4))
+        get_pool.assert_called_once_with(None, 4)
+        self.assertEqual(sent, boards)
+        self.assertEqual(solved, [(index, ['CART']) for index in range(4)])
+
+    def test_cached_boards_are_not_sent_to_the_pool(self):
+        expected = solve_cache.solve(self.GRID)
+        other = [["D", "O", "G", "S"], ["E", "A", "T", "S"], ["R", "A", "T", "S"], ["B", "E", "E", "S"]]
+        boards = [(0, self.GRID), (1, other), (2, self.GRID), (3, self.GRID)]
+        with mock.patch.object(parallel, 'get_pool') as get_pool:
+            get_pool.return_value.map.side_effect = (
+                lambda function, items, engines, chunksize: iter([(grid_id, ['DOGS']) for grid_id, _ in items])
+            )
+            solved = list(parallel.solve_many(boards, workers=4))
+        self.assertEqual(solved, [(0, expected), (1, ['DOGS']), (2, expected), (3, expected)])
+        self.assertEqual(solve_cache.cached(other), ['DOGS'])
+
+
+@override_settings(SOLVE_CACHE_SIZE=2, SOLVE_CACHE_PATH=None)
+class SolveCacheTests(SimpleTestCase):
+    GRIDS = [
+        [["C", "A", "R", "T"], ["H", "O", "M", "E"], ["T", "T", "A", "R"], ["P", "L", "A", "Y"]],
+        [["D", "O", "G", "S"], ["E", "A", "T", "S"], ["R", "A", "T", "S"], ["B", "E", "E", "S"]],
+        [["S", "T", "O", "P"], ["L", "I", "N", "E"], ["R", "A", "C", "E"], ["W", "O", "R", "D"]],
+    ]
+
+    def setUp(self):
+        solve_cache.clear_cache()
+        self.addCleanup(solve_cache.clear_cache)
+
+    def stats(self, *names):
+        stats = solve_cache.cache_stats()
+        return [stats[name] for name in names]
+
+    def test_hits_and_misses_are_counted(self):
+        expected = Boggle(self.GRIDS[0], get_trie()).getSolution()
+        self.assertEqual(solve_cache.solve(self.GRIDS[0]), expected)
+        self.assertEqual(solve_cache.solve(self.GRIDS[0]), expected)
+        self.assertEqual(self.stats('hits', 'misses', 'evictions', 'size'), [1, 1, 0, 1])
+
+    def test_rotated_board_is_a_hit(self):
+        words = solve_cache.solve(self.GRIDS[0])
+        rotated = [list(row) for row in zip(*self.GRIDS[0][::-1])]
+        self.assertEqual(solve_cache.solve(rotated), words)
+        self.assertEqual(self.stats('hits', 'misses'), [1, 1])
+
+    def test_least_recently_used_board_is_evicted(self):
+        first, second, third = self.GRIDS
+        solve_cache.solve(first)
+        solve_cache.solve(second)
+        solve_cache.solve(first)  # second is now the oldest
+        solve_cache.solve(third)
+        self.assertEqual(self.stats('evictions', 'size', 'max_size'), [1, 2, 2])
+        self.assertIsNotNone(solve_cache.cached(first))
+        self.assertIsNone(solve_cache.cached(second))
+
+    def test_disk_cache_survives_clearing_memory(self):
+        handle, path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        with override_settings(SOLVE_CACHE_PATH=path):
+            words = solve_cache.solve(self.GRIDS[0])
+            solve_cache.clear_cache()
+            with mock.patch.object(solve_cache, 'Boggle') as boggle:
+                self.assertEqual(solve_cache.solve(self.GRIDS[0]), words)
+            boggle.assert_not_called()
+            self.assertEqual(self.stats('disk_hits', 'misses', 'size'), [1, 0, 1])
+        # Closes the connection to the temporary file
+        solve_cache._connection()
+
+
+@mock.patch.object(game_jobs, '_get_executor')
+class IdempotencyKeyTests(TestCase):
+    def create(self, size, key):
+        return self.client.post(f'/api/game/create/{size}/async', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_repeated_key_returns_the_same_job(self, get_executor):
+        first = self.create(4, 'abc')
+        second = self.create(4, 'abc')
+        self.assertEqual(first.status_code, 202)
+        self.assertEqual(second.status_code, 202)
+        self.assertEqual(first.json()['job_id'], second.json()['job_id'])
+        get_executor.return_value.submit.assert_called_once()
+
+    @override_settings(GAME_JOB_KEY_TTL=60)
+    def test_expired_key_starts_a_new_job(self, get_executor):
+        first = self.create(4, 'abc')
+        GameJob.objects.filter(pk=first.json()['job_id']).update(created_at=timezone.now() - timedelta(seconds=61))
+        second = self.create(5, 'abc')
+        self.assertEqual(second.status_code, 202)
+        self.assertNotEqual(second.json()['job_id'], first.json()['job_id'])
+        self.assertEqual(get_executor.return_value.submit.call_count, 2)
+        self.assertIsNone(GameJob.objects.get(pk=first.json()['job_id']).key)
+
+    def test_key_reused_for_another_size_is_rejected(self, get_executor):
+        self.create(4, 'abc')
+        response = self.create(5, 'abc')
+        self.assertEqual(response.status_code, 422)
+        get_executor.return_value.submit.assert_called_once()
+
+
+class SolutionTests(TestCase):
+    GRID = [["C", "A", "R", "T"], ["H", "O", "M", "E"], ["T", "T", "A", "R"], ["P", "L", "A", "Y"]]
+
+    def test_rotated_board_reuses_the_solution(self):
+        solution = solutions.solution_for(self.GRID)
+        rotated = [list(row) for row in zip(*self.GRID[::-1])]
+        self.assertEqual(solutions.solution_for(rotated).pk, solution.pk)
+        self.assertEqual(solution.dictionary_version, dictionary_version())
+        self.assertIn('CART', solution.words)
+
+    def test_other_word_list_gets_its_own_solution(self):
+        solution = solutions.solution_for(self.GRID)
+        with mock.patch.object(solutions, 'dictionary_version', return_value='0123456789abcdef'):
+            other = solutions.solution_for(self.GRID, ['CART'])
+        self.assertNotEqual(other.pk, solution.pk)
+        self.assertEqual(other.words, ['CART'])
+        self.assertEqual(Solution.objects.filter(grid_hash=grid_hash(self.GRID)).count(), 2)
+
+    def test_migration_hashes_like_the_solver(self):
+        migration = importlib.import_module('api.migrations.0009_solution')
+        for grid in (self.GRID, [["Qu", "A"], ["St", "Ie"]], [["A", "B", "C"]], []):
+            self.assertEqual(migration.grid_hash(grid), grid_hash(grid))
+
+
+class LegacyJsonMigrationTests(TransactionTestCase):
+    """0008 turns the old text columns into JSON, then 0009 links the words into Solutions."""
+
+    BEFORE = ('api', '0007_games_word_count_games_max_word_length')
+    JSON = ('api', '0008_alter_games_foundwords_alter_games_grid_and_more')
+    SOLUTIONS = ('api', '0009_solution')
+
+    def migrate(self, target):
+        executor = MigrationExecutor(connection)
+        executor.migrate([target])
+        return executor.loader.project_state([target]).apps
+
+    def setUp(self):
+        latest = MigrationExecutor(connection).loader.graph.leaf_nodes('api')
+        self.addCleanup(self.migrate, latest[0])
+
+    def test_text_columns_become_json_and_link_solutions(self):
+        apps = self.migrate(self.BEFORE)
+        Games = apps.get_model('api', 'Games')
+        grid = '[["C","A"],["T","S"]]'
+        games = {
+            'valid': Games.objects.create(name='valid', size=2, grid=grid, foundwords='["CAT", "CATS"]'),
+            'twice': Games.objects.create(name='twice', size=2, grid=json.dumps(grid), foundwords='"[\\"ACT\\"]"'),
+            'empty': Games.objects.create(name='empty', size=2, grid='', foundwords=''),
+            'broken': Games.objects.create(name='broken', size=2, grid='[["C",', foundwords='CAT, CATS'),
+            'object': Games.objects.create(name='object', size=2, grid='{}', foundwords='{"CAT": 1}'),
+        }
+        apps.get_model('api', 'PooledBoard').objects.create(size=2, grid=grid, foundwords='not json')
+
+        apps = self.migrate(self.JSON)
+        Games = apps.get_model('api', 'Games')
+        converted = {game.name: (game.grid, game.foundwords) for game in Games.objects.all()}
+        self.assertEqual(converted, {
+            'valid': ([["C", "A"], ["T", "S"]], ["CAT", "CATS"]),
+            'twice': ([["C", "A"], ["T", "S"]], ["ACT"]),
+            'empty': ([], []),
+            'broken': ([], []),
+            'object': ([], []),
+        })
+        self.assertEqual(apps.get_model('api', 'PooledBoard').objects.get().foundwords, [])
+        # The text columns were NOT NULL, but a NULL would convert the same way
+        migration = importlib.import_module('api.migrations.0008_alter_games_foundwords_alter_games_grid_and_more')
+        self.assertEqual(migration.decode(None), [])
+
+        apps = self.migrate(self.SOLUTIONS)
+        Games = apps.get_model('api', 'Games')
+        linked = {game.name: game for game in Games.objects.select_related('solution')}
+        self.assertEqual(set(linked), set(games))
+        for game in linked.values():
+            self.assertIsNone(game.foundwords)
+        self.assertEqual(linked['valid'].solution_id, linked['twice'].solution_id)
+        self.assertEqual(linked['valid'].solution.words, ["CAT", "CATS"])
+        self.assertEqual(linked['valid'].solution.grid_hash, grid_hash([["C", "A"], ["T", "S"]]))
+        self.assertEqual(linked['empty'].solution.words, [])
+        self.assertEqual(apps.get_model('api', 'Solution').objects.count(), 2)
+
+
+@override_settings(BOARD_POOL_SIZES=[4], BOARD_POOL_LOW_WATERMARK=2, BOARD_POOL_HIGH_WATERMARK=3)
+class BoardPoolTests(TestCase):
+    GRID = [["C", "A", "R", "T"], ["H", "O", "M", "E"], ["T", "T", "A", "R"], ["P", "L", "A", "Y"]]
+
+    def pool(self, *versions):
+        return [
+            PooledBoard.objects.create(size=4, grid=self.GRID, foundwords=['CART'], dictionary_version=version)
+            for version in versions
+        ]
+
+    def test_refill_tops_up_to_the_target(self):
+        self.pool(dictionary_version())
+        self.assertEqual(board_pool.refill(4), 2)
+        self.assertEqual(board_pool.refill(4), 0)
+        self.assertEqual(PooledBoard.objects.filter(size=4, dictionary_version=dictionary_version()).count(), 3)
+
+    def test_pop_board_takes_the_oldest_board(self):
+        first, second = self.pool(dictionary_version(), dictionary_version())
+        second.foundwords = ['HOME']
+        second.save()
+        self.assertEqual(board_pool.pop_board(4), (self.GRID, ['CART']))
+        self.assertEqual(board_pool.pop_board(4), (self.GRID, ['HOME']))
+        self.assertIsNone(board_pool.pop_board(4))
+
+    def test_boards_from_another_word_list_are_discarded(self):
+        self.pool('', '0123456789abcdef')
+        self.assertIsNone(board_pool.pop_board(4))
+        self.assertFalse(PooledBoard.objects.exists())
+
+    @mock.patch.object(board_pool.threading, 'Thread')
+    def test_next_board_uses_the_pool_and_refills_below_the_low_watermark(self, thread):
+        self.pool(dictionary_version(), dictionary_version(), dictionary_version())
+        grid, solution = board_pool.next_board(4)
+        self.assertEqual(grid, self.GRID)
+        self.assertEqual(solution.words, ['CART'])
+        thread.assert_not_called()  # two boards left, at the low watermark
+
+        board_pool.next_board(4)
+        thread.assert_called_once()
+        thread.return_value.start.assert_called_once()
+
+    @mock.patch.object(board_pool, 'request_refill')
+    def test_next_board_solves_inline_when_the_pool_is_empty(self, request_refill):
+        self.pool('')
+        grid, solution = board_pool.next_board(4)
+        self.assertEqual(solution.words, Boggle(grid, get_trie()).getSolution())
+        self.assertEqual(solution.dictionary_version, dictionary_version())
+        request_refill.assert_called_once_with(4)
+
+
+class GamesApiTests(TestCase):
+    GRID = [["C", "A", "R", "T"], ["H", "O", "M", "E"], ["T", "T", "A", "R"], ["P", "L", "A", "Y"]]
+
+    def setUp(self):
+        self.games = [
+            Games.objects.create(name=f'Game{index}', size=4, grid=self.GRID, foundwords=['CART', 'HOME'][:index])
+            for index in range(3)
+        ]
+
+    def test_get_game(self):
+        response = self.client.get(f'/api/game/{self.games[2].pk}')
+        self.assertFalse(response.streaming)
+        self.assertEqual(response.json()['foundwords'], ['CART', 'HOME'])
+
+    def test_pages_follow_the_next_link(self):
+        names, url = [], '/api/games/?limit=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            page = json.loads(response.getvalue())
+            names += [game['name'] for game in page['results']]
+            self.assertLessEqual(len(page['results']), 2)
+            url = page['next']
+        self.assertEqual(names, ['Game0', 'Game1', 'Game2'])
+
+        page = json.loads(self.client.get(f'/api/games/?after={self.games[1].pk}').getvalue())
+        self.assertEqual([game['name'] for game in page['results']], ['Game2'])
+        self.assertIsNone(page['next'])
+
+    @override_settings(GAMES_MAX_PAGE_SIZE=10)
+    def test_bad_paging_parameters_are_rejected(self):
+        for query in ('after=x', 'limit=two', 'limit=0', 'limit=11', 'fields=name,secret'):
+            with self.subTest(query):
+                self.assertEqual(self.client.get(f'/api/games/?{query}').status_code, 400)
+
+    def test_fields_selects_the_returned_fields(self):
+        page = json.loads(self.client.get('/api/games/?fields=id,name,word_count&limit=2').getvalue())
+        self.assertEqual(page['results'], [
+            {'id': self.games[0].pk, 'name': 'Game0', 'word_count': 0},
+            {'id': self.games[1].pk, 'name': 'Game1', 'word_count': 1},
+        ])
+        self.assertIn('fields=id%2Cname%2Cword_count', page['next'])
+
+        page = json.loads(self.client.get('/api/games/?fields=name,foundwords').getvalue())
+        self.assertEqual(page['results'][2], {'name': 'Game2', 'foundwords': ['CART', 'HOME']})
+
+    def test_save_keeps_the_word_summary_in_step(self):
+        game = self.games[0]
+        self.assertEqual((game.word_count, game.max_word_length), (0, 0))
+
+        game.foundwords = ['CART', 'PLAYER']
+        game.save(update_fields=['foundwords'])
+        game.refresh_from_db()
+        self.assertEqual((game.word_count, game.max_word_length), (2, 6))
+
+        game.solution = solutions.solution_for(self.GRID)
+        game.save()
+        game.refresh_from_db()
+        self.assertEqual(game.word_count, len(game.solution.words))
+        self.assertEqual(game.max_word_length, max(map(len, game.solution.words)))
+
+    async def test_games_are_streamed_under_asgi(self):
+        response = await self.async_client.get('/api/games/')
+        self.assertTrue(response.is_async)
+        page = json.loads(await read_stream(response))
+        self.assertEqual([game['name'] for game in page['results']], ['Game0', 'Game1', 'Game2'])
+
+
+@override_settings(FIRESTORE_BACKEND='memory', CHALLENGE_CACHE_BACKEND=None)
+class FirestoreTestCase(SimpleTestCase):
+    """Runs against a fresh in-memory Firestore (see memory_firestore)."""
+
+    def setUp(self):
+        firestore_service.reset_client()
+        self.addCleanup(firestore_service.reset_client)
+        self.db = firestore_service.get_firestore_client()
+        # Every test runs in one process, so the local caches are all there is
+        self.enterContext(mock.patch.object(TTLCache, 'shared', True))
+
+    def challenge(self, challenge_id):
+        return self.db.collection('Challenges').document(challenge_id).get().to_dict()
+
+    def add_entries(self, challenge_id, *scores):
+        entries = self.db.collection('leaderboards').document(challenge_id).collection('entries')
+        for index, score in enumerate(scores):
+            entries.document(f'entry{index}').set(
+                {'score': score, 'username': f'player{index}', 'wordsFound': 1, 'timeTaken': 10}
+            )
+
+
+class HighScoreFieldTests(FirestoreTestCase):
+    def test_upload_writes_null_high_score_for_new_challenges_only(self):
+        challenge_id = 'challenge_timed_30s'
+        upload_challenges({challenge_id: CHALLENGES[challenge_id]}, db=self.db)
+        self.assertIn('highScore', self.challenge(challenge_id))
+        self.assertIsNone(self.challenge(challenge_id)['highScore'])
+
+        best = {'score': 7, 'username': 'ada', 'wordsFound': 3, 'timeTaken': 20}
+        self.db.collection('Challenges').document(challenge_id).update({'highScore': best})
+        changed = dict(CHALLENGES[challenge_id], name='Renamed')
+        self.assertEqual(upload_challenges({challenge_id: changed}, db=self.db)['written'], [challenge_id])
+        self.assertEqual(self.challenge(challenge_id)['highScore'], best)
+
+    def test_backfill_writes_the_best_leaderboard_entry(self):
+        challenge_id = 'challenge_timed_30s'
+        upload_challenges({challenge_id: CHALLENGES[challenge_id]}, db=self.db)
+        self.add_entries(challenge_id, 3, 9, 5)
+
+        top = firestore_service.backfill_high_score(challenge_id)
+        self.assertEqual(top['score'], 9)
+        self.assertEqual(self.challenge(challenge_id)['highScore'], top)
+
+
+class ChallengeMigrationTests(FirestoreTestCase):
+    LEGACY = {
+        'json': {
+            'id': 'json', 'name': 'Old', 'type': 'time_limited', 'grid': '[["a","b"],["c","d"]]',
+            'solutions': '["cab", "bad", "CAB"]', 'is_active': 'true', 'time_limit': 60,
+            'created_at': '2024-01-01', 'highScore': 12,
+        },
+        'rows': {'array': ['AB', 'CD'], 'solutions': ['dab,cab'], 'isActive': False, 'word_goal': 3},
+        'flat': {'board': ['A', 'B', 'C', 'D'], 'solutions': ['bad'], 'isActive': 'False'},
+        'bool': {'Grid': [['A', 'B'], ['C', 'D']], 'solutions': [], 'isActive': True},
+        'unparseable': {'grid': '???', 'solutions': []},
+    }
+
+    def setUp(self):
+        super().setUp()
+        # Every legacy layout goes through a fallback parser; not under test here
+        self.enterContext(mock.patch('api.fallbacks.logger'))
+        for challenge_id, document in self.LEGACY.items():
+            self.db.collection('Challenges').document(challenge_id).set(document)
+
+    def documents(self):
+        return {doc.id: doc.to_dict() for doc in self.db.collection('Challenges').stream()}
+
+    def test_legacy_documents_are_rewritten_once(self):
+        migrated, skipped = firestore_service.migrate_challenges()
+        self.assertEqual(sorted(migrated), ['bool', 'flat', 'json', 'rows'])
+        self.assertEqual(skipped, ['unparseable'])
+
+        documents = self.documents()
+        self.assertEqual(documents['json'], {
+            'schemaVersion': 1, 'challenge_id': 'json', 'name': 'Old', 'description': None,
+            'type': 'time_limited', 'size': 2, 'tiles': ['A', 'B', 'C', 'D'], 'solutions': ['BAD', 'CAB'],
+            'timeLimit': 60, 'wordGoal': None, 'isActive': True, 'createdAt': '2024-01-01', 'highScore': 12,
+        })
+        self.assertEqual(documents['rows']['solutions'], ['CAB', 'DAB'])
+        self.assertEqual(documents['rows']['wordGoal'], 3)
+        for challenge_id in ('rows', 'flat', 'bool'):
+            self.assertEqual(documents[challenge_id]['tiles'], ['A', 'B', 'C', 'D'])
+        self.assertEqual(
+            {challenge_id: documents[challenge_id]['isActive'] for challenge_id in ('json', 'rows', 'flat', 'bool')},
+            {'json': True, 'rows': False, 'flat': False, 'bool': True},
+        )
+        for challenge_id in migrated:
+            self.assertFalse(set(LEGACY_FIELDS) & set(documents[challenge_id]), challenge_id)
+        self.assertEqual(documents['unparseable'], self.LEGACY['unparseable'])
+
+        # A second run finds nothing left to do
+        self.assertEqual(firestore_service.migrate_challenges(), ([], ['unparseable']))
+        self.assertEqual(self.documents(), documents)
+
+
+class BatchedWriteTests(FirestoreTestCase):
+    def entries(self):
+        return self.db.collection('leaderboards').document('c').collection('entries')
+
+    def test_writes_are_split_into_batches_of_the_firestore_limit(self):
+        items = [(f'e{index}', {'score': index}) for index in range(1201)]
+        with mock.patch.object(self.db, 'batch', wraps=self.db.batch) as batch:
+            firestore_service.write_batched(
+                self.db, items, lambda b, item: b.set(self.entries().document(item[0]), item[1])
+            )
+        self.assertEqual(batch.call_count, 3)
+        self.assertEqual(len(list(self.entries().stream())), 1201)
+
+    def test_failed_batches_are_reported_after_the_others_are_written(self):
+        items = list(range(1000))
+
+        def write(batch, item):
+            if item == 700:
+                raise RuntimeError("write rejected")
+            batch.set(self.entries().document(f'e{item}'), {'score': item})
+
+        with self.assertLogs('api.firestore_service', 'ERROR'):
+            with self.assertRaises(firestore_service.BatchWriteError) as raised:
+                firestore_service.write_batched(self.db, items, write, workers=2)
+        self.assertEqual(raised.exception.failed, items[500:])
+        self.assertEqual(len(list(self.entries().stream())), 500)
+
+
+class ReadIdRecordsTests(SimpleTestCase):
+    def test_json_lines(self):
+        lines = '{"id": "a", "grid": [["C"]]}\n\n{"grid": [["D"]], "name": "B"}\n'
+        self.assertEqual(list(read_id_records(io.StringIO(lines))),
+                         [('a', {'grid': [['C']]}), ('3', {'grid': [['D']], 'name': 'B'})])
+
+    def test_json_object(self):
+        records = {'a': {'grid': [['C']]}, 'b': {'grid': [['D']]}}
+        for text in (json.dumps(records), json.dumps(records, indent=2)):
+            self.assertEqual(list(read_id_records(io.StringIO(text))), list(records.items()))
+
+
+class CacheInvalidationTests(FirestoreTestCase):
+    def test_upload_warns_without_a_shared_cache(self):
+        challenge_id = 'challenge_timed_30s'
+        with mock.patch.object(TTLCache, 'shared', False):
+            with self.assertLogs('api.firestore_service', 'WARNING') as logs:
+                upload_challenges({challenge_id: CHALLENGES[challenge_id]}, db=self.db)
+        self.assertIn('CHALLENGE_CACHE_BACKEND', logs.output[0])
+
+
+class TTLCacheTests(SimpleTestCase):
+    def test_local_memory_cache_is_not_shared(self):
+        self.assertFalse(TTLCache('test', ttl=1).shared)
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            self.assertFalse(TTLCache('test', ttl=1, backend='default').shared)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_shared_generation_is_reread_after_generation_ttl(self):
+        cache = TTLCache('test', ttl=600, backend='default', generation_ttl=60)
+        other_process = TTLCache('test', ttl=600, backend='default')
+        backend = caches['default']
+        with mock.patch.object(backend, 'get_or_set', wraps=backend.get_or_set) as get_or_set:
+            for _ in range(3):
+                self.assertEqual(cache.get('key', lambda: 'old'), 'old')
+            self.assertEqual(get_or_set.call_count, 1)
+
+            other_process.invalidate()
+            self.assertEqual(cache.get('key', lambda: 'new'), 'old')
+            later = time.monotonic() + 61
+            with mock.patch('time.monotonic', return_value=later):
+                self.assertEqual(cache.get('key', lambda: 'new'), 'new')
+
+    def test_failed_refresh_is_logged(self):
+        cache = TTLCache('test', ttl=60)
+
+        def fail():
+            raise RuntimeError('Firestore is down')
+
+        with self.assertLogs('api.ttl_cache', 'WARNING') as logs:
+            cache._refresh('key', fail, cache._generation())
+        self.assertIn('RuntimeError', logs.output[0])
+        self.assertFalse(cache._refreshing)
+
+    def test_value_loaded_across_an_invalidation_is_not_cached(self):
+        cache = TTLCache('test', ttl=60)
+        values = iter(['old', 'new'])
+
+        def load_while_invalidated():
+            value = next(values)
+            cache.invalidate('key')  # e.g. an upload finishing mid-load
+            return value
+
+        self.assertEqual(cache.get('key', load_while_invalidated), 'old')
+        self.assertEqual(cache.get('key', lambda: next(values)), 'new')
+        self.assertEqual(cache.get('key', lambda: 'unused'), 'new')
+
+
+async def read_stream(response):
+    """Body of a streaming response from an async view."""
+    return b''.join([chunk async for chunk in response.streaming_content])
+
+
+@mock.patch.object(leaderboard, '_ensure_flusher')
+class ChallengeApiTests(FirestoreTestCase):
+    """The challenge and leaderboard endpoints over generated challenges."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.records = {record['id']: record for record in generate(CHALLENGES.items())}
+
+    def setUp(self):
+        super().setUp()
+        upload_challenges(self.records, db=self.db)
+        self.challenge_id = 'challenge_timed_30s'
+        self.record = self.records[self.challenge_id]
+
+    def get_json(self, url, **extra):
+        response = self.client.get(url, **extra)
+        content = async_to_sync(read_stream)(response) if response.streaming else response.content
+        return response, json.loads(content) if content else None
+
+    def submit(self, challenge_id, words, **fields):
+        data = {'user_id': 'u1', 'username': 'ada', 'words': words, 'time_taken': 42, **fields}
+        return self.client.post(f'/api/challenges/{challenge_id}/scores', data, content_type='application/json')
+
+    def test_list_has_every_challenge_without_solutions(self, ensure_flusher):
+        with mock.patch.object(firestore_service, 'get_challenge_high_score', return_value=None) as high_score_query:
+            response, challenges = self.get_json('/api/challenges/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({challenge['id'] for challenge in challenges}, set(self.records))
+        for challenge in challenges:
+            self.assertNotIn('solutions', challenge)
+            self.assertIsNone(challenge['high_score'])
+        # Uploaded challenges carry highScore, so no per-challenge leaderboard query
+        high_score_query.assert_not_called()
+
+    def test_list_leaves_out_inactive_challenges_and_the_boards(self, ensure_flusher):
+        self.db.collection('Challenges').document(self.challenge_id).update({'isActive': False})
+        firestore_service.invalidate_challenge_cache()
+        response, challenges = self.get_json('/api/challenges/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({challenge['id'] for challenge in challenges}, set(self.records) - {self.challenge_id})
+        for challenge in challenges:
+            self.assertFalse({'grid', 'tiles', 'solutions'} & set(challenge), challenge['id'])
+            self.assertEqual(challenge['size'], len(self.records[challenge['id']]['grid']))
+
+        response, challenge = self.get_json(f'/api/challenges/{self.challenge_id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(challenge['size'], len(challenge['grid']))
+
+    def test_detail_has_grid_and_solutions(self, ensure_flusher):
+        response, challenge = self.get_json(f'/api/challenges/{self.challenge_id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(challenge['grid'], self.record['grid'])
+        self.assertEqual(challenge['solutions'], self.record['solutions'])
+
+    def test_missing_challenge_is_404(self, ensure_flusher):
+        self.assertEqual(self.client.get('/api/challenges/no_such_challenge').status_code, 404)
+        self.assertEqual(self.submit('no_such_challenge', ['CART']).status_code, 404)
+
+    def test_score_is_computed_from_valid_words_up_to_max_score(self, ensure_flusher):
+        words = self.record['solutions'] + [self.record['solutions'][0].lower(), 'ZZZZ']
+        response = self.submit(self.challenge_id, words)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['score'], self.record['maxScore'])
+        self.assertEqual(response.data['words_found'], self.record['wordCount'])
+        self.assertEqual(response.data['rejected_words'], ['ZZZZ'])
+
+        self.assertEqual(self.submit(self.challenge_id, 'CART').status_code, 400)
+        self.assertEqual(self.submit(self.challenge_id, [], time_taken=-1).status_code, 400)
+
+    def test_flush_writes_entries_and_high_score(self, ensure_flusher):
+        self.submit(self.challenge_id, self.record['solutions'][:3])
+        self.submit(self.challenge_id, self.record['solutions'], user_id='u2')
+        self.assertEqual(leaderboard.pending_count(), 2)
+
+        self.assertEqual(leaderboard.flush(), 2)
+        self.assertEqual(leaderboard.pending_count(), 0)
+        self.assertEqual(self.challenge(self.challenge_id)['highScore']['score'], self.record['maxScore'])
+        _, page = self.get_json(f'/api/challenges/{self.challenge_id}/leaderboard')
+        self.assertEqual([entry['rank'] for entry in page['results']], [1, 2])
+        self.assertEqual(page['results'][0]['score'], self.record['maxScore'])
+
+    def test_each_user_keeps_their_best_entry(self, ensure_flusher):
+        solutions = self.record['solutions']
+        first = self.submit(self.challenge_id, solutions[:3]).json()['id']
+        self.assertEqual(self.submit(self.challenge_id, solutions[:5]).json()['id'], first)
+        self.submit(self.challenge_id, solutions[:1])
+        self.assertEqual(leaderboard.flush(), 1)
+
+        self.submit(self.challenge_id, solutions[:4])
+        self.assertEqual(leaderboard.flush(), 0)  # worse than the stored entry
+        self.submit(self.challenge_id, solutions[:5], time_taken=30)
+        self.assertEqual(leaderboard.flush(), 1)  # same score, faster
+
+        _, page = self.get_json(f'/api/challenges/{self.challenge_id}/leaderboard')
+        self.assertEqual(len(page['results']), 1)
+        self.assertEqual(page['results'][0]['id'], first)
+        self.assertEqual(page['results'][0]['words_found'], 5)
+        self.assertEqual(page['results'][0]['time_taken'], 30)
+
+    def test_cursor_pages_cover_the_leaderboard_in_order(self, ensure_flusher):
+        self.add_entries(self.challenge_id, 5, 9, 1, 7, 3)
+        url, scores, ranks = f'/api/challenges/{self.challenge_id}/leaderboard?limit=2', [], []
+        while url:
+            response, page = self.get_json(url)
+            self.assertEqual(response.status_code, 200)
+            scores += [entry['score'] for entry in page['results']]
+            ranks += [entry['rank'] for entry in page['results']]
+            url = page['next']
+        self.assertEqual(scores, [9, 7, 5, 3, 1])
+        self.assertEqual(ranks, [1, 2, 3, 4, 5])
+
+    def test_unchanged_page_is_304(self, ensure_flusher):
+        self.add_entries(self.challenge_id, 5, 9)
+        url = f'/api/challenges/{self.challenge_id}/leaderboard'
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual([entry['score'] for entry in response.json()['results']], [9, 5])
+        repeated = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(repeated.status_code, 304)
+        self.assertEqual(repeated['ETag'], etag)
+
+    def test_bad_cursor_is_400(self, ensure_flusher):
+        url = f'/api/challenges/{self.challenge_id}/leaderboard'
+        self.assertEqual(self.client.get(url, {'cursor': 'not-a-cursor'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'limit': 0}).status_code, 400)
+
+    def test_upload_skips_unchanged_challenges(self, ensure_flusher):
+        result = upload_challenges(self.records, db=self.db)
+        self.assertEqual(result['written'], [])
+        self.assertEqual(sorted(result['unchanged']), sorted(self.records))
+
+        changed = dict(self.records, **{self.challenge_id: dict(self.record, name='Renamed')})
+        result = upload_challenges(changed, db=self.db)
+        self.assertEqual(result['written'], [self.challenge_id])
+        self.assertEqual(self.challenge(self.challenge_id)['name'], 'Renamed')
@@ -0,0 +1,177 @@
+"""
+Read-through LRU cache with per-entry TTL and stale-while-revalidate.
+
+Entries live in an in-process LRU. Optionally a Django cache (by alias,
+e.g. a Redis or Memcached backend) is used as a second, shared level so
+that every worker sees the same entries and invalidation reaches all of
+them: each cache keeps a generation number in the shared backend, and
+invalidate() bumps it, which orphans every entry stored under the old
+generation. Each process rereads the generation at most once every
+generation_ttl seconds, so a full invalidation elsewhere takes up to that
+long to reach it.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe read-through cache.
+
+    get(key, loader) returns the cached value while it is fresh (younger
+    than ttl). For a further stale_ttl seconds the stale value is returned
+    immediately while a background thread reloads it. After that, or on a
+    miss, loader() is called inline.
+    """
+
+    def __init__(self, name, ttl, stale_ttl=0, maxsize=256, backend=None, generation_ttl=1.0):
+        """
+        Parameters:
+        name (str): Namespace for keys in the shared backend.
+        ttl (float): Seconds an entry is served as fresh.
+        stale_ttl (float): Extra seconds a stale entry is served while it is
+            refreshed in the background.
+        maxsize (int): Most entries kept in process (least recently used
+            entries are evicted first).
+        backend (str | None): Django cache alias to share entries through.
+        generation_ttl (float): Seconds the shared generation is trusted
+            before get() reads it from the backend again.
+        """
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.maxsize = maxsize
+        self.backend_alias = backend
+        self.generation_ttl = generation_ttl
+        self._entries = OrderedDict()  # key -> (value, fresh_until, stale_until, generation)
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._local_generation = 0
+        self._shared_generation = (0, 0.0)  # (generation, monotonic time to reread it)
+        self._invalidations = 0  # invalidate() calls in this process
+
+    @property
+    def _backend(self):
+        return caches[self.backend_alias] if self.backend_alias else None
+
+    @property
+    def shared(self):
+        """True if entries and invalidations reach other processes."""
+        backend = self._backend
+        return backend is not None and not isinstance(backend, (LocMemCache, DummyCache))
+
+    def _generation(self):
+        backend = self._backend
+        if backend is None:
+            return self._local_generation
+        generation, reread_at = self._shared_generation
+        now = time.monotonic()
+        if now >= reread_at:
+            generation = backend.get_or_set(f"{self.name}:generation", 0, timeout=None)
+            self._shared_generation = (generation, now + self.generation_ttl)
+        return generation
+
+    def _backend_key(self, key, generation):
+        return f"{self.name}:{generation}:{key}"
+
+    def get(self, key, loader):
+        """Return the value for key, calling loader() to fill or refresh it."""
+        generation = self._generation()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[3] == generation:
+                value, fresh_until, stale_until, _ = entry
+                if now < fresh_until:
+                    self._entries.move_to_end(key)
+                    return value
+                if now < stale_until:
+                    self._entries.move_to_end(key)
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        threading.Thread(
+                            target=self._refresh, args=(key, loader, generation), daemon=True
+                        ).start()
+                    return value
+
+        backend = self._backend
+        if backend is not None:
+            value = backend.get(self._backend_key(key, generation), _MISSING)
+            if value is not _MISSING:
+                self._store(key, value, generation)
+                return value
+
+        return self._load(key, loader, generation)
+
+    def _load(self, key, loader, generation):
+        with self._lock:
+            invalidations = self._invalidations
+        value = loader()
+        # An invalidate() while loader ran may have dropped the value it read,
+        # so it is returned to this caller but not cached
+        if self._store(key, value, generation, invalidations):
+            backend = self._backend
+            if backend is not None:
+                backend.set(self._backend_key(key, generation), value, timeout=self.ttl)
+        return value
+
+    def _refresh(self, key, loader, generation):
+        try:
+            self._load(key, loader, generation)
+        except Exception:
+            # Keep serving the stale value; the next miss retries inline
+            logger.warning("Could not refresh %s entry %r", self.name, key, exc_info=True)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _store(self, key, value, generation, invalidations=None):
+        """Cache value, unless invalidate() was called since invalidations was read."""
+        now = time.monotonic()
+        with self._lock:
+            if invalidations is not None and invalidations != self._invalidations:
+                return False
+            self._entries[key] = (value, now + self.ttl, now + self.ttl + self.stale_ttl, generation)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return True
+
+    def invalidate(self, key=None):
+        """
+        Drop one key, or every entry when key is None.
+
+        Clearing everything reaches all workers through the shared backend.
+        A single key is dropped from this process and the shared backend;
+        other workers' in-process copies expire with their TTL.
+        """
+        backend = self._backend
+        with self._lock:
+            self._invalidations += 1
+            if key is None:
+                self._entries.clear()
+                self._local_generation += 1
+            else:
+                self._entries.pop(key, None)
+        if backend is not None:
+            if key is None:
+                generation_key = f"{self.name}:generation"
+                try:
+                    generation = backend.incr(generation_key)
+                except ValueError:
+                    generation = 1
+                    backend.set(generation_key, generation, timeout=None)
+                self._shared_generation = (generation, time.monotonic() + self.generation_ttl)
+            else:
+                backend.delete(self._backend_key(key, self._generation()))
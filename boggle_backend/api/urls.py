@@ -1,12 +1,23 @@
 from django.urls import path
-from .views import get_game, get_games, create_game, get_active_challenges, get_challenge
+from .views import (
+    get_game, get_games, create_game, create_game_async, get_game_job,
+    get_active_challenges, get_challenge, get_challenge_leaderboard, submit_score,
+    get_fallback_counts, get_solve_cache_stats
+)
 
 urlpatterns = [
     path('game/<int:pk>', get_game, name='get_game'),
     path('games/', get_games, name='get_games'),
     path('game/create/<int:size>', create_game, name='create_game'),
+    path('game/create/<int:size>/async', create_game_async, name='create_game_async'),
+    path('game/jobs/<uuid:job_id>', get_game_job, name='get_game_job'),
     
     # Challenge endpoints
     path('challenges/', get_active_challenges, name='get_active_challenges'),
     path('challenges/<str:challenge_id>', get_challenge, name='get_challenge'),
+    path('challenges/<str:challenge_id>/leaderboard', get_challenge_leaderboard, name='get_challenge_leaderboard'),
+    path('challenges/<str:challenge_id>/scores', submit_score, name='submit_score'),
+
+    path('diagnostics/fallbacks', get_fallback_counts, name='get_fallback_counts'),
+    path('diagnostics/solve-cache', get_solve_cache_stats, name='get_solve_cache_stats'),
 ]
\ No newline at end of file
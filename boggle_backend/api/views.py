@@ -1,29 +1,50 @@
 from django.shortcuts import render
 
 # Create your views here.
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework import status
-from .models import Games
+from .models import Games, GameJob
 from .serializers import GamesSerializer
 from .firestore_service import (
-    get_all_challenges,
-    get_challenge_by_id,
-    format_challenge_for_api
+    aget_all_challenges,
+    aget_challenge_by_id,
+    aget_leaderboard_page,
+    format_challenge_for_api,
+    get_challenge_by_id
 )
-from .randomGen import random_grid
-from .readJSONFile import read_json_to_list
-from .boggle_solver import Boggle
-from django.contrib.staticfiles import finders
-from datetime import datetime
+from .board_pool import next_board, random_game_name
+from .dictionary import DictionaryNotFound
+from .fallbacks import fallback_counts
+from .solve_cache import cache_stats
+from .streaming import (
+    iter_json, iter_json_array, iter_json_object, json_stream_response, sync_json_stream_response,
+)
+from .game_jobs import IdempotencyKeyReused, JobQueueFull, get_job, submit_job
+from .leaderboard import (
+    InvalidCursor, InvalidSubmission, build_entry, decode_cursor, encode_cursor,
+    entry_for_api, submit_entry
+)
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.urls import reverse
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
+from django.utils.http import parse_etags, quote_etag
+from django.views.decorators.http import require_GET
+from urllib.parse import urlencode
+import hashlib
 import json
+import logging
+
+logger = logging.getLogger(__name__)
 
 # define the endpoints
 
 @api_view(['GET', 'DELETE']) # define a GET Object with pk
 def get_game(request, pk):
     try:
-        game = Games.objects.get(pk=pk)
+        game = Games.objects.select_related('solution').get(pk=pk)
     except Games.DoesNotExist:
         return Response(status=status.HTTP_404_NOT_FOUND)
     
@@ -34,11 +55,67 @@ def get_game(request, pk):
         game.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
  
-@api_view(['GET']) # define a GET REQUEST to get ALL Games
+@api_view(['GET']) # define a GET REQUEST to get a page of Games
 def get_games(request):
-    games = Games.objects.all()
-    serializer = GamesSerializer(games, many=True)
-    return Response(serializer.data)
+    """Get one page of games, oldest first
+
+    Query parameters: limit (page size, at most GAMES_MAX_PAGE_SIZE), after
+    (the id to continue after; use the "next" URL of the previous page) and
+    fields (comma-separated, e.g. fields=id,name,word_count to leave out the
+    found words).
+    """
+    max_limit = getattr(settings, 'GAMES_MAX_PAGE_SIZE', 500)
+    try:
+        limit = int(request.GET.get('limit', getattr(settings, 'GAMES_PAGE_SIZE', 50)))
+        after = int(request.GET.get('after', 0))
+    except ValueError:
+        return Response({"error": "limit and after must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+    if limit < 1 or limit > max_limit:
+        return Response(
+            {"error": f"limit must be between 1 and {max_limit}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    fields = None
+    if request.GET.get('fields'):
+        fields = [field.strip() for field in request.GET['fields'].split(',') if field.strip()]
+        unknown = set(fields) - set(GamesSerializer().fields)
+        if unknown:
+            return Response(
+                {"error": f"Unknown fields: {', '.join(sorted(unknown))}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+    # Keyset pagination: the cost of a page does not grow with its offset
+    games = Games.objects.filter(id__gt=after).order_by('id')
+    if fields is None:
+        games = games.select_related('solution')
+    elif 'foundwords' in fields:
+        games = games.select_related('solution').only('id', 'solution', 'solution__words', *fields)
+    else:
+        games = games.only('id', *fields)
+    serializer = GamesSerializer(fields=fields)
+    page = {"next": None}
+
+    def results():
+        # Rows are read, serialized and sent one at a time; one row past the
+        # page only tells whether there is a next page
+        last_id = None
+        for index, game in enumerate(games[:limit + 1].iterator(chunk_size=100)):
+            if index == limit:
+                query = {"limit": limit, "after": last_id}
+                if fields is not None:
+                    query["fields"] = ','.join(fields)
+                page["next"] = request.build_absolute_uri(f"{request.path}?{urlencode(query)}")
+                break
+            last_id = game.id
+            yield serializer.to_representation(game)
+
+    def members():
+        yield "results", results()
+        yield "next", page["next"]  # known once the results are sent
+
+    return sync_json_stream_response(request, iter_json_object(members()))
 
 @api_view(['GET']) # define a GET REQUEST TO CREATE A SPECIFIC GAME OF SIZE size
 def create_game(request, size):
@@ -50,37 +127,26 @@ def create_game(request, size):
         )
     
     try:
-        g = random_grid(size)
-        now = datetime.now()
-        name = f'Rand{size}x{size}_{now.strftime("%Y%m%d%H%M%S")}'
+        name = random_game_name(size)
 
-        # Find the absolute path of the static JSON file
-        file_path = finders.find("data/full-wordlist.json")
-        
-        if not file_path:
+        # Take a pre-solved board from the pool; only solve here if it is empty
+        try:
+            g, solution = next_board(size)
+        except DictionaryNotFound as e:
             return Response(
-                {"error": "Dictionary file not found"}, 
+                {"error": str(e)}, 
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-        dictionary = read_json_to_list(file_path)
-
-        mygame = Boggle(g, dictionary)
-        fwords = mygame.getSolution()
-
-        # Serialize grid and foundwords as JSON strings
-        grid_json = json.dumps(g)
-        foundwords_json = json.dumps(fwords)
-
         serializer = GamesSerializer(data={
             "name": name,
             "size": size, 
-            "grid": grid_json, 
-            "foundwords": foundwords_json
+            "grid": g
         })
         
         if serializer.is_valid():
-            serializer.save()
+            # Link the shared solution instead of copying its words
+            serializer.save(solution=solution)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         else:
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -91,56 +157,197 @@ def create_game(request, size):
         )
 
 
+@api_view(['GET', 'POST']) # define a REQUEST TO CREATE A GAME OF SIZE size IN THE BACKGROUND
+def create_game_async(request, size):
+    """Queue creation of a game and return its job id (202 Accepted) right away"""
+    # Validate size
+    if size < 3 or size > 10:
+        return Response(
+            {"error": "Size must be between 3 and 10 (inclusive)"}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        job, _ = submit_job(size, key=request.headers.get('Idempotency-Key'))
+    except JobQueueFull as e:
+        return Response(
+            {"error": str(e)},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": "5"}
+        )
+    except IdempotencyKeyReused as e:
+        return Response({"error": str(e)}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    status_url = reverse('get_game_job', args=[job.pk])
+    return Response(
+        _job_data(job, status_url),
+        status=status.HTTP_202_ACCEPTED,
+        headers={"Location": status_url}
+    )
+
+
+@api_view(['GET']) # define a GET REQUEST to poll a game creation job
+def get_game_job(request, job_id):
+    """Get the status of a game creation job, with the game once it is done"""
+    job = get_job(job_id)
+    if job is None:
+        return Response(status=status.HTTP_404_NOT_FOUND)
+    return Response(_job_data(job, reverse('get_game_job', args=[job.pk])))
+
+
+def _job_data(job, status_url):
+    data = {
+        "job_id": str(job.pk),
+        "size": job.size,
+        "status": job.status,
+        "status_url": status_url,
+    }
+    if job.status == GameJob.DONE and job.game is not None:
+        data["game"] = GamesSerializer(job.game).data
+    elif job.status == GameJob.FAILED:
+        data["error"] = job.error
+    return data
+
+
 # Challenge endpoints - using Firestore
-@api_view(['GET'])
-def get_active_challenges(request):
+# These are async views: under ASGI the Firestore round-trips run
+# concurrently instead of blocking a worker (DRF's @api_view is sync-only,
+# so they return plain Django responses).
+@require_GET
+async def get_active_challenges(request):
     """Get all active challenges with their high scores from Firestore"""
     try:
-        challenges = get_all_challenges()
-        # Format each challenge for API response
-        formatted_challenges = []
-        for challenge in challenges:
-            try:
-                formatted = format_challenge_for_api(challenge)
-                formatted_challenges.append(formatted)
-            except Exception as e:
-                print(f"Error formatting challenge {challenge.get('id', 'unknown')}: {str(e)}")
-                continue
+        challenges = await aget_all_challenges()
+
+        def formatted_challenges():
+            # Format each challenge for API response as it is sent
+            for challenge in challenges:
+                try:
+                    yield format_challenge_for_api(challenge, include_solutions=False, include_grid=False)
+                except Exception as e:
+                    logger.warning("Error formatting challenge %s: %s", challenge.get('id', 'unknown'), e)
+                    continue
         
-        return Response(formatted_challenges)
+        return json_stream_response(iter_json_array(formatted_challenges()), is_async=True)
     except Exception as e:
         import traceback
         error_details = traceback.format_exc()
-        print(f"Error in get_active_challenges: {str(e)}")
-        print(error_details)
-        return Response(
+        logger.exception("Error in get_active_challenges")
+        return JsonResponse(
             {"error": str(e), "detail": "Failed to retrieve challenges from Firestore.", "traceback": error_details}, 
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
 
-@api_view(['GET'])
-def get_challenge(request, challenge_id):
+@require_GET
+async def get_challenge(request, challenge_id):
     """Get a specific challenge by ID from Firestore"""
     try:
-        challenge = get_challenge_by_id(challenge_id)
+        challenge = await aget_challenge_by_id(challenge_id)
         
         if not challenge:
-            return Response(
+            return JsonResponse(
                 {"error": "Challenge not found"}, 
                 status=status.HTTP_404_NOT_FOUND
             )
         
         # Format challenge for API response
         formatted_challenge = format_challenge_for_api(challenge)
-        return Response(formatted_challenge)
+        return json_stream_response(iter_json(formatted_challenge), is_async=True)
         
     except Exception as e:
-        import traceback
-        error_details = traceback.format_exc()
-        print(f"Error in get_challenge: {str(e)}")
-        print(error_details)
-        return Response(
+        logger.exception("Error in get_challenge %s", challenge_id)
+        return JsonResponse(
             {"error": str(e), "detail": "Failed to retrieve challenge from Firestore."}, 
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
\ No newline at end of file
+        )
+
+
+@require_GET
+async def get_challenge_leaderboard(request, challenge_id):
+    """Get one page of a challenge's leaderboard, best first
+
+    Query parameters: limit (page size, at most LEADERBOARD_MAX_PAGE_SIZE)
+    and cursor (the "next" value of the previous page). Responses carry an
+    ETag; a request whose If-None-Match matches gets 304 Not Modified. The
+    ETag is a hash of the page, so a 304 saves sending the page but not
+    reading it (first pages are read from the leaderboard cache).
+    """
+    max_limit = getattr(settings, 'LEADERBOARD_MAX_PAGE_SIZE', 100)
+    try:
+        limit = int(request.GET.get('limit', getattr(settings, 'LEADERBOARD_PAGE_SIZE', 50)))
+    except ValueError:
+        return JsonResponse({"error": "limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+    if limit < 1 or limit > max_limit:
+        return JsonResponse(
+            {"error": f"limit must be between 1 and {max_limit}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    start_after, rank = None, 0
+    if request.GET.get('cursor'):
+        try:
+            start_after, rank = decode_cursor(request.GET['cursor'])
+        except InvalidCursor as e:
+            return JsonResponse({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        entries, has_more = await aget_leaderboard_page(challenge_id, limit, start_after)
+    except Exception as e:
+        logger.exception("Error in get_challenge_leaderboard %s", challenge_id)
+        return JsonResponse(
+            {"error": str(e), "detail": "Failed to retrieve leaderboard from Firestore."},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+    results = [entry_for_api(entry, rank + i + 1) for i, entry in enumerate(entries)]
+    next_url = None
+    if has_more and entries:
+        query = urlencode({"limit": limit, "cursor": encode_cursor(entries[-1], rank + len(entries))})
+        next_url = request.build_absolute_uri(f"{request.path}?{query}")
+
+    body = json.dumps({"results": results, "next": next_url}, cls=DjangoJSONEncoder)
+    etag = quote_etag(hashlib.sha1(body.encode()).hexdigest())
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    return response
+
+@api_view(['POST']) # define a POST REQUEST to submit a score for a challenge
+def submit_score(request, challenge_id):
+    """Validate the found words against the challenge, score them and queue a leaderboard entry"""
+    challenge = get_challenge_by_id(challenge_id)
+    if not challenge:
+        return Response({"error": "Challenge not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    try:
+        entry, rejected = build_entry(format_challenge_for_api(challenge), request.data)
+    except InvalidSubmission as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Written to Firestore by the next leaderboard flush
+    entry_id = submit_entry(challenge_id, entry)
+    return Response(
+        {
+            "id": entry_id,
+            "challenge_id": challenge_id,
+            "score": entry['score'],
+            "words_found": entry['wordsFound'],
+            "rejected_words": rejected,
+        },
+        status=status.HTTP_202_ACCEPTED
+    )
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def get_fallback_counts(request):
+    """How often each malformed-data / slow-query fallback fired in this process (admins only)"""
+    return Response(fallback_counts())
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def get_solve_cache_stats(request):
+    """Hit, miss and eviction counts of the solve cache in this process (admins only)"""
+    return Response(cache_stats())
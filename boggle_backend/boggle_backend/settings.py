@@ -84,6 +84,9 @@ DATABASES = {
 }
 
 
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -125,6 +128,44 @@ STATICFILES_DIRS = [
 
 # STATIC_URL = 'static/'
 
+# Compiled dictionary written by `python manage.py builddictionary`.
+# When present and newer than the word list, workers memory-map it instead
+# of parsing full-wordlist.json.
+DICTIONARY_TRIE_PATH = BASE_DIR / 'data' / 'full-wordlist.trie'
+
+# Process pool solving (api/parallel.py). Workers default to the CPUs this
+# process may run on. Handing work to the pool costs about 0.2-0.4 ms per
+# task plus about 10 ms to start the pool (measured on a 1-CPU host, where
+# the pool can only add overhead), so solve_parallel only splits boards of
+# at least PARALLEL_MIN_BOARD_SIZE (8x8 boards take about 9 ms serially)
+# and solve_many only uses the pool for at least PARALLEL_MIN_BOARDS boards
+# (a 4x4 board takes about 0.8 ms); smaller jobs are solved in-process.
+PARALLEL_MIN_BOARD_SIZE = 8
+PARALLEL_MIN_BOARDS = 32
+
+# Memoized solves (api/solve_cache.py): boards kept in each process's LRU,
+# and an optional SQLite file (e.g. BASE_DIR / 'data' / 'solve-cache.sqlite3')
+# that keeps solutions across processes and runs.
+SOLVE_CACHE_SIZE = 1024
+SOLVE_CACHE_PATH = None
+
+# Pool of pre-solved boards served by create_game (api/board_pool.py).
+# When a size drops below the low watermark a background refill tops it
+# back up to the high watermark; `python manage.py refillboardpool` does
+# the same from a dedicated worker process.
+BOARD_POOL_SIZES = range(3, 11)
+BOARD_POOL_LOW_WATERMARK = 5
+BOARD_POOL_HIGH_WATERMARK = 20
+
+# Async game creation (api/game_jobs.py): solver threads per process, the
+# most jobs allowed to wait at once, seconds before a job is failed, and
+# seconds an Idempotency-Key stays tied to its job (a later request with
+# the key starts a new job).
+GAME_JOB_WORKERS = 2
+GAME_JOB_MAX_PENDING = 50
+GAME_JOB_TIMEOUT = 60
+GAME_JOB_KEY_TTL = 24 * 60 * 60
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",  # React default port
@@ -140,3 +181,79 @@ CORS_ALLOW_CREDENTIALS = True
 # 2. Set FIREBASE_SERVICE_ACCOUNT_KEY to the absolute path of your service account key
 # 3. Use Application Default Credentials (for production/GCP environments)
 FIREBASE_SERVICE_ACCOUNT_KEY = '/Users/lauren/Desktop/Howard/software_engineering/starter-assignment-3-code/boggle_backend/firebase-service-account.json'  # Set to path if not using default location
+
+# Challenge and leaderboard storage: 'firebase' for Cloud Firestore, or
+# 'memory' for the in-process stand-in in api/memory_firestore.py (empty at
+# start-up; for offline development, tests and benchmarks).
+FIRESTORE_BACKEND = 'firebase'
+
+# Most Firestore queries the async challenge views keep in flight at once
+FIRESTORE_MAX_CONCURRENCY = 10
+
+# Read-through caches for Firestore challenge reads (api/ttl_cache.py).
+# Challenge definitions and high scores expire separately; stale entries
+# are served for CHALLENGE_CACHE_STALE_TTL more seconds while they reload
+# in the background. Set CHALLENGE_CACHE_BACKEND to a Django cache alias
+# (e.g. a Redis cache, or a DatabaseCache after `manage.py createcachetable`)
+# to share entries and invalidations between workers. Without one, uploads
+# and `manage.py migratechallenges` only clear their own process's cache
+# (a warning is logged) and the web workers keep serving the old challenges
+# for up to CHALLENGE_CACHE_TTL + CHALLENGE_CACHE_STALE_TTL seconds.
+CHALLENGE_CACHE_TTL = 600
+HIGH_SCORE_CACHE_TTL = 15
+CHALLENGE_CACHE_STALE_TTL = 60
+CHALLENGE_CACHE_MAXSIZE = 512
+CHALLENGE_CACHE_BACKEND = None
+
+# Leaderboard submissions (api/leaderboard.py) are buffered and written to
+# Firestore in batches: every LEADERBOARD_FLUSH_INTERVAL seconds, or sooner
+# once LEADERBOARD_FLUSH_SIZE entries are waiting.
+LEADERBOARD_FLUSH_INTERVAL = 2
+LEADERBOARD_FLUSH_SIZE = 200
+
+# Leaderboard pages (GET /api/challenges/<id>/leaderboard): default and
+# largest page size, and how many top entries per challenge are cached (for
+# LEADERBOARD_CACHE_TTL seconds, or until new entries are written).
+LEADERBOARD_PAGE_SIZE = 50
+LEADERBOARD_MAX_PAGE_SIZE = 100
+LEADERBOARD_CACHED_ENTRIES = 100
+LEADERBOARD_CACHE_TTL = 15
+
+# Game listings (GET /api/games/): default and largest page size.
+GAMES_PAGE_SIZE = 50
+GAMES_MAX_PAGE_SIZE = 500
+
+# Logging. Each api module logs to its own logger (api.views,
+# api.firestore_service, ...); raise one to DEBUG to trace it. Fallback
+# paths for malformed data are counted in api/fallbacks.py and warn the
+# first time they fire.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'standard': {
+            'format': '%(asctime)s %(levelname)s %(name)s: %(message)s',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'standard',
+        },
+    },
+    'loggers': {
+        'api': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+        'api.firestore_service': {
+            'level': 'INFO',
+        },
+        'api.views': {
+            'level': 'INFO',
+        },
+        'api.fallbacks': {
+            'level': 'WARNING',
+        },
+    },
+}
@@ -1,13 +1,13 @@
 """
-Script to upload challenges from firestore_challenges.json to Firestore.
-This ensures solutions are stored as arrays, not strings.
+Script to upload challenges from firestore_challenges.jsonl (written by
+`manage.py generatechallenges`) or firestore_challenges.json to Firestore.
+Challenges are written in the canonical layout from api/challenge_schema.py,
+and only if their content changed since the last upload.
 """
 
 import sys
 import os
-import json
 from pathlib import Path
-from datetime import datetime
 
 # Setup Django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'boggle_backend.settings')
@@ -23,6 +23,9 @@ except ImportError:
     print("Error: firebase-admin not installed. Install it with: pip3 install firebase-admin")
     sys.exit(1)
 
+from api.challenge_pipeline import read_records
+from api.challenge_upload import upload_challenges as upload_challenge_documents
+
 def initialize_firebase():
     """Initialize Firebase Admin SDK."""
     from django.conf import settings
@@ -51,79 +54,41 @@ def initialize_firebase():
 
 def upload_challenges():
     """Upload challenges from JSON file to Firestore."""
-    # Load challenges from JSON file
-    json_file = Path(__file__).parent / 'firestore_challenges.json'
+    # Load challenges from the pipeline output (or an older JSON file)
+    base_dir = Path(__file__).parent
+    json_file = base_dir / 'firestore_challenges.jsonl'
+    if not json_file.exists():
+        json_file = base_dir / 'firestore_challenges.json'
     
     if not json_file.exists():
         print(f"Error: {json_file} not found!")
-        print("Please run create_firestore_challenges.py first to generate the JSON file.")
+        print("Please run `python manage.py generatechallenges` first to generate it.")
         return
     
     print(f"Loading challenges from {json_file}...")
-    with open(json_file, 'r') as f:
-        challenges_data = json.load(f)
+    challenges_data = read_records(json_file)
     
     print(f"Found {len(challenges_data)} challenges")
     
     # Initialize Firestore
     db = initialize_firebase()
-    challenges_ref = db.collection('Challenges')
     
-    # Upload each challenge
-    for challenge_id, challenge_data in challenges_data.items():
-        print(f"\nUploading {challenge_id}...")
-        
-        # Ensure solutions is an array (not a string)
-        if 'solutions' in challenge_data:
-            solutions = challenge_data['solutions']
-            if isinstance(solutions, str):
-                # Try to parse if it's a JSON string
-                try:
-                    solutions = json.loads(solutions)
-                except json.JSONDecodeError:
-                    print(f"  Warning: solutions is a string but not valid JSON")
-                    continue
-            elif not isinstance(solutions, list):
-                print(f"  Warning: solutions is not a list or string, got {type(solutions)}")
-                continue
-            
-            # Ensure all solutions are strings
-            solutions = [str(word).strip().upper() for word in solutions if word]
-            challenge_data['solutions'] = solutions
-            print(f"  Solutions: {len(solutions)} words")
-        
-        # Ensure grid is correct format - Firestore doesn't support nested arrays
-        # So we'll store grid as array of strings (each string is a row)
-        if 'grid' in challenge_data:
-            grid = challenge_data['grid']
-            if isinstance(grid, list) and len(grid) > 0:
-                # Ensure it's a 2D array
-                if isinstance(grid[0], list):
-                    # Convert 2D array to array of strings for Firestore
-                    grid_as_strings = [''.join(row) for row in grid]
-                    challenge_data['grid'] = grid_as_strings
-                    print(f"  Grid: {len(grid)}x{len(grid[0])} (converted to array of strings)")
-                else:
-                    # Already array of strings, keep as-is
-                    print(f"  Grid: already array of strings, length: {len(grid)}")
-            else:
-                print(f"  Warning: Grid is invalid, skipping")
-                continue
-        
-        # Add/update metadata
-        challenge_data['challenge_id'] = challenge_id
-        challenge_data['isActive'] = True
-        challenge_data['updatedAt'] = datetime.now().isoformat() + "Z"
-        
-        # Upload to Firestore
-        doc_ref = challenges_ref.document(challenge_id)
-        doc_ref.set(challenge_data, merge=False)  # Use merge=False to replace entire document
-        
-        print(f"  ✓ Uploaded successfully")
+    # Unchanged challenges (same content hash) are skipped; the rest are
+    # written in concurrent batches of up to 500, and cached challenge
+    # reads are dropped afterwards (see api/challenge_upload.py)
+    result = upload_challenge_documents(challenges_data, db=db)
     
-    print(f"\n✓ All challenges uploaded to Firestore!")
+    for challenge_id in result['invalid']:
+        print(f"  Warning: {challenge_id}: grid is invalid, skipped")
+    for challenge_id in result['failed']:
+        print(f"  Error: {challenge_id}: upload failed after retries")
+    
+    print(f"\n✓ Challenges uploaded to Firestore!")
     print(f"Collection: Challenges")
-    print(f"Total documents: {len(challenges_data)}")
+    print(f"Written: {len(result['written'])}, unchanged: {len(result['unchanged'])}, "
+          f"invalid: {len(result['invalid'])}, failed: {len(result['failed'])}")
+    if result['failed']:
+        sys.exit(1)
 
 if __name__ == "__main__":
     try:
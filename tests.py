@@ -1,13 +1,25 @@
 import unittest
+import mmap
 import sys
 import os
-from boggle_solver import Boggle
+import tempfile
+from unittest import mock
+from boggle_solver import Boggle, MappedTrie, Trie, grid_hash, normalize_words
 
 # Add current directory to path to find boggle_solver.py
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 
-class TestSuite_Alg_Scalability_Cases(unittest.TestCase):
+class EngineTestCase(unittest.TestCase):
+    """Builds the solver under test; engine None is Boggle's default."""
+
+    engine = None
+
+    def boggle(self, grid, dictionary):
+        return Boggle(grid, dictionary, engine=self.engine)
+
+
+class TestSuite_Alg_Scalability_Cases(EngineTestCase):
     """
     Tests 3x3 grid
     Expected Output: ["abc", "abdhj", "cfj", "dea"]
@@ -16,7 +28,7 @@ class TestSuite_Alg_Scalability_Cases(unittest.TestCase):
     def test_Normal_case_3x3(self):
         grid = [["A", "B", "C"], ["D", "E", "F"], ["G", "H", "J"]]
         dictionary = ["abc", "abdhj", "abi", "ef", "cfj", "dea"]
-        mygame = Boggle(grid, dictionary)
+        mygame = self.boggle(grid, dictionary)
         solution = mygame.getSolution()
         solution = [x.upper() for x in solution]
         expected = ["abc", "abdhj", "cfj", "dea"]
@@ -47,7 +59,7 @@ class TestSuite_Alg_Scalability_Cases(unittest.TestCase):
             "aek",
             "cfknop",
         ]
-        mygame = Boggle(grid, dictionary)
+        mygame = self.boggle(grid, dictionary)
         solution = mygame.getSolution()
         solution = [x.upper() for x in solution]
         expected = ["abc", "abcd", "efg", "dhlp", "cfknop"]
@@ -70,7 +82,7 @@ class TestSuite_Alg_Scalability_Cases(unittest.TestCase):
             ["U", "V", "W", "X", "Y"],
         ]
         dictionary = ["abc", "mnop", "fghzj", "bhnt", "klru", "cfzl", "xyz"]
-        mygame = Boggle(grid, dictionary)
+        mygame = self.boggle(grid, dictionary)
         solution = mygame.getSolution()
         solution = [x.upper() for x in solution]
         expected = ["ABC", "FGHZJ", "BHNT"]
@@ -92,7 +104,7 @@ class TestSuite_Alg_Scalability_Cases(unittest.TestCase):
             ["E", "F", "G", "H", "Ie", "J"],
         ]
         dictionary = ["abc", "ghiej", "ago", "vbh", "stuv", "yzab", "ezavwr"]
-        mygame = Boggle(grid, dictionary)
+        mygame = self.boggle(grid, dictionary)
         solution = [x.upper() for x in mygame.getSolution()]
         expected = ["ABC", "GHIEJ", "YZAB", "VBH", "EZAVWR"]
         expected = [x.upper() for x in expected]
@@ -120,7 +132,7 @@ class TestSuite_Alg_Scalability_Cases(unittest.TestCase):
             "NOPQu",
             "IeJK",
         ]
-        mygame = Boggle(grid, dictionary)
+        mygame = self.boggle(grid, dictionary)
         solution = mygame.getSolution()
         solution = [x.upper() for x in solution]
         expected = ["QUR", "StTUV", "NOPQu", "IeJK"]
@@ -158,7 +170,7 @@ class TestSuite_Alg_Scalability_Cases(unittest.TestCase):
             "notaword",
             "pqurs",
         ]
-        mygame = Boggle(grid, dictionary)
+        mygame = self.boggle(grid, dictionary)
         solution = mygame.getSolution()
         solution = [x.upper() for x in solution]
         expected = ["ABC", "STTUVWX", "YZAB", "KLMNOP", "XYZ", "ABCDEF"]
@@ -227,7 +239,7 @@ class TestSuite_Alg_Scalability_Cases(unittest.TestCase):
             ],
         ]
         dictionary = ["ABC", "NOP", "APQU", "MNO", "XAT", "GHIEJK"]
-        mygame = Boggle(grid, dictionary)
+        mygame = self.boggle(grid, dictionary)
         solution = mygame.getSolution()
         solution = [x.upper() for x in mygame.getSolution()]
         expected = ["ABC", "NOP", "GHIEJK"]
@@ -235,7 +247,7 @@ class TestSuite_Alg_Scalability_Cases(unittest.TestCase):
         self.assertEqual(sorted(expected), sorted(solution))
 
 
-class TestSuite_Simple_Edge_Cases(unittest.TestCase):
+class TestSuite_Simple_Edge_Cases(EngineTestCase):
     """
     Tests 1x1 grid
     Expected Output: []
@@ -244,7 +256,7 @@ class TestSuite_Simple_Edge_Cases(unittest.TestCase):
     def test_SquareGrid_case_1x1(self):
         grid = [["A"]]
         dictionary = ["a", "b", "c"]
-        mygame = Boggle(grid, dictionary)
+        mygame = self.boggle(grid, dictionary)
         solution = mygame.getSolution()
         solution = [x.upper() for x in solution]
         expected = []
@@ -259,7 +271,7 @@ class TestSuite_Simple_Edge_Cases(unittest.TestCase):
     def test_EmptyGrid_case_0x0(self):
         grid = [[]]
         dictionary = ["hello", "there", "general", "kenobi"]
-        mygame = Boggle(grid, dictionary)
+        mygame = self.boggle(grid, dictionary)
         solution = mygame.getSolution()
         solution = [x.upper() for x in solution]
         expected = []
@@ -274,7 +286,7 @@ class TestSuite_Simple_Edge_Cases(unittest.TestCase):
     def test_EmptyGrid_nonEmptyDictionary(self):
         grid = []
         dictionary = ["WORD", "PYTHON", "GRID"]
-        mygame = Boggle(grid, dictionary)
+        mygame = self.boggle(grid, dictionary)
         solution = [x.upper() for x in mygame.getSolution()]
         expected = []
         expected = [x.upper() for x in expected]
@@ -288,7 +300,7 @@ class TestSuite_Simple_Edge_Cases(unittest.TestCase):
     def test_1x1_grid_noValidWords(self):
         grid = [["A"]]
         dictionary = ["A", "B", "C"]
-        mygame = Boggle(grid, dictionary)
+        mygame = self.boggle(grid, dictionary)
         solution = [x.upper() for x in mygame.getSolution()]
         expected = []
         expected = [x.upper() for x in expected]
@@ -306,7 +318,7 @@ class TestSuite_Simple_Edge_Cases(unittest.TestCase):
             ["K", "L", "M", "N", "O"],
         ]
         dictionary = ["ABC", "FGH", "KLM", "GHI", "EJO"]
-        mygame = Boggle(grid, dictionary)
+        mygame = self.boggle(grid, dictionary)
         solution = [x.upper() for x in mygame.getSolution()]
         expected = []
         expected = [x.upper() for x in expected]
@@ -325,7 +337,7 @@ class TestSuite_Simple_Edge_Cases(unittest.TestCase):
             ["E", "R", "A", "T"],
         ]
         dictionary = ["Dog", "cat", "MOUSE", "rat", "TOE"]
-        mygame = Boggle(grid, dictionary)
+        mygame = self.boggle(grid, dictionary)
         solution = [x.upper() for x in mygame.getSolution()]
         expected = ["DOG", "CAT", "RAT", "TOE"]
         expected = [x.upper() for x in expected]
@@ -339,7 +351,7 @@ class TestSuite_Simple_Edge_Cases(unittest.TestCase):
         def test_Words_Shorter_Than_Three_Not_Included(self):
             grid = [["A", "B", "C"], ["D", "E", "F"], ["G", "H", "Ie"]]
             dictionary = ["A", "AB", "ABC", "DEF", "HIe", "GHIe"]
-            mygame = Boggle(grid, dictionary)
+            mygame = self.boggle(grid, dictionary)
             solution = mygame.getSolution()
             solution = [x.upper() for x in solution]
             expected = ["ABC", "DEF", "GHIe"]
@@ -354,7 +366,7 @@ class TestSuite_Simple_Edge_Cases(unittest.TestCase):
         def test_NonAdjacent_Letters_Not_Valid(self):
             grid = [["A", "B", "C"], ["D", "E", "F"], ["G", "H", "Ie"]]
             dictionary = ["AFIe", "CEG", "BGH", "ADG"]
-            mygame = Boggle(grid, dictionary)
+            mygame = self.boggle(grid, dictionary)
             solution = mygame.getSolution()
             solution = [x.upper() for x in solution]
             expected = ["ADG", "CEG"]
@@ -362,7 +374,7 @@ class TestSuite_Simple_Edge_Cases(unittest.TestCase):
             self.assertEqual(sorted(solution), sorted(expected))
 
 
-class TestSuite_Complete_Coverage(unittest.TestCase):
+class TestSuite_Complete_Coverage(EngineTestCase):
     """
     Tests grid with Qu and Ie that create words with diagonal connections
     Expected Output: ["QUAB", "IEBC", "ABCD"]
@@ -376,7 +388,7 @@ class TestSuite_Complete_Coverage(unittest.TestCase):
             ["J", "K", "L", "Ie"],
         ]
         dictionary = ["QUAB", "IEBC", "ABCD", "EFODH"]
-        mygame = Boggle(grid, dictionary)
+        mygame = self.boggle(grid, dictionary)
         solution = [x.upper() for x in mygame.getSolution()]
         expected = ["QUAB", "IEBC", "ABCD"]
         expected = [x.upper() for x in expected]
@@ -391,7 +403,7 @@ class TestSuite_Complete_Coverage(unittest.TestCase):
     def test_Zigzag_Moves(self):
         grid = [["A", "B", "C"], ["D", "E", "F"], ["G", "H", "Ie"]]
         dictionary = ["AEIE", "CEG", "ACD", "BFHD", "IAE"]
-        mygame = Boggle(grid, dictionary)
+        mygame = self.boggle(grid, dictionary)
         solution = [x.upper() for x in mygame.getSolution()]
         expected = ["AEIE", "CEG", "BFHD"]
         expected = [x.upper() for x in expected]
@@ -405,12 +417,12 @@ class TestSuite_Complete_Coverage(unittest.TestCase):
     def test_Reusing_Same_Tile_Disallowed(self):
         grid = [["A", "A"], ["B", "C"]]
         dictionary = ["AAA"]
-        mygame = Boggle(grid, dictionary)
+        mygame = self.boggle(grid, dictionary)
         solution = mygame.getSolution()
         self.assertNotIn("AAA", solution)
 
 
-class TestSuite_Qu_and_St(unittest.TestCase):
+class TestSuite_Qu_and_St(EngineTestCase):
     """
     Tests grid with qu tile
     Expected Output: ["QUAT", "QUAD", "BAT"]
@@ -424,7 +436,7 @@ class TestSuite_Qu_and_St(unittest.TestCase):
             ["J", "K", "L", "M"],
         ]
         dictionary = ["QUAT", "QUAD", "BAT", "FAT", "LATE"]
-        mygame = Boggle(grid, dictionary)
+        mygame = self.boggle(grid, dictionary)
         solution = [x.upper() for x in mygame.getSolution()]
         expected = ["QUAT", "QUAD", "BAT"]
         expected = [x.upper() for x in expected]
@@ -443,7 +455,7 @@ class TestSuite_Qu_and_St(unittest.TestCase):
             ["J", "K", "L", "M"],
         ]
         dictionary = ["START", "STAB", "MID", "STAR", "BAD", "TEA"]
-        mygame = Boggle(grid, dictionary)
+        mygame = self.boggle(grid, dictionary)
         solution = [x.upper() for x in mygame.getSolution()]
         expected = ["START", "STAB", "STAR", "BAD"]
         expected = [x.upper() for x in expected]
@@ -462,7 +474,7 @@ class TestSuite_Qu_and_St(unittest.TestCase):
             ["J", "K", "L", "M"],
         ]
         dictionary = ["QUAST", "QUAD", "STAB", "STAR", "BAT", "LIB", "LIE"]
-        mygame = Boggle(grid, dictionary)
+        mygame = self.boggle(grid, dictionary)
         solution = [x.upper() for x in mygame.getSolution()]
         expected = ["QUAST", "QUAD", "STAB", "LIE"]
         expected = [x.upper() for x in expected]
@@ -481,7 +493,7 @@ class TestSuite_Qu_and_St(unittest.TestCase):
             ["L", "M", "N", "O"],
         ]
         dictionary = ["QAB", "QEF", "HIJ"]
-        mygame = Boggle(grid, dictionary)
+        mygame = self.boggle(grid, dictionary)
         solution = [x.upper() for x in mygame.getSolution()]
         expected = []
         expected = [x.upper() for x in expected]
@@ -500,14 +512,14 @@ class TestSuite_Qu_and_St(unittest.TestCase):
             ["J", "K", "L", "M"],
         ]
         dictionary = ["SAR", "CHIE", "BCDE"]
-        mygame = Boggle(grid, dictionary)
+        mygame = self.boggle(grid, dictionary)
         solution = [x.upper() for x in mygame.getSolution()]
         expected = []
         expected = [x.upper() for x in expected]
         self.assertEqual(sorted(expected), sorted(solution))
 
 
-class TestSuite_Ie(unittest.TestCase):
+class TestSuite_Ie(EngineTestCase):
     """
     Tests grid with Ie tile
     Expected Output: ["IEAD", "IEFG"]
@@ -522,7 +534,7 @@ class TestSuite_Ie(unittest.TestCase):
             ["L", "M", "N", "O"],
         ]
         dictionary = ["IEAD", "IEFG", "HIJ", "MID"]
-        mygame = Boggle(grid, dictionary)
+        mygame = self.boggle(grid, dictionary)
         solution = [x.upper() for x in mygame.getSolution()]
         expected = ["IEAD", "IEFG"]
         expected = [x.upper() for x in expected]
@@ -541,16 +553,115 @@ class TestSuite_Ie(unittest.TestCase):
             ["L", "M", "N", "O"],
         ]
         dictionary = ["IAD", "IEFG", "HIJ"]
-        mygame = Boggle(grid, dictionary)
+        mygame = self.boggle(grid, dictionary)
         solution = [x.upper() for x in mygame.getSolution()]
         expected = []
         expected = [x.upper() for x in expected]
         self.assertEqual(sorted(expected), sorted(solution))
 
 
-if __name__ == "__main__":
-    unittest.main()
+class TestSuite_Mapped_Trie(unittest.TestCase):
+    """
+    Tests the compiled trie file written by MappedTrie.write
+    Expected Output: the same words and solutions as the in-memory Trie
+    """
+
+    WORDS = ["abc", "abdhj", "abi", "ef", "cfj", "dea", "quab", "iebc", "abcd"]
+    GRID = [["Qu", "A", "B"], ["Ie", "C", "D"], ["E", "F", "J"]]
+
+    def setUp(self):
+        self.trie = Trie.from_words(normalize_words(self.WORDS))
+        handle, self.path = tempfile.mkstemp(suffix=".trie")
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+
+    def test_Round_trip(self):
+        MappedTrie.write(self.trie, self.path)
+        mapped = MappedTrie(self.path)
+        self.addCleanup(mapped.close)
+        self.assertEqual(sorted(self.trie.iter_words()), sorted(mapped.iter_words()))
+        self.assertEqual(len(self.trie), len(mapped))
+        for engine in ("trie", "iterative"):
+            self.assertEqual(
+                Boggle(self.GRID, self.trie, engine=engine).getSolution(),
+                Boggle(self.GRID, mapped, engine=engine).getSolution(),
+            )
+
+    def test_Rejects_other_files(self):
+        with open(self.path, "wb") as f:
+            f.write(b"not a compiled trie at all")
+        with self.assertRaises(ValueError):
+            MappedTrie(self.path)
+
+    def test_Rejects_truncated_file(self):
+        MappedTrie.write(self.trie, self.path)
+        with open(self.path, "r+b") as f:
+            f.truncate(os.path.getsize(self.path) - 8)
+        maps = []
+
+        def track(*args, **kwargs):
+            maps.append(real_mmap(*args, **kwargs))
+            return maps[-1]
+
+        real_mmap = mmap.mmap
+        with mock.patch("mmap.mmap", side_effect=track):
+            with self.assertRaises(ValueError):
+                MappedTrie(self.path)
+        # The rejected file is not left mapped
+        self.assertTrue(maps[0].closed)
+
+
+class TestSuite_Grid_Hash(unittest.TestCase):
+    """
+    Tests grid_hash on rotations and reflections
+    Expected Output: one hash for all 8 orientations, another for other boards
+    """
+
+    GRID = [["A", "B", "C"], ["D", "E", "F"], ["G", "H", "Qu"]]
+
+    @staticmethod
+    def rotate(grid):
+        return [list(row) for row in zip(*grid[::-1])]
+
+    @staticmethod
+    def reflect(grid):
+        return [row[::-1] for row in grid]
+
+    def test_All_orientations_share_a_hash(self):
+        boards = []
+        grid = self.GRID
+        for _ in range(4):
+            grid = self.rotate(grid)
+            boards += [grid, self.reflect(grid)]
+        self.assertEqual(len({str(board) for board in boards}), 8)
+        self.assertEqual({grid_hash(board) for board in boards}, {grid_hash(self.GRID)})
+
+    def test_Different_boards_differ(self):
+        swapped = [["B", "A", "C"], ["D", "E", "F"], ["G", "H", "Qu"]]
+        self.assertNotEqual(grid_hash(self.GRID), grid_hash(swapped))
+        # Multi-letter tiles are not confused with two single tiles
+        self.assertNotEqual(grid_hash([["Qu", "A"], ["B", "C"]]), grid_hash([["Q", "UA"], ["B", "C"]]))
+
+
+# Run every suite above once more per search engine, so each engine must
+# give the same output as the default one
+ENGINE_SUITES = [
+    TestSuite_Alg_Scalability_Cases,
+    TestSuite_Simple_Edge_Cases,
+    TestSuite_Complete_Coverage,
+    TestSuite_Qu_and_St,
+    TestSuite_Ie,
+]
+for _suite in ENGINE_SUITES:
+    for _engine in Boggle.ENGINES:
+        _name = f"{_suite.__name__}_{_engine}"
+        globals()[_name] = type(_name, (_suite,), {"engine": _engine})
+del _suite, _engine, _name
 
 
 # Used ChatGPT to generate test cases based on
 # the test frames, constraints, and function descriptions.
+
+
+if __name__ == "__main__":
+    unittest.main()